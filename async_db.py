@@ -13,7 +13,11 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2024/4/6 14:21
 # @Desc    : 异步Aiomysql的增删改查封装
-from typing import Any, Dict, List, Union
+import asyncio
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncGenerator, Dict, List, Optional, Sequence, Tuple, Union
 
 import aiomysql
 
@@ -84,11 +88,12 @@ class AsyncMysqlDB:
             upsets.append(s)
             values.append(v)
         upsets = ','.join(upsets)
-        sql = 'UPDATE %s SET %s WHERE %s="%s"' % (
+        sql = 'UPDATE %s SET %s WHERE `%s`=%%s' % (
             table_name,
             upsets,
-            field_where, value_where,
+            field_where,
         )
+        values.append(value_where)
         async with self.__pool.acquire() as conn:
             async with conn.cursor() as cur:
                 rows = await cur.execute(sql, values)
@@ -105,3 +110,321 @@ class AsyncMysqlDB:
             async with conn.cursor() as cur:
                 rows = await cur.execute(sql, args)
                 return rows
+
+    async def executemany(self, sql: str, args_list: Sequence[Sequence[Any]]) -> int:
+        """
+        同一条语句使用多组参数执行，INSERT ... VALUES 语句会被合并为一条多行写入
+        :param sql: 参数化的sql
+        :param args_list: 每次执行的参数列表
+        :return: 影响的行数
+        """
+        if not args_list:
+            return 0
+        async with self.__pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                rows = await cur.executemany(sql, args_list)
+                return rows
+
+    async def items_to_table(self, table_name: str, items: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        """
+        表中批量插入数据，每条语句写入多行
+        :param table_name: 表名
+        :param items: 记录列表，字段相同的记录合并到同一条语句中
+        :param batch_size: 每条语句最多写入的记录数
+        :return: 影响的行数
+        """
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for item in items:
+            groups.setdefault(tuple(item.keys()), []).append(item)
+
+        effect_rows = 0
+        async with self.__pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                for fields, group_items in groups.items():
+                    fieldstr = ','.join([f'`{field}`' for field in fields])
+                    for i in range(0, len(group_items), batch_size):
+                        batch_items = group_items[i:i + batch_size]
+                        valstr = ','.join(['(%s)' % ','.join(['%s'] * len(fields))] * len(batch_items))
+                        sql = "INSERT INTO %s (%s) VALUES %s" % (table_name, fieldstr, valstr)
+                        effect_rows += await cur.execute(sql, [item[field] for item in batch_items for field in fields])
+        return effect_rows
+
+    async def iter_query(self, sql: str, *args: Union[str, int],
+                         batch_size: int = 1000) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        使用服务端游标流式读取查询结果，每次从服务端取 batch_size 条，导出大表时内存占用保持恒定；
+        迭代期间会一直占用连接池中的一个连接
+        :param sql: 查询的sql
+        :param args: sql中传递动态参数列表
+        :param batch_size: 每次从服务端读取的记录数
+        :return:
+        """
+        async with self.__pool.acquire() as conn:
+            async with conn.cursor(aiomysql.SSDictCursor) as cur:
+                await cur.execute(sql, args)
+                while True:
+                    rows = await cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield row
+
+    async def batch_upsert(self, table_name: str, items: List[Dict[str, Any]],
+                           insert_only_fields: Sequence[str] = ("add_ts",), batch_size: int = 500) -> int:
+        """
+        批量写入记录，唯一键冲突时更新已有记录（INSERT ... ON DUPLICATE KEY UPDATE），每条语句写入多行
+        :param table_name: 表名，需要在业务ID字段上建立唯一索引
+        :param items: 记录列表，字段相同的记录合并到同一条语句中
+        :param insert_only_fields: 只在新增时写入、更新时保持原值的字段，例如记录添加时间
+        :param batch_size: 每条语句最多写入的记录数
+        :return: 影响的行数
+        """
+        if not items:
+            return 0
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for item in items:
+            groups.setdefault(tuple(item.keys()), []).append(item)
+
+        effect_rows = 0
+        async with self.__pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                for fields, group_items in groups.items():
+                    fieldstr = ','.join([f'`{field}`' for field in fields])
+                    updatestr = ','.join([f'`{field}`=VALUES(`{field}`)' for field in fields
+                                          if field not in insert_only_fields])
+                    for i in range(0, len(group_items), batch_size):
+                        batch_items = group_items[i:i + batch_size]
+                        valstr = ','.join(['(%s)' % ','.join(['%s'] * len(fields))] * len(batch_items))
+                        sql = "INSERT INTO %s (%s) VALUES %s ON DUPLICATE KEY UPDATE %s" % (
+                            table_name, fieldstr, valstr, updatestr)
+                        values = [item[field] for item in batch_items for field in fields]
+                        effect_rows += await cur.execute(sql, values)
+        return effect_rows
+
+
+class AsyncSqliteDB:
+    """
+    SQLite 的异步封装，接口与 AsyncMysqlDB 一致；数据库文件开启 WAL 模式，
+    所有操作都在同一个后台线程中执行，不阻塞事件循环
+    """
+
+    def __init__(self, db_path: str, unique_keys: Optional[Dict[str, List[str]]] = None) -> None:
+        """
+        :param db_path: 数据库文件路径
+        :param unique_keys: 表名 -> 业务唯一键字段，批量写入时作为 ON CONFLICT 的冲突字段
+        """
+        self.db_path = db_path
+        self.unique_keys = unique_keys or {}
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self.__conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.__conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            # isolation_level=None 为自动提交，批量写入时显式开启事务
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self.__conn = conn
+        return self.__conn
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.__executor, func, *args)
+
+    @staticmethod
+    def _format_sql(sql: str) -> str:
+        # 兼容 aiomysql 风格的 %s 占位符
+        return sql.replace("%s", "?")
+
+    def _cursor(self, sql: str, args: Sequence[Any]) -> sqlite3.Cursor:
+        return self._connect().execute(self._format_sql(sql), args)
+
+    def _query(self, sql: str, args: Sequence[Any]) -> List[Dict[str, Any]]:
+        cur = self._connect().execute(self._format_sql(sql), args)
+        return [dict(row) for row in cur.fetchall()]
+
+    def _execute(self, sql: str, args: Sequence[Any]) -> Tuple[int, int]:
+        cur = self._connect().execute(self._format_sql(sql), args)
+        return cur.rowcount, cur.lastrowid
+
+    async def query(self, sql: str, *args: Union[str, int]) -> List[Dict[str, Any]]:
+        """
+        从给定的 SQL 中查询记录，返回的是一个列表
+        :param sql: 查询的sql
+        :param args: sql中传递动态参数列表
+        :return:
+        """
+        return await self._run(self._query, sql, args)
+
+    async def get_first(self, sql: str, *args: Union[str, int]) -> Union[Dict[str, Any], None]:
+        """
+        从给定的 SQL 中查询记录，返回的是符合条件的第一个结果
+        :param sql: 查询的sql
+        :param args:sql中传递动态参数列表
+        :return:
+        """
+        rows = await self._run(self._query, sql, args)
+        return rows[0] if rows else None
+
+    async def item_to_table(self, table_name: str, item: Dict[str, Any]) -> int:
+        """
+        表中插入数据
+        :param table_name: 表名
+        :param item: 一条记录的字典信息
+        :return:
+        """
+        fieldstr = ','.join([f'`{field}`' for field in item.keys()])
+        valstr = ','.join(['?'] * len(item))
+        sql = "INSERT INTO %s (%s) VALUES(%s)" % (table_name, fieldstr, valstr)
+        _, lastrowid = await self._run(self._execute, sql, list(item.values()))
+        return lastrowid
+
+    async def update_table(self, table_name: str, updates: Dict[str, Any], field_where: str,
+                           value_where: Union[str, int, float]) -> int:
+        """
+        更新指定表的记录
+        :param table_name: 表名
+        :param updates: 需要更新的字段和值的 key - value 映射
+        :param field_where: update 语句 where 条件中的字段名
+        :param value_where: update 语句 where 条件中的字段值
+        :return:
+        """
+        upsets = ','.join([f'`{field}`=?' for field in updates.keys()])
+        sql = 'UPDATE %s SET %s WHERE `%s`=?' % (table_name, upsets, field_where)
+        rows, _ = await self._run(self._execute, sql, list(updates.values()) + [value_where])
+        return rows
+
+    async def execute(self, sql: str, *args: Union[str, int]) -> int:
+        """
+        需要更新、写入等操作的 excute 执行语句
+        :param sql:
+        :param args:
+        :return:
+        """
+        rows, _ = await self._run(self._execute, sql, args)
+        return rows
+
+    def _executemany(self, sql: str, args_list: Sequence[Sequence[Any]]) -> int:
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            rows = conn.executemany(self._format_sql(sql), args_list).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return rows
+
+    async def executemany(self, sql: str, args_list: Sequence[Sequence[Any]]) -> int:
+        """
+        同一条语句使用多组参数执行，所有参数在同一个事务中写入
+        :param sql: 参数化的sql
+        :param args_list: 每次执行的参数列表
+        :return: 影响的行数
+        """
+        if not args_list:
+            return 0
+        return await self._run(self._executemany, sql, args_list)
+
+    async def items_to_table(self, table_name: str, items: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        """
+        表中批量插入数据，字段相同的记录使用 executemany 写入
+        :param table_name: 表名
+        :param items: 记录列表
+        :param batch_size: 与 AsyncMysqlDB 保持一致，SQLite 不需要分批
+        :return: 影响的行数
+        """
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for item in items:
+            groups.setdefault(tuple(item.keys()), []).append(item)
+        effect_rows = 0
+        for fields, group_items in groups.items():
+            fieldstr = ','.join([f'`{field}`' for field in fields])
+            sql = "INSERT INTO %s (%s) VALUES(%s)" % (table_name, fieldstr, ','.join(['?'] * len(fields)))
+            effect_rows += await self.executemany(sql, [[item[field] for field in fields] for item in group_items])
+        return effect_rows
+
+    async def iter_query(self, sql: str, *args: Union[str, int],
+                         batch_size: int = 1000) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        流式读取查询结果，每次读取 batch_size 条，导出大表时内存占用保持恒定
+        :param sql: 查询的sql
+        :param args: sql中传递动态参数列表
+        :param batch_size: 每次读取的记录数
+        :return:
+        """
+        cur: sqlite3.Cursor = await self._run(self._cursor, sql, args)
+        try:
+            while True:
+                rows = await self._run(cur.fetchmany, batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            await self._run(cur.close)
+
+    def _executescript(self, sql_script: str):
+        self._connect().executescript(sql_script)
+
+    async def executescript(self, sql_script: str):
+        """
+        执行多条 sql 语句，用于初始化表结构
+        :param sql_script:
+        :return:
+        """
+        await self._run(self._executescript, sql_script)
+
+    def _batch_upsert(self, table_name: str, items: List[Dict[str, Any]], insert_only_fields: Sequence[str]) -> int:
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for item in items:
+            groups.setdefault(tuple(item.keys()), []).append(item)
+
+        conflict_fields = self.unique_keys.get(table_name)
+        conflict_target = "(%s)" % ','.join([f'`{field}`' for field in conflict_fields]) if conflict_fields else ""
+        conn = self._connect()
+        effect_rows = 0
+        conn.execute("BEGIN")
+        try:
+            for fields, group_items in groups.items():
+                fieldstr = ','.join([f'`{field}`' for field in fields])
+                valstr = ','.join(['?'] * len(fields))
+                updatestr = ','.join([f'`{field}`=excluded.`{field}`' for field in fields
+                                      if field not in insert_only_fields])
+                action = "DO UPDATE SET %s" % updatestr if updatestr else "DO NOTHING"
+                sql = "INSERT INTO %s (%s) VALUES(%s) ON CONFLICT%s %s" % (
+                    table_name, fieldstr, valstr, conflict_target, action)
+                cur = conn.executemany(sql, [[item[field] for field in fields] for item in group_items])
+                effect_rows += cur.rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return effect_rows
+
+    async def batch_upsert(self, table_name: str, items: List[Dict[str, Any]],
+                           insert_only_fields: Sequence[str] = ("add_ts",), batch_size: int = 500) -> int:
+        """
+        批量写入记录，唯一键冲突时更新已有记录（INSERT ... ON CONFLICT DO UPDATE），所有记录在同一个事务中写入
+        :param table_name: 表名
+        :param items: 记录列表
+        :param insert_only_fields: 只在新增时写入、更新时保持原值的字段，例如记录添加时间
+        :param batch_size: 与 AsyncMysqlDB 保持一致，SQLite 在一个事务中使用 executemany 写入，不需要分批
+        :return: 影响的行数
+        """
+        if not items:
+            return 0
+        return await self._run(self._batch_upsert, table_name, items, insert_only_fields)
+
+    def _close(self):
+        if self.__conn is not None:
+            self.__conn.close()
+            self.__conn = None
+
+    async def close(self):
+        await self._run(self._close)
+        self.__executor.shutdown(wait=False)
@@ -10,7 +10,7 @@
 
 
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from playwright.async_api import BrowserContext, BrowserType
 
@@ -63,6 +63,24 @@ class AbstractLogin(ABC):
 
 
 class AbstractStore(ABC):
+    async def open(self):
+        """
+        存储实例创建后、第一次写入前调用
+        """
+        pass
+
+    async def flush(self):
+        """
+        将缓冲的数据写入存储
+        """
+        pass
+
+    async def close(self):
+        """
+        程序退出前调用
+        """
+        pass
+
     @abstractmethod
     async def store_content(self, content_item: Dict):
         pass
@@ -77,6 +95,20 @@ class AbstractStore(ABC):
     async def store_creator(self, creator: Dict):
         pass
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        批量保存内容，默认逐条保存，支持批量写入的存储（例如db）可以重写该方法
+        """
+        for content_item in content_items:
+            await self.store_content(content_item)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        批量保存评论，默认逐条保存，支持批量写入的存储（例如db）可以重写该方法
+        """
+        for comment_item in comment_items:
+            await self.store_comment(comment_item)
+
 
 class AbstractStoreImage(ABC):
     # TODO: support all platform
@@ -87,10 +119,22 @@ class AbstractStoreImage(ABC):
 
 
 class AbstractApiClient(ABC):
+    # 代理轮换器（proxy.proxy_rotator.ProxyRotator），开启代理时由爬虫设置
+    proxy_rotator = None
+
     @abstractmethod
     async def request(self, method, url, **kwargs):
         pass
 
+    async def request_proxies(self) -> Optional[Dict]:
+        """
+        本次请求使用的 httpx 代理，设置了 proxy_rotator 时按轮换策略选择并更新 self.proxies，否则使用固定的 self.proxies
+        :return:
+        """
+        if self.proxy_rotator is not None:
+            self.proxies = await self.proxy_rotator.next_proxies()
+        return getattr(self, "proxies", None)
+
     @abstractmethod
     async def update_cookies(self, browser_context: BrowserContext):
         pass
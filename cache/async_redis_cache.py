@@ -0,0 +1,138 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 异步 RedisCache 实现，基于 redis.asyncio 连接池，批量读写使用 MGET / pipeline 一次往返完成
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from redis.asyncio import ConnectionPool, Redis
+
+from cache.abs_cache import AbstractAsyncCache
+from cache.codec import CacheCodec, create_codec
+from config import db_config
+
+
+class AsyncRedisCache(AbstractAsyncCache):
+
+    # 每次 SCAN 建议返回的键数量
+    SCAN_COUNT = 1000
+
+    def __init__(self, codec: Optional[CacheCodec] = None) -> None:
+        self._codec = codec or create_codec()
+        self._pool = ConnectionPool(
+            host=db_config.REDIS_DB_HOST,
+            port=db_config.REDIS_DB_PORT,
+            db=db_config.REDIS_DB_NUM,
+            password=db_config.REDIS_DB_PWD,
+            max_connections=db_config.REDIS_MAX_CONNECTIONS,
+        )
+        self._redis_client = Redis(connection_pool=self._pool)
+
+    @property
+    def redis_client(self) -> Redis:
+        """
+        底层 redis 客户端，用于发布订阅等缓存接口之外的命令
+        """
+        return self._redis_client
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        从缓存中获取键的值, 并且解码
+        :param key:
+        :return:
+        """
+        value = await self._redis_client.get(key)
+        if value is None:
+            return None
+        return self._codec.decode(value)
+
+    async def set(self, key: str, value: Any, expire_time: int) -> None:
+        """
+        将键的值编码后设置到缓存中
+        :param key:
+        :param value:
+        :param expire_time:
+        :return:
+        """
+        await self._redis_client.set(key, self._codec.encode(value), ex=expire_time)
+
+    async def keys(self, pattern: str) -> List[str]:
+        """
+        获取所有符合pattern的key，使用 SCAN 分批迭代，避免 KEYS 命令在键很多时阻塞 redis
+        """
+        keys = dict.fromkeys([key async for key in self._redis_client.scan_iter(match=pattern, count=self.SCAN_COUNT)])
+        return [key.decode() for key in keys]
+
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """
+        使用 MGET 一次请求批量获取键的值
+        :param keys:
+        :return:
+        """
+        if not keys:
+            return []
+        values = await self._redis_client.mget(keys)
+        return [None if value is None else self._codec.decode(value) for value in values]
+
+    async def mset(self, mapping: Dict[str, Any], expire_time: int) -> None:
+        """
+        使用 pipeline 一次请求批量设置键的值
+        :param mapping:
+        :param expire_time:
+        :return:
+        """
+        if not mapping:
+            return
+        async with self._redis_client.pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, self._codec.encode(value), ex=expire_time)
+            await pipe.execute()
+
+    async def mget_with_ttl(self, keys: List[str]) -> List[Tuple[Optional[Any], int]]:
+        """
+        使用 pipeline 一次请求批量获取键的值和剩余过期时间（秒）
+        :param keys:
+        :return: [(value, ttl)]，不存在的键返回 (None, 0)
+        """
+        if not keys:
+            return []
+        async with self._redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(key)
+                pipe.ttl(key)
+            results = await pipe.execute()
+        return [(None, 0) if value is None else (self._codec.decode(value), ttl)
+                for value, ttl in zip(results[::2], results[1::2])]
+
+    async def delete(self, keys: List[str]) -> None:
+        """
+        删除键
+        :param keys:
+        :return:
+        """
+        if keys:
+            await self._redis_client.delete(*keys)
+
+    async def close(self) -> None:
+        await self._redis_client.close()
+        await self._pool.disconnect()
+
+
+if __name__ == '__main__':
+    async def main():
+        redis_cache = AsyncRedisCache()
+        await redis_cache.mset({"name": "程序员阿江-Relakkes", "list": [1, 2, 3]}, 10)
+        print(await redis_cache.mget(["name", "list", "not_exist"]))  # ['程序员阿江-Relakkes', [1, 2, 3], None]
+        print(await redis_cache.keys("*"))
+        await redis_cache.close()
+
+    asyncio.run(main())
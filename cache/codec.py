@@ -0,0 +1,121 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 缓存值的序列化编解码，支持 json、msgpack、pickle，超过阈值的数据使用 zlib 压缩
+#            编码结果的第一个字节标记序列化方式和是否压缩，解码时按标记处理，切换配置后旧数据仍然可以读取
+
+import json
+import pickle
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import db_config
+
+SERIALIZER_JSON = "json"
+SERIALIZER_MSGPACK = "msgpack"
+SERIALIZER_PICKLE = "pickle"
+
+# 编码结果第一个字节：低 4 位为序列化方式，0x10 表示数据经过 zlib 压缩
+_SERIALIZER_FLAGS = {SERIALIZER_JSON: 0x01, SERIALIZER_MSGPACK: 0x02, SERIALIZER_PICKLE: 0x03}
+_COMPRESSED_FLAG = 0x10
+# 之前版本直接保存 pickle.dumps 的结果，pickle 协议 2 及以上的数据以 0x80 开头
+_LEGACY_PICKLE_HEADER = 0x80
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    return json.loads(data)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    import msgpack
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    import msgpack
+    return msgpack.unpackb(data, raw=False)
+
+
+def _pickle_dumps(value: Any) -> bytes:
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+_SERIALIZERS: Dict[int, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    _SERIALIZER_FLAGS[SERIALIZER_JSON]: (_json_dumps, _json_loads),
+    _SERIALIZER_FLAGS[SERIALIZER_MSGPACK]: (_msgpack_dumps, _msgpack_loads),
+    _SERIALIZER_FLAGS[SERIALIZER_PICKLE]: (_pickle_dumps, pickle.loads),
+}
+
+
+class CacheCodec:
+    """
+    缓存值编解码器，json、msgpack 只支持 dict、list、str、数字等基础类型（tuple 解码后为 list），
+    需要保存其他 Python 对象时使用 pickle；json、msgpack 编码的数据去掉第一个字节后其他语言也可以直接读取
+    """
+
+    def __init__(self, serializer: str = SERIALIZER_JSON, compress_threshold: int = 1024, compress_level: int = 6):
+        """
+        :param serializer: json、msgpack 或 pickle
+        :param compress_threshold: 序列化后超过该字节数时压缩，0 表示不压缩
+        :param compress_level: zlib 压缩级别
+        """
+        if serializer not in _SERIALIZER_FLAGS:
+            raise ValueError(f"Unknown cache serializer: {serializer}")
+        self.serializer = serializer
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self._flag = _SERIALIZER_FLAGS[serializer]
+        self._dumps = _SERIALIZERS[self._flag][0]
+
+    def encode(self, value: Any) -> bytes:
+        """
+        序列化缓存值
+        :param value:
+        :return:
+        """
+        flag = self._flag
+        data = self._dumps(value)
+        if self.compress_threshold and len(data) >= self.compress_threshold:
+            data = zlib.compress(data, self.compress_level)
+            flag |= _COMPRESSED_FLAG
+        return bytes((flag,)) + data
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        """
+        反序列化缓存值，按数据中的标记选择解码方式，与当前配置的序列化方式无关
+        :param data:
+        :return:
+        """
+        flag = data[0]
+        if flag == _LEGACY_PICKLE_HEADER:
+            return pickle.loads(data)
+        payload = data[1:]
+        if flag & _COMPRESSED_FLAG:
+            payload = zlib.decompress(payload)
+        serializer = _SERIALIZERS.get(flag & 0x0F)
+        if serializer is None:
+            raise ValueError(f"Unknown cache value header: {flag:#x}")
+        return serializer[1](payload)
+
+
+def create_codec(serializer: Optional[str] = None) -> CacheCodec:
+    """
+    按 db_config 的配置创建编解码器
+    :param serializer: 序列化方式，默认取 db_config.CACHE_SERIALIZER
+    :return:
+    """
+    return CacheCodec(serializer or db_config.CACHE_SERIALIZER, compress_threshold=db_config.CACHE_COMPRESS_THRESHOLD)
@@ -16,22 +16,112 @@
 # @Desc    : 本地缓存
 
 import asyncio
+import heapq
+import re
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from cache.abs_cache import AbstractCache
+from cache.abs_cache import AbstractAsyncCache, AbstractCache
+from config import db_config
+
+
+# 通配符（与 redis 的 glob 规则一致），第一个通配符之前的部分作为前缀查询
+_GLOB_SPECIAL_PATTERN = re.compile(r"[*?\[\\]")
+
+
+class SortedKeyIndex:
+    """
+    有序的键索引，键分段保存在多个有序列表中（每段不超过 2 * load 个），插入、删除只移动所在分段，
+    按前缀查询时二分定位到第一个匹配的键后顺序读取，耗时与匹配的键数量成正比
+    """
+
+    def __init__(self, load: int = 1000):
+        self._load = load
+        self._lists: List[List[str]] = []
+        # 每个分段的最大键，用于二分定位分段
+        self._maxes: List[str] = []
+
+    def __len__(self) -> int:
+        return sum(len(keys) for keys in self._lists)
+
+    def add(self, key: str):
+        if not self._lists:
+            self._lists.append([key])
+            self._maxes.append(key)
+            return
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            pos -= 1
+        keys = self._lists[pos]
+        insort(keys, key)
+        self._maxes[pos] = keys[-1]
+        if len(keys) > 2 * self._load:
+            half = keys[self._load:]
+            del keys[self._load:]
+            self._maxes[pos] = keys[-1]
+            self._lists.insert(pos + 1, half)
+            self._maxes.insert(pos + 1, half[-1])
+
+    def discard(self, key: str):
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            return
+        keys = self._lists[pos]
+        idx = bisect_left(keys, key)
+        if idx == len(keys) or keys[idx] != key:
+            return
+        del keys[idx]
+        if keys:
+            self._maxes[pos] = keys[-1]
+        else:
+            del self._lists[pos]
+            del self._maxes[pos]
+
+    def prefix(self, prefix: str) -> Iterator[str]:
+        """
+        按顺序返回所有以 prefix 开头的键
+        :param prefix:
+        :return:
+        """
+        pos = bisect_left(self._maxes, prefix)
+        if pos == len(self._maxes):
+            return
+        idx = bisect_left(self._lists[pos], prefix)
+        for keys in self._lists[pos:]:
+            for key in keys[idx:] if idx else keys:
+                if not key.startswith(prefix):
+                    return
+                yield key
+            idx = 0
 
 
 class ExpiringLocalCache(AbstractCache):
+    """
+    本地过期缓存，过期时间保存在按截止时间排序的最小堆中，清理时只弹出已过期的堆顶元素（O(log n)），
+    不需要遍历整个缓存；设置 max_entries 后超出容量时按 LRU 淘汰最久未访问的键；
+    所有键同时保存在有序的前缀索引中，keys 按通配符之前的前缀查询，不需要扫描整个缓存
+    """
 
-    def __init__(self, cron_interval: int = 10):
+    def __init__(self, cron_interval: int = 10, max_entries: Optional[int] = None):
         """
         初始化本地缓存
         :param cron_interval: 定时清楚cache的时间间隔
+        :param max_entries: 最多缓存的键数量，超出时淘汰最久未访问的键，0 表示不限制，默认取 db_config.LOCAL_CACHE_MAX_ENTRIES
         :return:
         """
         self._cron_interval = cron_interval
-        self._cache_container: Dict[str, Tuple[Any, float]] = {}
+        self._max_entries = db_config.LOCAL_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self._cache_container: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        # (过期时间, key)，key 被重新设置后旧的堆元素不会立即删除，弹出时与缓存中的过期时间比较后跳过
+        self._expire_heap: List[Tuple[float, str]] = []
+        self._key_index = SortedKeyIndex()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
         self._cron_task: Optional[asyncio.Task] = None
         # 开启定时清理任务
         self._schedule_clear()
@@ -44,6 +134,9 @@ class ExpiringLocalCache(AbstractCache):
         if self._cron_task is not None:
             self._cron_task.cancel()
 
+    def __len__(self) -> int:
+        return len(self._cache_container)
+
     def get(self, key: str) -> Optional[Any]:
         """
         从缓存中获取键的值
@@ -52,13 +145,18 @@ class ExpiringLocalCache(AbstractCache):
         """
         value, expire_time = self._cache_container.get(key, (None, 0))
         if value is None:
+            self._misses += 1
             return None
 
         # 如果键已过期，则删除键并返回None
-        if expire_time < time.time():
-            del self._cache_container[key]
+        if expire_time < time.monotonic():
+            self._delete(key)
+            self._expirations += 1
+            self._misses += 1
             return None
 
+        self._cache_container.move_to_end(key)
+        self._hits += 1
         return value
 
     def set(self, key: str, value: Any, expire_time: int) -> None:
@@ -69,22 +167,62 @@ class ExpiringLocalCache(AbstractCache):
         :param expire_time:
         :return:
         """
-        self._cache_container[key] = (value, time.time() + expire_time)
+        deadline = time.monotonic() + expire_time
+        if key not in self._cache_container:
+            self._key_index.add(key)
+        self._cache_container[key] = (value, deadline)
+        self._cache_container.move_to_end(key)
+        heapq.heappush(self._expire_heap, (deadline, key))
+        self._clear()
+        if self._max_entries:
+            while len(self._cache_container) > self._max_entries:
+                evicted_key, _ = self._cache_container.popitem(last=False)
+                self._key_index.discard(evicted_key)
+                self._evictions += 1
+        # 同一个 key 反复设置或被淘汰会在堆中留下失效元素，失效元素过多时重建堆
+        if len(self._expire_heap) > 2 * len(self._cache_container) + 1024:
+            self._expire_heap = [(expire_at, k) for k, (_, expire_at) in self._cache_container.items()]
+            heapq.heapify(self._expire_heap)
+
+    def delete(self, key: str) -> None:
+        """
+        删除键，键不存在时忽略
+        :param key:
+        :return:
+        """
+        if key in self._cache_container:
+            self._delete(key)
 
     def keys(self, pattern: str) -> List[str]:
         """
-        获取所有符合pattern的key
-        :param pattern: 匹配模式
+        获取所有符合pattern的key，支持 *、?、[abc] 通配符，在前缀索引中只查询通配符之前的前缀范围
+        :param pattern: 匹配模式，如 kuaidaili_*
         :return:
         """
+        self._clear()
         if pattern == '*':
             return list(self._cache_container.keys())
 
-        # 本地缓存通配符暂时将*替换为空
-        if '*' in pattern:
-            pattern = pattern.replace('*', '')
+        special = _GLOB_SPECIAL_PATTERN.search(pattern)
+        if special is None:
+            return [pattern] if pattern in self._cache_container else []
+        prefix = pattern[:special.start()]
+        if pattern == prefix + '*':
+            return list(self._key_index.prefix(prefix))
+        return [key for key in self._key_index.prefix(prefix) if fnmatchcase(key, pattern)]
 
-        return [key for key in self._cache_container.keys() if pattern in key]
+    def stats(self) -> Dict[str, int]:
+        """
+        缓存命中、未命中、容量淘汰和过期清理的次数
+        :return:
+        """
+        return {
+            "size": len(self._cache_container),
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+        }
 
     def _schedule_clear(self):
         """
@@ -102,12 +240,20 @@ class ExpiringLocalCache(AbstractCache):
 
     def _clear(self):
         """
-        根据过期时间清理缓存
+        根据过期时间清理缓存，只处理堆顶已过期的元素
         :return:
         """
-        for key, (value, expire_time) in self._cache_container.items():
-            if expire_time < time.time():
-                del self._cache_container[key]
+        now = time.monotonic()
+        while self._expire_heap and self._expire_heap[0][0] < now:
+            deadline, key = heapq.heappop(self._expire_heap)
+            entry = self._cache_container.get(key)
+            if entry is not None and entry[1] == deadline:
+                self._delete(key)
+                self._expirations += 1
+
+    def _delete(self, key: str):
+        del self._cache_container[key]
+        self._key_index.discard(key)
 
     async def _start_clear_cron(self):
         """
@@ -119,6 +265,30 @@ class ExpiringLocalCache(AbstractCache):
             await asyncio.sleep(self._cron_interval)
 
 
+class AsyncLocalCache(AbstractAsyncCache):
+    """
+    ExpiringLocalCache 的异步接口，本地缓存的读写都在内存中完成，直接调用同步实现不会阻塞事件循环
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._cache = ExpiringLocalCache(*args, **kwargs)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, expire_time: int) -> None:
+        self._cache.set(key, value, expire_time)
+
+    async def keys(self, pattern: str) -> List[str]:
+        return self._cache.keys(pattern)
+
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        return self._cache.mget(keys)
+
+    async def mset(self, mapping: Dict[str, Any], expire_time: int) -> None:
+        self._cache.mset(mapping, expire_time)
+
+
 if __name__ == '__main__':
     cache = ExpiringLocalCache(cron_interval=2)
     cache.set('name', '程序员阿江-Relakkes', 3)
@@ -126,6 +296,7 @@ if __name__ == '__main__':
     print(cache.keys("*"))
     time.sleep(4)
     print(cache.get('key'))
+    print(cache.stats())
     del cache
     time.sleep(1)
     print("done")
@@ -14,21 +14,33 @@
 # @Name    : 程序员阿江-Relakkes
 # @Time    : 2024/5/29 22:57
 # @Desc    : RedisCache实现
-import pickle
 import time
-from typing import Any, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from redis import Redis
 
 from cache.abs_cache import AbstractCache
+from cache.codec import CacheCodec, create_codec
 from config import db_config
 
 
 class RedisCache(AbstractCache):
 
-    def __init__(self) -> None:
+    # 每次 SCAN 建议返回的键数量
+    SCAN_COUNT = 1000
+
+    def __init__(self, codec: Optional[CacheCodec] = None) -> None:
         # 连接redis, 返回redis客户端
         self._redis_client = self._connet_redis()
+        # 缓存值的编解码器，默认按 db_config.CACHE_SERIALIZER 配置创建
+        self._codec = codec or create_codec()
+
+    @property
+    def redis_client(self) -> Redis:
+        """
+        底层 redis 客户端，用于发布订阅等缓存接口之外的命令
+        """
+        return self._redis_client
 
     @staticmethod
     def _connet_redis() -> Redis:
@@ -45,30 +57,79 @@ class RedisCache(AbstractCache):
 
     def get(self, key: str) -> Any:
         """
-        从缓存中获取键的值, 并且反序列化
+        从缓存中获取键的值, 并且解码
         :param key:
         :return:
         """
         value = self._redis_client.get(key)
         if value is None:
             return None
-        return pickle.loads(value)
+        return self._codec.decode(value)
 
     def set(self, key: str, value: Any, expire_time: int) -> None:
         """
-        将键的值设置到缓存中, 并且序列化
+        将键的值编码后设置到缓存中
         :param key:
         :param value:
         :param expire_time:
         :return:
         """
-        self._redis_client.set(key, pickle.dumps(value), ex=expire_time)
+        self._redis_client.set(key, self._codec.encode(value), ex=expire_time)
+
+    def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """
+        使用 MGET 一次请求批量获取键的值
+        :param keys:
+        :return:
+        """
+        if not keys:
+            return []
+        return [None if value is None else self._codec.decode(value) for value in self._redis_client.mget(keys)]
+
+    def mset(self, mapping: Dict[str, Any], expire_time: int) -> None:
+        """
+        使用 pipeline 一次请求批量设置键的值
+        :param mapping:
+        :param expire_time:
+        :return:
+        """
+        pipe = self._redis_client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipe.set(key, self._codec.encode(value), ex=expire_time)
+        pipe.execute()
+
+    def mget_with_ttl(self, keys: List[str]) -> List[Tuple[Optional[Any], int]]:
+        """
+        使用 pipeline 一次请求批量获取键的值和剩余过期时间（秒）
+        :param keys:
+        :return: [(value, ttl)]，不存在的键返回 (None, 0)
+        """
+        if not keys:
+            return []
+        pipe = self._redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.get(key)
+            pipe.ttl(key)
+        results = pipe.execute()
+        return [(None, 0) if value is None else (self._codec.decode(value), ttl)
+                for value, ttl in zip(results[::2], results[1::2])]
+
+    def delete(self, keys: List[str]) -> None:
+        """
+        删除键
+        :param keys:
+        :return:
+        """
+        if keys:
+            self._redis_client.delete(*keys)
 
     def keys(self, pattern: str) -> List[str]:
         """
-        获取所有符合pattern的key
+        获取所有符合pattern的key，使用 SCAN 分批迭代，避免 KEYS 命令在键很多时阻塞 redis
         """
-        return [key.decode() for key in self._redis_client.keys(pattern)]
+        # SCAN 在遍历期间有 rehash 时可能返回重复的键，这里去重并保持返回顺序
+        keys = dict.fromkeys(self._redis_client.scan_iter(match=pattern, count=self.SCAN_COUNT))
+        return [key.decode() for key in keys]
 
 
 if __name__ == '__main__':
@@ -0,0 +1,361 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 二级缓存：进程内的本地缓存（L1）+ 多进程共享的 redis（L2），读取优先命中 L1，
+#            写入和删除后通过 redis 发布订阅通知其他进程删除 L1 中的旧值
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache.abs_cache import AbstractAsyncCache, AbstractCache
+from cache.async_redis_cache import AsyncRedisCache
+from cache.local_cache import ExpiringLocalCache
+from cache.redis_cache import RedisCache
+from config import db_config
+from tools import utils
+
+
+class _TieredL1:
+    """
+    L1 的读写和失效消息处理，同步和异步的二级缓存共用；失效消息在订阅线程中处理，L1 的读写都需要加锁
+    """
+
+    def __init__(self, l1_max_entries: Optional[int], l1_ttl: Optional[int], channel: Optional[str]):
+        self._l1 = ExpiringLocalCache(max_entries=db_config.TIERED_CACHE_L1_MAX_ENTRIES
+                                      if l1_max_entries is None else l1_max_entries)
+        self._l1_ttl = db_config.TIERED_CACHE_L1_TTL if l1_ttl is None else l1_ttl
+        self._channel = channel or db_config.TIERED_CACHE_CHANNEL
+        # 当前实例的标识，收到自己发布的失效消息时不需要处理
+        self._origin = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        # 正在从 L2 读取的键（及同时读取的次数）和读取期间被修改的次数，
+        # 读取期间键被写入或失效时 L2 返回的可能是旧值，不能写入 L1
+        self._inflight: Dict[str, int] = {}
+        self._versions: Dict[str, int] = {}
+        # keys 查询结果：{pattern: (过期时间, 键列表)}，匹配的键被写入、删除或失效时丢弃
+        self._keys_cache: Dict[str, Tuple[float, List[str]]] = {}
+        self._keys_generation = 0
+
+    def _l1_expire_time(self, ttl: int) -> int:
+        """
+        L1 的过期时间不超过 L2 中的剩余过期时间，也不超过 l1_ttl
+        :param ttl: L2 中的剩余过期时间，-1 表示永不过期
+        :return:
+        """
+        if ttl < 0:
+            return self._l1_ttl
+        return min(max(ttl, 1), self._l1_ttl)
+
+    def _l1_get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        with self._lock:
+            return [self._l1.get(key) for key in keys]
+
+    def _mark_changed(self, keys: List[str]):
+        """
+        键被写入、删除或失效，需要持有锁调用
+        :param keys:
+        :return:
+        """
+        for key in keys:
+            if key in self._inflight:
+                self._versions[key] = self._versions.get(key, 0) + 1
+        self._keys_generation += 1
+        if self._keys_cache:
+            self._keys_cache = {pattern: entry for pattern, entry in self._keys_cache.items()
+                                if not any(fnmatchcase(key, pattern) for key in keys)}
+
+    def _l1_set_many(self, items: List[Tuple[str, Any, int]]):
+        with self._lock:
+            self._mark_changed([key for key, _, _ in items])
+            for key, value, ttl in items:
+                self._l1.set(key, value, self._l1_expire_time(ttl))
+
+    def _l1_delete_many(self, keys: List[str]):
+        with self._lock:
+            self._mark_changed(keys)
+            for key in keys:
+                self._l1.delete(key)
+
+    def _invalidation_message(self, keys: List[str]) -> str:
+        return json.dumps({"origin": self._origin, "keys": keys})
+
+    def _on_invalidate(self, data: Any):
+        """
+        处理其他进程发布的失效消息，删除 L1 中对应的键
+        :param data: 消息内容
+        :return:
+        """
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            utils.logger.error(f"[TieredCache._on_invalidate] invalid message: {data}")
+            return
+        if message.get("origin") != self._origin:
+            self._l1_delete_many(message.get("keys") or [])
+
+    def _begin_fill(self, keys: List[str]) -> Dict[str, int]:
+        """
+        从 L2 读取前记录键的版本
+        :param keys:
+        :return: {键: 版本}
+        """
+        with self._lock:
+            for key in keys:
+                self._inflight[key] = self._inflight.get(key, 0) + 1
+            return {key: self._versions.get(key, 0) for key in keys}
+
+    def _end_fill(self, keys: List[str]):
+        with self._lock:
+            for key in keys:
+                self._inflight[key] -= 1
+                if self._inflight[key] == 0:
+                    del self._inflight[key]
+                    self._versions.pop(key, None)
+
+    def _fill_from_l2(self, keys: List[str], l2_values: List[Tuple[Optional[Any], int]],
+                      versions: Dict[str, int]) -> Dict[str, Any]:
+        """
+        把从 L2 读到的值写入 L1，读取期间被写入或失效的键不写入，避免旧值覆盖新值
+        :param keys:
+        :param l2_values: [(值, 剩余过期时间)]
+        :param versions: 读取前的版本，见 _begin_fill
+        :return: {键: 值}
+        """
+        found = {key: (value, ttl) for key, (value, ttl) in zip(keys, l2_values) if value is not None}
+        with self._lock:
+            for key, (value, ttl) in found.items():
+                if self._versions.get(key, 0) == versions[key]:
+                    self._l1.set(key, value, self._l1_expire_time(ttl))
+        return {key: value for key, (value, _) in found.items()}
+
+    def _l1_keys(self, pattern: str) -> Tuple[Optional[List[str]], int]:
+        """
+        :param pattern:
+        :return: (缓存的 keys 查询结果，没有时为 None, 当前的代数)
+        """
+        with self._lock:
+            entry = self._keys_cache.get(pattern)
+            if entry is not None and entry[0] > time.monotonic():
+                return list(entry[1]), self._keys_generation
+            return None, self._keys_generation
+
+    def _l1_store_keys(self, pattern: str, keys: List[str], generation: int):
+        """
+        缓存 keys 查询结果最长 l1_ttl 秒，查询期间有键被修改时不缓存
+        :param pattern:
+        :param keys:
+        :param generation: 查询前的代数，见 _l1_keys
+        :return:
+        """
+        with self._lock:
+            if generation == self._keys_generation:
+                self._keys_cache[pattern] = (time.monotonic() + self._l1_ttl, list(keys))
+
+
+class TieredCache(_TieredL1, AbstractCache):
+    """
+    同步二级缓存，失效消息由 redis 客户端的订阅线程接收；
+    L1 只保存最近读写过的热点数据，L1 中的值最长保存 l1_ttl 秒，失效消息丢失时旧值最多保留这么久
+    """
+
+    def __init__(self, l2: Optional[RedisCache] = None, l1_max_entries: Optional[int] = None,
+                 l1_ttl: Optional[int] = None, channel: Optional[str] = None):
+        """
+        :param l2: redis 缓存，默认按 db_config 创建
+        :param l1_max_entries: L1 最多保存的键数量，默认取 db_config.TIERED_CACHE_L1_MAX_ENTRIES
+        :param l1_ttl: L1 的最长过期时间（秒），默认取 db_config.TIERED_CACHE_L1_TTL
+        :param channel: 失效消息的发布订阅频道，默认取 db_config.TIERED_CACHE_CHANNEL
+        """
+        super().__init__(l1_max_entries, l1_ttl, channel)
+        self._l2 = l2 or RedisCache()
+        self._pubsub = self._l2.redis_client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self._channel: lambda message: self._on_invalidate(message["data"])})
+        self._listener = self._pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.mget([key])[0]
+
+    def set(self, key: str, value: Any, expire_time: int) -> None:
+        self.mset({key: value}, expire_time)
+
+    def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """
+        批量获取，L1 未命中的键通过一次 pipeline 从 L2 读取并写入 L1
+        :param keys:
+        :return:
+        """
+        values = self._l1_get_many(keys)
+        missing_keys = [key for key, value in zip(keys, values) if value is None]
+        if not missing_keys:
+            return values
+        versions = self._begin_fill(missing_keys)
+        try:
+            found = self._fill_from_l2(missing_keys, self._l2.mget_with_ttl(missing_keys), versions)
+        finally:
+            self._end_fill(missing_keys)
+        return [found.get(key) if value is None else value for key, value in zip(keys, values)]
+
+    def mset(self, mapping: Dict[str, Any], expire_time: int) -> None:
+        """
+        写入 L2 和 L1，并通知其他进程删除 L1 中的旧值
+        :param mapping:
+        :param expire_time:
+        :return:
+        """
+        if not mapping:
+            return
+        self._l2.mset(mapping, expire_time)
+        self._l1_set_many([(key, value, expire_time) for key, value in mapping.items()])
+        self._l2.redis_client.publish(self._channel, self._invalidation_message(list(mapping)))
+
+    def delete(self, keys: List[str]) -> None:
+        """
+        删除 L2 和所有进程 L1 中的键
+        :param keys:
+        :return:
+        """
+        if not keys:
+            return
+        self._l2.delete(keys)
+        self._l1_delete_many(keys)
+        self._l2.redis_client.publish(self._channel, self._invalidation_message(keys))
+
+    def keys(self, pattern: str) -> List[str]:
+        """
+        L1 只保存部分键，按 L2 中的键查询，查询结果在本进程中缓存；
+        缓存的结果可能包含 L2 中已经过期的键，mget 这些键时返回 None
+        """
+        keys, generation = self._l1_keys(pattern)
+        if keys is None:
+            keys = self._l2.keys(pattern)
+            self._l1_store_keys(pattern, keys, generation)
+        return keys
+
+    def close(self):
+        # 订阅线程退出时会关闭 pubsub 连接
+        self._listener.stop()
+        self._listener.join(timeout=2)
+
+
+class AsyncTieredCache(_TieredL1, AbstractAsyncCache):
+    """
+    异步二级缓存，第一次使用时在当前事件循环中订阅失效消息；
+    L1 只保存最近读写过的热点数据，L1 中的值最长保存 l1_ttl 秒，失效消息丢失时旧值最多保留这么久
+    """
+
+    def __init__(self, l2: Optional[AsyncRedisCache] = None, l1_max_entries: Optional[int] = None,
+                 l1_ttl: Optional[int] = None, channel: Optional[str] = None):
+        """
+        :param l2: 异步 redis 缓存，默认按 db_config 创建
+        :param l1_max_entries: L1 最多保存的键数量，默认取 db_config.TIERED_CACHE_L1_MAX_ENTRIES
+        :param l1_ttl: L1 的最长过期时间（秒），默认取 db_config.TIERED_CACHE_L1_TTL
+        :param channel: 失效消息的发布订阅频道，默认取 db_config.TIERED_CACHE_CHANNEL
+        """
+        super().__init__(l1_max_entries, l1_ttl, channel)
+        self._l2 = l2 or AsyncRedisCache()
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def _ensure_subscribed(self):
+        if self._pubsub is not None:
+            return
+        self._pubsub = self._l2.redis_client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self._channel)
+        self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message["type"] == "message":
+                        self._on_invalidate(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                utils.logger.error(f"[AsyncTieredCache._listen] subscribe {self._channel} error: {ex}")
+                await asyncio.sleep(1)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return (await self.mget([key]))[0]
+
+    async def set(self, key: str, value: Any, expire_time: int) -> None:
+        await self.mset({key: value}, expire_time)
+
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """
+        批量获取，L1 未命中的键通过一次 pipeline 从 L2 读取并写入 L1
+        :param keys:
+        :return:
+        """
+        await self._ensure_subscribed()
+        values = self._l1_get_many(keys)
+        missing_keys = [key for key, value in zip(keys, values) if value is None]
+        if not missing_keys:
+            return values
+        versions = self._begin_fill(missing_keys)
+        try:
+            found = self._fill_from_l2(missing_keys, await self._l2.mget_with_ttl(missing_keys), versions)
+        finally:
+            self._end_fill(missing_keys)
+        return [found.get(key) if value is None else value for key, value in zip(keys, values)]
+
+    async def mset(self, mapping: Dict[str, Any], expire_time: int) -> None:
+        """
+        写入 L2 和 L1，并通知其他进程删除 L1 中的旧值
+        :param mapping:
+        :param expire_time:
+        :return:
+        """
+        if not mapping:
+            return
+        await self._ensure_subscribed()
+        await self._l2.mset(mapping, expire_time)
+        self._l1_set_many([(key, value, expire_time) for key, value in mapping.items()])
+        await self._l2.redis_client.publish(self._channel, self._invalidation_message(list(mapping)))
+
+    async def delete(self, keys: List[str]) -> None:
+        """
+        删除 L2 和所有进程 L1 中的键
+        :param keys:
+        :return:
+        """
+        if not keys:
+            return
+        await self._l2.delete(keys)
+        self._l1_delete_many(keys)
+        await self._l2.redis_client.publish(self._channel, self._invalidation_message(keys))
+
+    async def keys(self, pattern: str) -> List[str]:
+        """
+        L1 只保存部分键，按 L2 中的键查询，查询结果在本进程中缓存；
+        缓存的结果可能包含 L2 中已经过期的键，mget 这些键时返回 None
+        """
+        await self._ensure_subscribed()
+        keys, generation = self._l1_keys(pattern)
+        if keys is None:
+            keys = await self._l2.keys(pattern)
+            self._l1_store_keys(pattern, keys, generation)
+        return keys
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.close()
+            self._pubsub = None
+        await self._l2.close()
@@ -36,6 +36,44 @@ IP_PROXY_POOL_COUNT = 2
 # 代理IP提供商名称
 IP_PROXY_PROVIDER_NAME = "kuaidaili"
 
+# 代理IP验证的超时时间，单位秒，超时的代理视为无效
+IP_PROXY_VALIDATE_TIMEOUT = 5
+
+# 同时验证的代理IP数量
+IP_PROXY_VALIDATE_CONCURRENCY = 10
+
+# 代理IP距离过期时间小于该秒数时不再使用，后台提前补充新的代理
+IP_PROXY_EXPIRE_MARGIN_SEC = 30
+
+# 代理池为空时获取代理最多等待的秒数
+IP_PROXY_GET_TIMEOUT = 60
+
+# 后台补充代理失败（代理商报错或没有可用代理）时按指数退避重试，从 1 秒开始，最多间隔的秒数
+IP_PROXY_REFILL_MAX_BACKOFF_SEC = 60
+
+# 代理IP请求延迟 EWMA 的平滑系数，越大越偏向最近的请求
+PROXY_HEALTH_EWMA_ALPHA = 0.3
+
+# 代理IP连续失败多少次后隔离
+PROXY_HEALTH_MAX_CONSECUTIVE_FAILURES = 3
+
+# 代理IP连续失败、被平台封禁或出现验证码后隔离的秒数，隔离期间不会被代理池选中
+PROXY_QUARANTINE_SEC = 300
+
+# 每个代理IP保留最近多少次请求的延迟，用于统计 p95 延迟
+PROXY_HEALTH_LATENCY_WINDOW = 100
+
+# 代理IP轮换策略：session 整个运行期间使用同一个代理，request 每次请求更换代理，
+# every_n 每 IP_PROXY_ROTATE_EVERY_N 次请求更换代理，on_block 代理被封禁或连续失败（被隔离）后更换代理；
+# request、every_n 在代理被隔离时也会立即更换，浏览器始终使用启动时的代理
+IP_PROXY_ROTATION = "session"
+
+# every_n 策略下每个代理使用的请求次数
+IP_PROXY_ROTATE_EVERY_N = 20
+
+# 按代理复用的 HTTP 客户端最多保留的数量，超出时关闭最久未使用的客户端，复用客户端可以复用已建立的连接
+HTTP_CLIENT_POOL_SIZE = 16
+
 # 设置为True不会打开浏览器（无头浏览器）
 # 设置False会打开一个浏览器
 # 小红书如果一直扫码登录不通过，打开浏览器手动过一下滑动验证码
@@ -45,8 +83,39 @@ HEADLESS = False
 # 是否保存登录状态
 SAVE_LOGIN_STATE = True
 
-# 数据保存类型选项配置,支持三种类型：csv、db、json, 最好保存到DB，有排重的功能。
-SAVE_DATA_OPTION = "json"  # csv or db or json
+# 数据保存类型选项配置,支持六种类型：csv、db、sqlite、json、jsonl、parquet, 最好保存到DB，有排重的功能。
+# db 为 mysql；单机部署不想安装 mysql 时可以使用 sqlite（数据库文件路径见 db_config.SQLITE_DB_PATH），表结构与 mysql 相同
+# 数据量大时建议使用 jsonl，每条数据追加一行，json 每保存一条都要重写整个文件
+# parquet 为列式压缩存储，便于数据分析（需要安装 pyarrow），按 data/parquet/platform=xx/crawler_type=xx/store_type=xx/date=xx 分区
+SAVE_DATA_OPTION = "json"  # csv or db or sqlite or json or jsonl or parquet
+
+# jsonl 存储在程序退出时是否额外转换生成 json 数组文件（data/{platform}/json 目录下）
+JSONL_FINALIZE_TO_JSON = False
+
+# 文件类存储（csv、jsonl）缓冲区的数据条数达到该值时写入文件
+FILE_WRITER_FLUSH_SIZE = 100
+
+# 文件类存储（csv、jsonl）缓冲区距上次写入文件超过该秒数时写入文件
+FILE_WRITER_FLUSH_INTERVAL_SEC = 5
+
+# parquet 存储每个 row group 的数据条数，数据在内存中攒够该条数后写入文件，程序退出时写入剩余数据
+PARQUET_ROW_GROUP_SIZE = 10000
+
+# parquet 存储的压缩算法，snappy、zstd、gzip 或 none
+PARQUET_COMPRESSION = "snappy"
+
+# 是否开启异步写入缓冲，开启后爬取协程只把数据放入队列，由后台任务按表批量写入存储，程序退出（包括Ctrl+C）时写完队列中剩余的数据；
+# 写入失败的数据保留在内存中重试，程序退出时仍未写入会报错
+ENABLE_WRITE_BEHIND_STORE = False
+
+# 异步写入队列的最大长度，存储写入跟不上导致队列写满时，爬取协程会等待
+WRITE_BEHIND_QUEUE_SIZE = 1000
+
+# 异步写入每批最多写入的数据条数
+WRITE_BEHIND_BATCH_SIZE = 100
+
+# 异步写入队列中的数据最多等待多少秒写入存储
+WRITE_BEHIND_FLUSH_INTERVAL_SEC = 2
 
 # 用户浏览器缓存的浏览器文件配置
 USER_DATA_DIR = "%s_user_data_dir"  # %s will be replaced by platform name
@@ -60,6 +129,33 @@ CRAWLER_MAX_NOTES_COUNT = 200
 # 并发爬虫数量控制
 MAX_CONCURRENCY_NUM = 1
 
+# 同一平台每秒最多发起的请求数，所有并发任务共享该限速；None 表示使用下面该平台的默认限速，0 表示不限速
+PLATFORM_MAX_REQUESTS_PER_SEC = None
+
+# 各平台默认的每秒请求数，取值偏保守，避免并发展开评论时请求过快触发风控
+PLATFORM_DEFAULT_MAX_REQUESTS_PER_SEC = {
+    "xhs": 1,
+    "dy": 1,
+    "ks": 1,
+    "bili": 2,
+    "wb": 1,
+    "tieba": 1,
+    "zhihu": 1,
+}
+
+# 平台限速器允许的突发请求数
+PLATFORM_REQUESTS_BURST = 1
+
+# 二级评论展开的并发数，即同时展开多少条一级评论下的二级评论（单条一级评论内部仍按顺序翻页），
+# 平台不限速（PLATFORM_MAX_REQUESTS_PER_SEC = 0）时不并发展开
+MAX_SUB_COMMENT_CONCURRENCY_NUM = 3
+
+# 创作者模式下同时处理的创作者数量，每个创作者的信息、帖子和评论作为一个整体任务，所有创作者共享平台限速
+MAX_CREATOR_CONCURRENCY_NUM = 1
+
+# 创作者主页帖子列表翻页时最多预取的页数，处理当前页的详情和评论时后台提前请求下一页
+CREATOR_PAGE_PREFETCH_NUM = 1
+
 # 是否开启爬图片模式, 默认不开启爬图片
 ENABLE_GET_IMAGES = False
 
@@ -73,6 +169,70 @@ CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES = 10
 # 老版本项目使用了 db, 则需参考 schema/tables.sql line 287 增加表字段
 ENABLE_GET_SUB_COMMENTS = False
 
+# 是否开启已爬取内容过滤（跨关键词、跨运行），开启后在新鲜度窗口内爬过的帖子/视频不再重复获取详情和评论，
+# 只记录新的来源关键词关联（data/{platform}/seen/source_keyword.jsonl），暂时只支持XHS和抖音
+ENABLE_SEEN_FILTER = False
+
+# 已爬取内容的新鲜度窗口，单位天（按天分桶，0 表示只过滤当天已爬取的内容）
+SEEN_FILTER_FRESHNESS_DAYS = 1
+
+# 每天的已爬取内容超过该数量后，从精确集合转为布隆过滤器存储以节省内存
+SEEN_FILTER_EXACT_LIMIT = 10000
+
+# 是否开启记录内容指纹过滤，开启后每条数据按业务字段（不含 last_modify_ts、add_ts）计算指纹，
+# 与该记录（按业务ID）上次写入的内容完全相同时不再写入存储，适合每天重复爬取的场景；
+# 指纹按存储方式分别保存在 data/{platform}/fingerprint/{SAVE_DATA_OPTION} 目录下，切换存储方式后首次运行会完整写入；
+# 注意 csv、json 等按天生成文件的存储开启后，当天的文件中不会包含没有变化的记录
+ENABLE_RECORD_FINGERPRINT = False
+
+# 不参与指纹计算的字段，例如每次请求都会变化的带签名的图片地址
+FINGERPRINT_IGNORE_FIELDS = []
+
+# 是否开启本地全文索引，开启后内容的标题、描述和评论内容在存储时使用 jieba 分词写入 SQLite FTS5 索引，
+# 使用 python -m tools.search_index 关键词 检索已爬取的内容和评论
+ENABLE_SEARCH_INDEX = False
+
+# 全文索引文件路径，所有平台共用
+SEARCH_INDEX_DB_PATH = "data/search_index.db"
+
+# 是否开启评论增量爬取，开启后会在 data/{platform}/comment_watermark.json 中记录每个内容的评论水位线（最新评论ID/时间、最后游标），
+# 再次爬取时只获取新评论。B站、知乎按时间倒序翻页遇到已爬取评论即停止，贴吧从上次爬到的页码继续；
+# 其他平台的评论接口只支持热度排序，暂不支持增量
+ENABLE_INCREMENTAL_COMMENTS = False
+
+# 是否开启详情接口的响应缓存，开启后帖子/视频详情、创作者信息等幂等接口在过期时间内重复请求时直接返回缓存的结果，
+# 不再签名和请求平台；缓存键由接口名和参数组成（不含 wts、w_rid、a_bogus、X-s、xsec_token 等每次变化的签名参数）
+ENABLE_RESPONSE_CACHE = False
+
+# 响应缓存类型，memory 只在本次运行中有效，redis、tiered 可以在多次运行、多个进程之间共享
+RESPONSE_CACHE_TYPE = "memory"
+
+# 响应缓存默认过期时间，单位秒
+RESPONSE_CACHE_DEFAULT_TTL = 3600
+
+# 按接口设置的响应缓存过期时间，单位秒，0 表示该接口不缓存，未设置的接口使用 RESPONSE_CACHE_DEFAULT_TTL
+RESPONSE_CACHE_TTLS = {
+    "xhs.get_note_by_id": 3600,
+    "xhs.get_creator_info": 6 * 3600,
+    "dy.get_video_by_id": 3600,
+    "dy.get_user_info": 6 * 3600,
+    "ks.get_video_info": 3600,
+    "ks.get_creator_profile": 6 * 3600,
+    "bili.get_video_info": 3600,
+    "wb.get_note_info_by_id": 3600,
+    "wb.get_creator_info_by_id": 6 * 3600,
+}
+
+# HTTP 请求录制/回放模式，record 表示录制各平台客户端的请求和响应，replay 表示不访问平台直接回放录制的响应（离线测试），空表示关闭；
+# 录制文件保存在 {HTTP_CASSETTE_DIR}/{平台}.jsonl.gz，请求按 URL 和请求体匹配，忽略签名参数
+HTTP_CASSETTE_MODE = ""
+
+# 录制文件目录
+HTTP_CASSETTE_DIR = "data/cassettes"
+
+# 回放时模拟的每个请求的耗时，单位秒，-1 表示按录制时的实际耗时
+HTTP_CASSETTE_REPLAY_LATENCY = 0
+
 # 已废弃⚠️⚠️⚠️指定小红书需要爬虫的笔记ID列表
 # 已废弃⚠️⚠️⚠️ 指定笔记ID笔记列表会因为缺少xsec_token和xsec_source参数导致爬取失败
 # XHS_SPECIFIED_ID_LIST = [
@@ -17,6 +17,11 @@ RELATION_DB_USER = os.getenv("RELATION_DB_USER", "root")
 RELATION_DB_HOST = os.getenv("RELATION_DB_HOST", "localhost")
 RELATION_DB_PORT = os.getenv("RELATION_DB_PORT", 3306)
 RELATION_DB_NAME = os.getenv("RELATION_DB_NAME", "media_crawler")
+RELATION_DB_POOL_MIN_SIZE = int(os.getenv("RELATION_DB_POOL_MIN_SIZE", 1))  # 连接池最小连接数
+RELATION_DB_POOL_MAX_SIZE = int(os.getenv("RELATION_DB_POOL_MAX_SIZE", 10))  # 连接池最大连接数
+
+# sqlite config
+SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "data/media_crawler.db")  # sqlite 数据库文件路径
 
 
 # redis config
@@ -24,7 +29,27 @@ REDIS_DB_HOST = "127.0.0.1"  # your redis host
 REDIS_DB_PWD = os.getenv("REDIS_DB_PWD", "123456")  # your redis password
 REDIS_DB_PORT = os.getenv("REDIS_DB_PORT", 6379)  # your redis port
 REDIS_DB_NUM = os.getenv("REDIS_DB_NUM", 0)  # your redis db num
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 20))  # 异步 redis 连接池最大连接数
 
 # cache type
 CACHE_TYPE_REDIS = "redis"
-CACHE_TYPE_MEMORY = "memory"
\ No newline at end of file
+CACHE_TYPE_MEMORY = "memory"
+CACHE_TYPE_TIERED = "tiered"  # 进程内本地缓存（L1）+ redis（L2），多个进程之间通过 redis 发布订阅同步失效
+
+# 二级缓存中本地缓存（L1）最多保存的键数量
+TIERED_CACHE_L1_MAX_ENTRIES = int(os.getenv("TIERED_CACHE_L1_MAX_ENTRIES", 10000))
+# 本地缓存（L1）的最长过期时间（秒），失效消息丢失（如 redis 重连）时本地数据最多延迟这么久更新
+TIERED_CACHE_L1_TTL = int(os.getenv("TIERED_CACHE_L1_TTL", 60))
+# 缓存失效消息的发布订阅频道
+TIERED_CACHE_CHANNEL = os.getenv("TIERED_CACHE_CHANNEL", "media_crawler:cache:invalidate")
+
+# redis 缓存值的序列化方式：json、msgpack（需要安装 msgpack）、pickle（可以保存任意 Python 对象，其他语言无法读取）
+CACHE_SERIALIZER = os.getenv("CACHE_SERIALIZER", "json")
+# 序列化后超过该字节数的缓存值使用 zlib 压缩，0 表示不压缩
+CACHE_COMPRESS_THRESHOLD = int(os.getenv("CACHE_COMPRESS_THRESHOLD", 1024))
+
+# 代理IP缓存类型，memory、redis 或 tiered，使用 redis 时未过期的代理IP可以在多次运行之间复用
+PROXY_IP_CACHE_TYPE = os.getenv("PROXY_IP_CACHE_TYPE", CACHE_TYPE_MEMORY)
+
+# 本地缓存最多保存的键数量，超出时淘汰最久未访问的键，0 表示不限制
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", 100000))
\ No newline at end of file
@@ -13,15 +13,20 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2024/4/6 14:54
 # @Desc    : mediacrawler db 管理
+import argparse
 import asyncio
-from typing import Dict
+import hashlib
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import aiofiles
 import aiomysql
 
 import config
-from async_db import AsyncMysqlDB
+from async_db import AsyncMysqlDB, AsyncSqliteDB
 from tools import utils
 from var import db_conn_pool_var, media_crawler_db_var
 
@@ -38,6 +43,8 @@ async def init_mediacrawler_db():
         user=config.RELATION_DB_USER,
         password=config.RELATION_DB_PWD,
         db=config.RELATION_DB_NAME,
+        minsize=config.RELATION_DB_POOL_MIN_SIZE,
+        maxsize=config.RELATION_DB_POOL_MAX_SIZE,
         autocommit=True,
     )
     async_db_obj = AsyncMysqlDB(pool)
@@ -47,6 +54,116 @@ async def init_mediacrawler_db():
     media_crawler_db_var.set(async_db_obj)
 
 
+def _split_sql_items(body: str) -> List[str]:
+    """
+    按最外层的逗号拆分建表语句中的字段和索引定义
+    """
+    items, depth, in_quote, current = [], 0, False, []
+    for char in body:
+        if char == "'":
+            in_quote = not in_quote
+        elif not in_quote and char == "(":
+            depth += 1
+        elif not in_quote and char == ")":
+            depth -= 1
+        elif not in_quote and depth == 0 and char == ",":
+            items.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    if "".join(current).strip():
+        items.append("".join(current).strip())
+    return items
+
+
+def _mysql_column_to_sqlite(column_def: str) -> Tuple[str, str]:
+    """
+    将 mysql 的字段定义转换为 sqlite 的字段定义，只保留类型、非空和默认值
+    """
+    column_def = re.split(r"\s+comment\s+'", column_def, flags=re.I)[0]
+    m = re.match(r"`?(\w+)`?\s+(\w+)(?:\([\d,\s]+\))?(.*)$", column_def.strip(), re.S)
+    name, column_type, options = m.group(1), m.group(2).lower(), m.group(3)
+    if "auto_increment" in options.lower():
+        return name, f"`{name}` INTEGER PRIMARY KEY AUTOINCREMENT"
+    sqlite_type = "INTEGER" if column_type in ("int", "bigint", "tinyint", "smallint") else "TEXT"
+    sqlite_def = f"`{name}` {sqlite_type}"
+    if re.search(r"not\s+null", options, re.I):
+        sqlite_def += " NOT NULL"
+    default = re.search(r"default\s+('[^']*'|\S+)", options, re.I)
+    if default:
+        sqlite_def += f" DEFAULT {default.group(1)}"
+    return name, sqlite_def
+
+
+def mysql_schema_to_sqlite(schema_sql: str) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    将 schema/tables.sql 中的 mysql 建表语句（包括后续的 alter table add column）转换为 sqlite 的建表和建索引语句
+    Args:
+        schema_sql: mysql 表结构
+
+    Returns:
+        (sqlite ddl 列表, 表名 -> 唯一键字段)
+    """
+    schema_sql = "\n".join([line for line in schema_sql.splitlines() if not line.strip().startswith("--")])
+    tables: Dict[str, Dict[str, str]] = {}
+    indexes: Dict[str, List[Tuple[bool, str, str]]] = {}
+    unique_keys: Dict[str, List[str]] = {}
+    for statement in schema_sql.split(";"):
+        statement = statement.strip()
+        create = re.match(r"create\s+table\s+`?(\w+)`?\s*\((.*)\)[^)]*$", statement, re.I | re.S)
+        if create:
+            table_name, columns = create.group(1), {}
+            for item in _split_sql_items(create.group(2)):
+                key = re.match(r"(unique\s+)?key\s+`?(\w+)`?\s*\((.*)\)", item, re.I | re.S)
+                if key:
+                    fields = [field.strip(" `") for field in key.group(3).split(",")]
+                    indexes.setdefault(table_name, []).append((bool(key.group(1)), key.group(2), ",".join(fields)))
+                    if key.group(1) and table_name not in unique_keys:
+                        unique_keys[table_name] = fields
+                elif not re.match(r"primary\s+key", item, re.I):
+                    name, sqlite_def = _mysql_column_to_sqlite(item)
+                    columns[name] = sqlite_def
+            tables[table_name] = columns
+            continue
+        alter = re.match(r"alter\s+table\s+`?(\w+)`?\s+add\s+column\s+(.*)$", statement, re.I | re.S)
+        if alter and alter.group(1) in tables:
+            name, sqlite_def = _mysql_column_to_sqlite(alter.group(2))
+            tables[alter.group(1)][name] = sqlite_def
+
+    ddl_list = []
+    for table_name, columns in tables.items():
+        ddl_list.append("CREATE TABLE IF NOT EXISTS `%s` (\n    %s\n)" % (table_name, ",\n    ".join(columns.values())))
+        for unique, index_name, fields in indexes.get(table_name, []):
+            ddl_list.append("CREATE %sINDEX IF NOT EXISTS `%s_%s` ON `%s` (%s)" % (
+                "UNIQUE " if unique else "", table_name, index_name, table_name, fields))
+    return ddl_list, unique_keys
+
+
+async def init_sqlite_db():
+    """
+    初始化 sqlite 数据库对象，表结构由 schema/tables.sql 转换生成，已有的表会补齐缺少的字段
+    Returns:
+
+    """
+    async with aiofiles.open("schema/tables.sql", mode="r", encoding="utf-8") as f:
+        ddl_list, unique_keys = mysql_schema_to_sqlite(await f.read())
+    async_db_obj = AsyncSqliteDB(config.SQLITE_DB_PATH, unique_keys=unique_keys)
+    await async_db_obj.executescript(";\n".join(ddl_list) + ";")
+
+    # 老版本创建的表缺少后续新增的字段，按 schema 补齐
+    for ddl in ddl_list:
+        create = re.match(r"CREATE TABLE IF NOT EXISTS `(\w+)` \(\n(.*)\n\)", ddl, re.S)
+        if not create:
+            continue
+        existing_columns = {row["name"] for row in await async_db_obj.query(f"PRAGMA table_info(`{create.group(1)}`)")}
+        for column_def in create.group(2).split(",\n"):
+            column_name = re.match(r"\s*`(\w+)`", column_def).group(1)
+            if column_name not in existing_columns:
+                column_def = re.sub(r" NOT NULL", "", column_def.strip())
+                await async_db_obj.execute(f"ALTER TABLE `{create.group(1)}` ADD COLUMN {column_def}")
+    media_crawler_db_var.set(async_db_obj)
+
+
 async def init_db():
     """
     初始化db连接池
@@ -54,7 +171,10 @@ async def init_db():
 
     """
     utils.logger.info("[init_db] start init mediacrawler db connect object")
-    await init_mediacrawler_db()
+    if config.SAVE_DATA_OPTION == "sqlite":
+        await init_sqlite_db()
+    else:
+        await init_mediacrawler_db()
     utils.logger.info("[init_db] end init mediacrawler db connect object")
 
 
@@ -65,26 +185,213 @@ async def close():
 
     """
     utils.logger.info("[close] close mediacrawler db pool")
+    if config.SAVE_DATA_OPTION == "sqlite":
+        await media_crawler_db_var.get().close()
+        return
     db_pool: aiomysql.Pool = db_conn_pool_var.get()
     if db_pool is not None:
         db_pool.close()
 
 
-async def init_table_schema():
+MIGRATIONS_DIR = "schema/migrations"
+# schema/tables.sql 对应的迁移版本，修改 tables.sql 时同步新增迁移并更新该版本号
+TABLES_SQL_VERSION = 4
+# 按年分区的评论表及 create_time 的单位（秒为 1，毫秒为 1000）
+PARTITIONED_COMMENT_TABLES = {
+    "bilibili_video_comment": 1,
+    "douyin_aweme_comment": 1,
+    "kuaishou_video_comment": 1000,
+    "weibo_note_comment": 1,
+    "xhs_note_comment": 1000,
+}
+# 分区边界按北京时间的年初计算
+_PARTITION_TZ = timezone(timedelta(hours=8))
+
+
+def split_sql_statements(sql: str) -> List[str]:
+    """
+    去掉注释行后按分号拆分 sql 语句
+    Args:
+        sql: sql 文件内容
+
+    Returns:
+
     """
-    用来初始化数据库表结构，请在第一次需要创建表结构的时候使用，多次执行该函数会将已有的表以及数据全部删除
+    sql = "\n".join([line for line in sql.splitlines() if not line.strip().startswith("--")])
+    return [statement.strip() for statement in sql.split(";") if statement.strip()]
+
+
+def load_migrations(migrations_dir: str = MIGRATIONS_DIR) -> List[Tuple[int, str, str]]:
+    """
+    读取迁移目录下的 {版本号}_{名称}.sql 文件，按版本号排序
+    Args:
+        migrations_dir: 迁移文件目录
+
+    Returns:
+        [(版本号, 名称, sql 内容)]
+    """
+    migrations = []
+    for file_name in os.listdir(migrations_dir):
+        match = re.match(r"^(\d+)_(\w+)\.sql$", file_name)
+        if not match:
+            continue
+        with open(os.path.join(migrations_dir, file_name), "r", encoding="utf-8") as f:
+            migrations.append((int(match.group(1)), match.group(2), f.read()))
+    migrations.sort(key=lambda migration: migration[0])
+    versions = [migration[0] for migration in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"[load_migrations] duplicate migration version in {migrations_dir}: {versions}")
+    return migrations
+
+
+def year_partition_bound(year: int, unit: int = 1) -> int:
+    """
+    p{year} 分区的上界：下一年年初的时间戳
+    Args:
+        year: 分区年份
+        unit: 时间戳单位，秒为 1，毫秒为 1000
+
+    Returns:
+
+    """
+    return int(datetime(year + 1, 1, 1, tzinfo=_PARTITION_TZ).timestamp()) * unit
+
+
+def build_add_partitions_sql(table: str, unit: int, last_year: int, until_year: int) -> Optional[str]:
+    """
+    生成把 pmax 分区拆分出 last_year 之后到 until_year 的年分区的 sql
+    Args:
+        table: 表名
+        unit: create_time 的单位，秒为 1，毫秒为 1000
+        last_year: 已有的最后一个年分区
+        until_year: 需要有分区的最后一年
+
+    Returns:
+        不需要新增分区时返回 None
+    """
+    if until_year <= last_year:
+        return None
+    partitions = [f"PARTITION p{year} VALUES LESS THAN ({year_partition_bound(year, unit)})"
+                  for year in range(last_year + 1, until_year + 1)]
+    partitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return f"ALTER TABLE `{table}` REORGANIZE PARTITION pmax INTO ({', '.join(partitions)})"
+
+
+async def ensure_comment_partitions(async_db_obj: AsyncMysqlDB, years_ahead: int = 1, status_only: bool = False):
+    """
+    按当前日期为分区的评论表补齐到 (今年 + years_ahead) 的年分区，避免新的评论都写入 pmax 分区；
+    需要定期执行（例如每月执行一次 python db.py），已有的分区不会变化
+    Args:
+        async_db_obj: 数据库对象
+        years_ahead: 提前创建几年的分区
+        status_only: 只输出需要新增的分区，不执行
+
+    Returns:
+
+    """
+    until_year = datetime.now(_PARTITION_TZ).year + years_ahead
+    for table, unit in PARTITIONED_COMMENT_TABLES.items():
+        rows = await async_db_obj.query(
+            "SELECT `PARTITION_NAME` FROM information_schema.PARTITIONS "
+            "WHERE `TABLE_SCHEMA` = DATABASE() AND `TABLE_NAME` = %s AND `PARTITION_NAME` IS NOT NULL", table)
+        years = [int(row["PARTITION_NAME"][1:]) for row in rows if re.match(r"^p\d{4}$", row["PARTITION_NAME"])]
+        if not years:
+            continue
+        sql = build_add_partitions_sql(table, unit, max(years), until_year)
+        if sql is None:
+            continue
+        if status_only:
+            utils.logger.info(f"[ensure_comment_partitions] {table}: partitions {max(years) + 1}-{until_year} pending")
+            continue
+        utils.logger.info(f"[ensure_comment_partitions] {table}: add partitions {max(years) + 1}-{until_year}")
+        await async_db_obj.execute(sql)
+
+
+async def _detect_unversioned_version(async_db_obj: AsyncMysqlDB) -> int:
+    """
+    没有迁移记录的数据库已有的迁移版本：没有表时为 0；评论表已经分区说明是用当前的 schema/tables.sql 建的表，
+    为 TABLES_SQL_VERSION；否则是之前执行旧版本 tables.sql 建的表，只有基线版本
+    Args:
+        async_db_obj: 数据库对象
+
+    Returns:
+
+    """
+    if await async_db_obj.get_first("SHOW TABLES LIKE %s", "xhs_note") is None:
+        return 0
+    partitioned = await async_db_obj.get_first(
+        "SELECT 1 FROM information_schema.PARTITIONS "
+        "WHERE `TABLE_SCHEMA` = DATABASE() AND `TABLE_NAME` = %s AND `PARTITION_NAME` IS NOT NULL LIMIT 1",
+        "xhs_note_comment")
+    return TABLES_SQL_VERSION if partitioned is not None else 1
+
+
+async def migrate_schema(status_only: bool = False, years_ahead: int = 1):
+    """
+    按版本号依次执行 schema/migrations 下尚未执行的迁移，已执行的版本记录在 schema_migrations 表中，
+    不会删除已有的表和数据；已有表但没有迁移记录的数据库按表结构判断已有的版本并直接标记为已执行，
+    最后按当前日期补齐评论表的年分区
+    Args:
+        status_only: 只输出迁移状态，不执行
+        years_ahead: 提前创建几年的评论表分区
+
     Returns:
 
     """
-    utils.logger.info("[init_table_schema] begin init mysql table schema ...")
     await init_mediacrawler_db()
     async_db_obj: AsyncMysqlDB = media_crawler_db_var.get()
-    async with aiofiles.open("schema/tables.sql", mode="r", encoding="utf-8") as f:
-        schema_sql = await f.read()
-        await async_db_obj.execute(schema_sql)
-        utils.logger.info("[init_table_schema] mediacrawler table schema init successful")
-        await close()
+    try:
+        await async_db_obj.execute(
+            "CREATE TABLE IF NOT EXISTS `schema_migrations` ("
+            "`version` int NOT NULL PRIMARY KEY, `name` varchar(255) NOT NULL, "
+            "`checksum` char(64) NOT NULL, `applied_at` bigint NOT NULL"
+            ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"
+        )
+        applied = {row["version"]: row for row in await async_db_obj.query(
+            "SELECT `version`, `name`, `checksum` FROM `schema_migrations`")}
+        migrations = load_migrations()
+
+        existing_version = 0 if applied else await _detect_unversioned_version(async_db_obj)
+
+        for version, name, sql in migrations:
+            checksum = hashlib.sha256(sql.encode("utf-8")).hexdigest()
+            if version <= existing_version:
+                utils.logger.info(f"[migrate_schema] existing tables found, mark {version}_{name} as applied")
+                if not status_only:
+                    await async_db_obj.execute(
+                        "INSERT INTO `schema_migrations` (`version`, `name`, `checksum`, `applied_at`) "
+                        "VALUES (%s, %s, %s, %s)", version, name, checksum, utils.get_current_timestamp())
+                continue
+            if version in applied:
+                if applied[version]["name"] != name:
+                    raise ValueError(f"[migrate_schema] version {version} was applied as {applied[version]['name']}, "
+                                     f"but the migration file is {version}_{name}")
+                if applied[version]["checksum"] != checksum:
+                    utils.logger.warning(f"[migrate_schema] migration {version}_{name} changed after it was applied")
+                utils.logger.info(f"[migrate_schema] {version}_{name}: applied")
+                continue
+            if status_only:
+                utils.logger.info(f"[migrate_schema] {version}_{name}: pending")
+                continue
+            utils.logger.info(f"[migrate_schema] applying {version}_{name} ...")
+            for statement in split_sql_statements(sql):
+                await async_db_obj.execute(statement)
+            await async_db_obj.execute(
+                "INSERT INTO `schema_migrations` (`version`, `name`, `checksum`, `applied_at`) "
+                "VALUES (%s, %s, %s, %s)", version, name, checksum, utils.get_current_timestamp())
+            utils.logger.info(f"[migrate_schema] {version}_{name} applied")
+
+        await ensure_comment_partitions(async_db_obj, years_ahead, status_only)
+    finally:
+        db_pool: aiomysql.Pool = db_conn_pool_var.get()
+        db_pool.close()
+        await db_pool.wait_closed()
 
 
 if __name__ == '__main__':
-    asyncio.get_event_loop().run_until_complete(init_table_schema())
+    parser = argparse.ArgumentParser(description="MediaCrawler mysql schema migration")
+    parser.add_argument("--status", action="store_true", help="only show applied and pending migrations")
+    parser.add_argument("--years-ahead", type=int, default=1,
+                        help="create yearly comment table partitions up to this many years after the current year")
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(migrate_schema(status_only=args.status, years_ahead=args.years_ahead))
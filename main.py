@@ -23,6 +23,21 @@ from media_platform.tieba import TieBaCrawler
 from media_platform.weibo import WeiboCrawler
 from media_platform.xhs import XiaoHongShuCrawler
 from media_platform.zhihu import ZhihuCrawler
+from store.bilibili import BiliStoreFactory
+from store.douyin import DouyinStoreFactory
+from store.file_writer import close_all_file_writers
+from store.kuaishou import KuaishouStoreFactory
+from store.tieba import TieBaStoreFactory
+from store.weibo import WeibostoreFactory
+from store.write_behind import close_all_stores
+from store.xhs import XhsStoreFactory
+from store.zhihu import ZhihuStoreFactory
+from tools.comment_watermark import save_all_comment_watermarks
+from tools.http_cassette import save_all_cassettes
+from tools.http_client_pool import close_http_client_pool
+from tools.record_fingerprint import save_all_fingerprint_indexes
+from tools.search_index import close_search_index
+from tools.seen_filter import save_all_seen_filters
 
 
 class CrawlerFactory:
@@ -44,25 +59,58 @@ class CrawlerFactory:
         return crawler_class()
 
 
+STORE_FACTORIES = {
+    "xhs": XhsStoreFactory,
+    "dy": DouyinStoreFactory,
+    "ks": KuaishouStoreFactory,
+    "bili": BiliStoreFactory,
+    "wb": WeibostoreFactory,
+    "tieba": TieBaStoreFactory,
+    "zhihu": ZhihuStoreFactory
+}
+
+
 async def main():
     # parse cmd
     await cmd_arg.parse_cmd()
 
     # init db
-    if config.SAVE_DATA_OPTION == "db":
+    if config.SAVE_DATA_OPTION in ("db", "sqlite"):
         await db.init_db()
 
     crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
-    await crawler.start()
+    try:
+        # 爬取前打开平台的存储，存储不可用时在启动时报错，而不是爬取到一半写入第一条数据时
+        await STORE_FACTORIES[config.PLATFORM].create_store().open()
+        await crawler.start()
+    finally:
+        # 持久化已爬取内容过滤器和评论水位线，下次运行时跳过已爬取的内容和评论
+        save_all_seen_filters()
+        save_all_comment_watermarks()
+        # 先把写入队列中剩余的数据交给存储，再将文件类存储缓冲区中剩余的数据写入文件
+        try:
+            await close_all_stores()
+        finally:
+            await close_all_file_writers()
+            # 指纹在数据写入存储成功后才会记录，需要在关闭存储之后保存
+            save_all_fingerprint_indexes()
+            close_search_index()
+            await close_http_client_pool()
+            save_all_cassettes()
 
-    if config.SAVE_DATA_OPTION == "db":
+    if config.SAVE_DATA_OPTION in ("db", "sqlite"):
         await db.close()
 
     
 
 if __name__ == '__main__':
+    loop = asyncio.get_event_loop()
+    main_task = loop.create_task(main())
     try:
         # asyncio.run(main())
-        asyncio.get_event_loop().run_until_complete(main())
+        loop.run_until_complete(main_task)
     except KeyboardInterrupt:
+        # 取消爬取任务，等待 main 中的 finally 把队列和缓冲区中已爬取的数据写入存储后再退出
+        main_task.cancel()
+        loop.run_until_complete(asyncio.gather(main_task, return_exceptions=True))
         sys.exit()
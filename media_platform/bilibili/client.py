@@ -18,11 +18,15 @@ import json
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlencode
 
-import httpx
 from playwright.async_api import BrowserContext, Page
 
+import config
 from base.base_crawler import AbstractApiClient
 from tools import utils
+from tools.async_util import gather_with_concurrency, get_platform_rate_limiter, sub_comment_concurrency
+from tools.comment_watermark import filter_new_comments, get_comment_watermark_store
+from tools.http_client_pool import pooled_client
+from tools.response_cache import cached_response
 
 from .exception import DataFetchError
 from .field import CommentOrderType, SearchOrderType
@@ -47,7 +51,9 @@ class BilibiliClient(AbstractApiClient):
         self.cookie_dict = cookie_dict
 
     async def request(self, method, url, **kwargs) -> Any:
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        await get_platform_rate_limiter().acquire()
+        proxies = await self.request_proxies()
+        async with pooled_client(proxies) as client:
             response = await client.request(
                 method, url, timeout=self.timeout,
                 **kwargs
@@ -152,6 +158,7 @@ class BilibiliClient(AbstractApiClient):
         }
         return await self.get(uri, post_data)
 
+    @cached_response("bili.get_video_info")
     async def get_video_info(self, aid: Union[int, None] = None, bvid: Union[str, None] = None) -> Dict:
         """
         Bilibli web video detail api, aid 和 bvid任选一个参数
@@ -192,7 +199,7 @@ class BilibiliClient(AbstractApiClient):
         return await self.get(uri, params, enable_params_sign=True)
 
     async def get_video_media(self, url: str) -> Union[bytes, None]:
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        async with pooled_client(self.proxies) as client:
             response = await client.request("GET", url, timeout=self.timeout, headers=self.headers)
             if not response.reason_phrase == "OK":
                 utils.logger.error(f"[BilibiliClient.get_video_media] request {url} err, res:{response.text}")
@@ -238,28 +245,61 @@ class BilibiliClient(AbstractApiClient):
         result = []
         is_end = False
         next_page = 0
+        # 开启增量爬取时按时间倒序翻页，遇到上次已爬取到的评论即停止；上次提前停止时从停止处继续
+        watermark_store = get_comment_watermark_store()
+        watermark = watermark_store.get(video_id) if watermark_store else None
+        order_mode = CommentOrderType.TIME if watermark_store else CommentOrderType.DEFAULT
+        if watermark_store and watermark_store.resume_cursor(video_id):
+            next_page = int(watermark_store.resume_cursor(video_id))
+        newest_comment: Optional[Dict] = None
+        new_comment_count = 0
+        # 本页因为数量限制被截断时，下次从本页重新开始
+        truncated_page: Optional[int] = None
         while not is_end and len(result) < max_count:
-            comments_res = await self.get_video_comments(video_id, CommentOrderType.DEFAULT, next_page)
+            page = next_page
+            comments_res = await self.get_video_comments(video_id, order_mode, next_page)
             cursor_info: Dict = comments_res.get("cursor")
-            comment_list: List[Dict] = comments_res.get("replies", [])
+            comment_list: List[Dict] = comments_res.get("replies") or []
             is_end = cursor_info.get("is_end")
             next_page = cursor_info.get("next")
+            if watermark_store:
+                if newest_comment is None and comment_list:
+                    newest_comment = comment_list[0]
+                comment_list, reach_watermark = filter_new_comments(
+                    comment_list, watermark,
+                    get_comment_id=lambda c: c.get("rpid"),
+                    get_create_time=lambda c: c.get("ctime", 0),
+                )
+                if reach_watermark:
+                    is_end = True
             if is_fetch_sub_comments:
-                for comment in comment_list:
-                    comment_id = comment['rpid']
-                    if (comment.get("rcount", 0) > 0):
-                        {
-                            await self.get_video_all_level_two_comments(
-                                video_id, comment_id, CommentOrderType.DEFAULT, 10, crawl_interval,  callback)
-                        }
+                # 多条一级评论的二级评论并发展开，单条一级评论内部按顺序翻页
+                await gather_with_concurrency(
+                    sub_comment_concurrency(),
+                    *[self.get_video_all_level_two_comments(
+                        video_id, comment['rpid'], CommentOrderType.DEFAULT, 10, crawl_interval, callback)
+                        for comment in comment_list if comment.get("rcount", 0) > 0]
+                )
             if len(result) + len(comment_list) > max_count:
                 comment_list = comment_list[:max_count - len(result)]
+                truncated_page = page
+            new_comment_count += len(comment_list)
             if callback:  # 如果有回调函数，就执行回调函数
                 await callback(video_id, comment_list)
             await asyncio.sleep(crawl_interval)
             if not is_fetch_sub_comments:
                 result.extend(comment_list)
                 continue
+        if watermark_store:
+            # 只有到达水位线或翻到最后一页时水位线才前进，因为 max_count 提前停止时保留原来的水位线
+            watermark_store.finish(
+                video_id,
+                newest_comment_id=newest_comment.get("rpid") if newest_comment else None,
+                newest_create_time=newest_comment.get("ctime", 0) if newest_comment else None,
+                cursor=str(next_page if truncated_page is None else truncated_page),
+                completed=bool(is_end) and truncated_page is None,
+                new_comment_count=new_comment_count,
+            )
         return result
 
     async def get_video_all_level_two_comments(self,
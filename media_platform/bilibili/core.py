@@ -27,8 +27,10 @@ from playwright.async_api import (BrowserContext, BrowserType, Page, async_playw
 import config
 from base.base_crawler import AbstractCrawler
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_rotator import ProxyRotator
 from store import bilibili as bilibili_store
 from tools import utils
+from tools.async_util import CrawlProgress, gather_with_concurrency
 from var import crawler_type_var, source_keyword_var
 
 from .client import BilibiliClient
@@ -48,9 +50,11 @@ class BilibiliCrawler(AbstractCrawler):
 
     async def start(self):
         playwright_proxy_format, httpx_proxy_format = None, None
+        proxy_rotator: Optional[ProxyRotator] = None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
+            proxy_rotator = ProxyRotator(ip_proxy_pool, ip_proxy_info)
             playwright_proxy_format, httpx_proxy_format = self.format_proxy_info(
                 ip_proxy_info)
 
@@ -70,6 +74,7 @@ class BilibiliCrawler(AbstractCrawler):
 
             # Create a client to interact with the xiaohongshu website.
             self.bili_client = await self.create_bilibili_client(httpx_proxy_format)
+            self.bili_client.proxy_rotator = proxy_rotator
             if not await self.bili_client.pong():
                 login_obj = BilibiliLogin(
                     login_type=config.LOGIN_TYPE,
@@ -89,8 +94,7 @@ class BilibiliCrawler(AbstractCrawler):
                 # Get the information and comments of the specified post
                 await self.get_specified_videos(config.BILI_SPECIFIED_ID_LIST)
             elif config.CRAWLER_TYPE == "creator":
-                for creator_id in config.BILI_CREATOR_ID_LIST:
-                    await self.get_creator_videos(int(creator_id))
+                await self.get_creators_videos()
             else:
                 pass
             utils.logger.info(
@@ -261,6 +265,18 @@ class BilibiliCrawler(AbstractCrawler):
                 utils.logger.error(
                     f"[BilibiliCrawler.get_comments] may be been blocked, err:{e}")
 
+    async def get_creators_videos(self):
+        """
+        get videos for all creators in BILI_CREATOR_ID_LIST, creators are processed concurrently
+        :return:
+        """
+        progress = CrawlProgress("BilibiliCrawler.get_creators_videos", len(config.BILI_CREATOR_ID_LIST))
+        await gather_with_concurrency(
+            config.MAX_CREATOR_CONCURRENCY_NUM,
+            *[progress.track(creator_id, self.get_creator_videos(int(creator_id)))
+              for creator_id in config.BILI_CREATOR_ID_LIST]
+        )
+
     async def get_creator_videos(self, creator_id: int):
         """
         get videos for a creator
@@ -13,13 +13,16 @@ import asyncio
 import copy
 import json
 import urllib.parse
-from typing import Any, Callable, Dict, Optional
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional
 
-import requests
 from playwright.async_api import BrowserContext
 
 from base.base_crawler import AbstractApiClient
+from proxy.proxy_health import report_proxy_blocked
 from tools import utils
+from tools.async_util import gather_with_concurrency, get_platform_rate_limiter, sub_comment_concurrency
+from tools.http_client_pool import pooled_client
+from tools.response_cache import cached_response
 from var import request_keyword_var
 
 from .exception import *
@@ -92,14 +95,15 @@ class DOUYINClient(AbstractApiClient):
         params["a_bogus"] = a_bogus
 
     async def request(self, method, url, **kwargs):
-        response = None
-        if method == "GET":
-            response = requests.request(method, url, **kwargs)
-        elif method == "POST":
-            response = requests.request(method, url, **kwargs)
+        await get_platform_rate_limiter().acquire()
+        proxies = await self.request_proxies()
+        async with pooled_client(proxies) as client:
+            response = await client.request(method, url, timeout=self.timeout, **kwargs)
         try:
             if response.text == "" or response.text == "blocked":
                 utils.logger.error(f"request params incrr, response.text: {response.text}")
+                if response.text == "blocked":
+                    report_proxy_blocked(proxies)
                 raise Exception("account blocked")
             return response.json()
         except Exception as e:
@@ -176,6 +180,7 @@ class DOUYINClient(AbstractApiClient):
         headers["Referer"] = urllib.parse.quote(referer_url, safe=':/')
         return await self.get("/aweme/v1/web/general/search/single/", query_params, headers=headers)
 
+    @cached_response("dy.get_video_by_id")
     async def get_video_by_id(self, aweme_id: str) -> Any:
         """
         DouYin Video Detail API
@@ -260,29 +265,53 @@ class DOUYINClient(AbstractApiClient):
             await asyncio.sleep(crawl_interval)
             if not is_fetch_sub_comments:
                 continue
-            # 获取二级评论
-            for comment in comments:
-                reply_comment_total = comment.get("reply_comment_total")
+            # 获取二级评论，多条一级评论并发展开，单条一级评论内部按顺序翻页
+            root_results = await gather_with_concurrency(
+                sub_comment_concurrency(),
+                *[self.get_comment_all_sub_comments(aweme_id, comment, crawl_interval, callback) for comment in comments]
+            )
+            for sub_comments in root_results:
+                result.extend(sub_comments)
+        return result
 
-                if reply_comment_total > 0:
-                    comment_id = comment.get("cid")
-                    sub_comments_has_more = 1
-                    sub_comments_cursor = 0
+    async def get_comment_all_sub_comments(
+            self,
+            aweme_id: str,
+            comment: Dict,
+            crawl_interval: float = 1.0,
+            callback: Optional[Callable] = None,
+    ) -> List[Dict]:
+        """
+        获取单条一级评论下的所有子评论
+        :param aweme_id: 帖子ID
+        :param comment: 一级评论
+        :param crawl_interval: 抓取间隔
+        :param callback: 回调函数，用于处理抓取到的评论
+        :return: 子评论列表
+        """
+        result = []
+        reply_comment_total = comment.get("reply_comment_total")
+        if not reply_comment_total or reply_comment_total <= 0:
+            return result
 
-                    while sub_comments_has_more:
-                        sub_comments_res = await self.get_sub_comments(comment_id, sub_comments_cursor)
-                        sub_comments_has_more = sub_comments_res.get("has_more", 0)
-                        sub_comments_cursor = sub_comments_res.get("cursor", 0)
-                        sub_comments = sub_comments_res.get("comments", [])
+        comment_id = comment.get("cid")
+        sub_comments_has_more = 1
+        sub_comments_cursor = 0
+        while sub_comments_has_more:
+            sub_comments_res = await self.get_sub_comments(comment_id, sub_comments_cursor)
+            sub_comments_has_more = sub_comments_res.get("has_more", 0)
+            sub_comments_cursor = sub_comments_res.get("cursor", 0)
+            sub_comments = sub_comments_res.get("comments", [])
 
-                        if not sub_comments:
-                            continue
-                        result.extend(sub_comments)
-                        if callback:  # 如果有回调函数，就执行回调函数
-                            await callback(aweme_id, sub_comments)
-                        await asyncio.sleep(crawl_interval)
+            if not sub_comments:
+                continue
+            result.extend(sub_comments)
+            if callback:  # 如果有回调函数，就执行回调函数
+                await callback(aweme_id, sub_comments)
+            await asyncio.sleep(crawl_interval)
         return result
 
+    @cached_response("dy.get_user_info")
     async def get_user_info(self, sec_user_id: str):
         uri = "/aweme/v1/web/user/profile/other/"
         params = {
@@ -305,17 +334,26 @@ class DOUYINClient(AbstractApiClient):
         }
         return await self.get(uri, params)
 
-    async def get_all_user_aweme_posts(self, sec_user_id: str, callback: Optional[Callable] = None):
+    async def iter_user_aweme_posts(self, sec_user_id: str) -> AsyncGenerator[List[Dict], None]:
+        """
+        按页迭代指定用户下的所有作品，每次产出一页，不在内存中累积
+        :param sec_user_id: 用户sec_uid
+        :return:
+        """
         posts_has_more = 1
         max_cursor = ""
-        result = []
         while posts_has_more == 1:
             aweme_post_res = await self.get_user_aweme_posts(sec_user_id, max_cursor)
             posts_has_more = aweme_post_res.get("has_more", 0)
             max_cursor = aweme_post_res.get("max_cursor")
             aweme_list = aweme_post_res.get("aweme_list") if aweme_post_res.get("aweme_list") else []
             utils.logger.info(
-                f"[DOUYINClient.get_all_user_aweme_posts] got sec_user_id:{sec_user_id} video len : {len(aweme_list)}")
+                f"[DOUYINClient.iter_user_aweme_posts] got sec_user_id:{sec_user_id} video len : {len(aweme_list)}")
+            yield aweme_list
+
+    async def get_all_user_aweme_posts(self, sec_user_id: str, callback: Optional[Callable] = None):
+        result = []
+        async for aweme_list in self.iter_user_aweme_posts(sec_user_id):
             if callback:
                 await callback(aweme_list)
             result.extend(aweme_list)
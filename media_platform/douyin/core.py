@@ -21,8 +21,11 @@ from playwright.async_api import (BrowserContext, BrowserType, Page,
 import config
 from base.base_crawler import AbstractCrawler
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_rotator import ProxyRotator
 from store import douyin as douyin_store
 from tools import utils
+from tools.async_util import CrawlProgress, gather_with_concurrency, prefetch_iter
+from tools.seen_filter import get_seen_filter
 from var import crawler_type_var, source_keyword_var
 
 from .client import DOUYINClient
@@ -41,9 +44,11 @@ class DouYinCrawler(AbstractCrawler):
 
     async def start(self) -> None:
         playwright_proxy_format, httpx_proxy_format = None, None
+        proxy_rotator: Optional[ProxyRotator] = None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
+            proxy_rotator = ProxyRotator(ip_proxy_pool, ip_proxy_info)
             playwright_proxy_format, httpx_proxy_format = self.format_proxy_info(ip_proxy_info)
 
         async with async_playwright() as playwright:
@@ -61,6 +66,8 @@ class DouYinCrawler(AbstractCrawler):
             await self.context_page.goto(self.index_url)
 
             self.dy_client = await self.create_douyin_client(httpx_proxy_format)
+
+            self.dy_client.proxy_rotator = proxy_rotator
             if not await self.dy_client.pong(browser_context=self.browser_context):
                 login_obj = DouYinLogin(
                     login_type=config.LOGIN_TYPE,
@@ -118,19 +125,22 @@ class DouYinCrawler(AbstractCrawler):
                         f"[DouYinCrawler.search] search douyin keyword: {keyword} failed，账号也许被风控了。")
                     break
                 dy_search_id = posts_res.get("extra", {}).get("logid", "")
+                seen_filter = get_seen_filter()
                 for post_item in posts_res.get("data"):
                     try:
                         aweme_info: Dict = post_item.get("aweme_info") or \
                                            post_item.get("aweme_mix_info", {}).get("mix_items")[0]
                     except TypeError:
                         continue
+                    if seen_filter and seen_filter.should_skip(aweme_info.get("aweme_id", ""), keyword):
+                        continue
                     aweme_list.append(aweme_info.get("aweme_id", ""))
-                    await douyin_store.update_douyin_aweme(aweme_item=aweme_info)
+                    await self.save_aweme(aweme_info)
             utils.logger.info(f"[DouYinCrawler.search] keyword:{keyword}, aweme_list:{aweme_list}")
             await self.batch_get_note_comments(aweme_list)
 
     async def get_specified_awemes(self):
-        """Get the information and comments of the specified post"""
+        """Get the information and comments of the specified post, explicitly specified posts ignore the seen filter"""
         semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
         task_list = [
             self.get_aweme_detail(aweme_id=aweme_id, semaphore=semaphore) for aweme_id in config.DY_SPECIFIED_ID_LIST
@@ -138,9 +148,17 @@ class DouYinCrawler(AbstractCrawler):
         aweme_details = await asyncio.gather(*task_list)
         for aweme_detail in aweme_details:
             if aweme_detail is not None:
-                await douyin_store.update_douyin_aweme(aweme_detail)
+                await self.save_aweme(aweme_detail)
         await self.batch_get_note_comments(config.DY_SPECIFIED_ID_LIST)
 
+    @staticmethod
+    async def save_aweme(aweme_item: Dict):
+        """Save the aweme and mark it as crawled in the seen filter"""
+        await douyin_store.update_douyin_aweme(aweme_item)
+        seen_filter = get_seen_filter()
+        if seen_filter:
+            seen_filter.add(aweme_item.get("aweme_id", ""))
+
     async def get_aweme_detail(self, aweme_id: str, semaphore: asyncio.Semaphore) -> Any:
         """Get note detail"""
         async with semaphore:
@@ -192,18 +210,30 @@ class DouYinCrawler(AbstractCrawler):
         Get the information and videos of the specified creator
         """
         utils.logger.info("[DouYinCrawler.get_creators_and_videos] Begin get douyin creators")
-        for user_id in config.DY_CREATOR_ID_LIST:
-            creator_info: Dict = await self.dy_client.get_user_info(user_id)
-            if creator_info:
-                await douyin_store.save_creator(user_id, creator=creator_info)
+        progress = CrawlProgress("DouYinCrawler.get_creators_and_videos", len(config.DY_CREATOR_ID_LIST))
+        await gather_with_concurrency(
+            config.MAX_CREATOR_CONCURRENCY_NUM,
+            *[progress.track(user_id, self.get_creator_and_videos(user_id)) for user_id in config.DY_CREATOR_ID_LIST]
+        )
 
-            # Get all video information of the creator
-            all_video_list = await self.dy_client.get_all_user_aweme_posts(
-                sec_user_id=user_id,
-                callback=self.fetch_creator_video_detail
-            )
+    async def get_creator_and_videos(self, user_id: str) -> None:
+        """
+        Get the information and videos of a creator
+        """
+        creator_info: Dict = await self.dy_client.get_user_info(user_id)
+        if creator_info:
+            await douyin_store.save_creator(user_id, creator=creator_info)
 
-            video_ids = [video_item.get("aweme_id") for video_item in all_video_list]
+        # Get all video information of the creator page by page, the next page is prefetched
+        # while the current page's details and comments are being crawled
+        async for video_list in prefetch_iter(self.dy_client.iter_user_aweme_posts(sec_user_id=user_id),
+                                              buffer_size=config.CREATOR_PAGE_PREFETCH_NUM):
+            seen_filter = get_seen_filter()
+            if seen_filter:
+                video_list = [video_item for video_item in video_list
+                              if not seen_filter.should_skip(video_item.get("aweme_id"), source_keyword_var.get())]
+            await self.fetch_creator_video_detail(video_list)
+            video_ids = [video_item.get("aweme_id") for video_item in video_list]
             await self.batch_get_note_comments(video_ids)
 
     async def fetch_creator_video_detail(self, video_list: List[Dict]):
@@ -218,7 +248,7 @@ class DouYinCrawler(AbstractCrawler):
         note_details = await asyncio.gather(*task_list)
         for aweme_item in note_details:
             if aweme_item is not None:
-                await douyin_store.update_douyin_aweme(aweme_item)
+                await self.save_aweme(aweme_item)
 
     @staticmethod
     def format_proxy_info(ip_proxy_info: IpInfoModel) -> Tuple[Optional[Dict], Optional[Dict]]:
@@ -12,15 +12,17 @@
 # -*- coding: utf-8 -*-
 import asyncio
 import json
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional
 from urllib.parse import urlencode
 
-import httpx
 from playwright.async_api import BrowserContext, Page
 
 import config
 from base.base_crawler import AbstractApiClient
 from tools import utils
+from tools.async_util import gather_with_concurrency, get_platform_rate_limiter, sub_comment_concurrency
+from tools.http_client_pool import pooled_client
+from tools.response_cache import cached_response
 
 from .exception import DataFetchError
 from .graphql import KuaiShouGraphQL
@@ -45,7 +47,9 @@ class KuaiShouClient(AbstractApiClient):
         self.graphql = KuaiShouGraphQL()
 
     async def request(self, method, url, **kwargs) -> Any:
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        await get_platform_rate_limiter().acquire()
+        proxies = await self.request_proxies()
+        async with pooled_client(proxies) as client:
             response = await client.request(method, url, timeout=self.timeout, **kwargs)
         data: Dict = response.json()
         if data.get("errors"):
@@ -116,6 +120,7 @@ class KuaiShouClient(AbstractApiClient):
         }
         return await self.post("", post_data)
 
+    @cached_response("ks.get_video_info")
     async def get_video_info(self, photo_id: str) -> Dict:
         """
         Kuaishou web video detail api
@@ -161,6 +166,7 @@ class KuaiShouClient(AbstractApiClient):
         }
         return await self.post("", post_data)
 
+    @cached_response("ks.get_creator_profile")
     async def get_creator_profile(self, userId: str) -> Dict:
         post_data = {
             "operationName": "visionProfile",
@@ -236,31 +242,60 @@ class KuaiShouClient(AbstractApiClient):
             )
             return []
 
+        # 多条一级评论的二级评论并发展开，单条一级评论内部按顺序翻页，保证同一条评论下回调的顺序不变
+        root_results = await gather_with_concurrency(
+            sub_comment_concurrency(),
+            *[
+                self.get_comment_all_sub_comments(comment, photo_id, crawl_interval, callback)
+                for comment in comments
+            ],
+        )
         result = []
-        for comment in comments:
-            sub_comments = comment.get("subComments")
-            if sub_comments and callback:
-                await callback(photo_id, sub_comments)
+        for sub_comments in root_results:
+            result.extend(sub_comments)
+        return result
 
-            sub_comment_pcursor = comment.get("subCommentsPcursor")
-            if sub_comment_pcursor == "no_more":
-                continue
+    async def get_comment_all_sub_comments(
+        self,
+        comment: Dict,
+        photo_id,
+        crawl_interval: float = 1.0,
+        callback: Optional[Callable] = None,
+    ) -> List[Dict]:
+        """
+        获取单条一级评论下的所有二级评论
+        Args:
+            comment: 一级评论
+            photo_id: 视频id
+            crawl_interval: 爬取一次评论的延迟单位（秒）
+            callback: 一次评论爬取结束后
+        Returns:
+
+        """
+        result = []
+        sub_comments = comment.get("subComments")
+        if sub_comments and callback:
+            await callback(photo_id, sub_comments)
 
-            root_comment_id = comment.get("commentId")
-            sub_comment_pcursor = ""
+        sub_comment_pcursor = comment.get("subCommentsPcursor")
+        if sub_comment_pcursor == "no_more":
+            return result
 
-            while sub_comment_pcursor != "no_more":
-                comments_res = await self.get_video_sub_comments(
-                    photo_id, root_comment_id, sub_comment_pcursor
-                )
-                vision_sub_comment_list = comments_res.get("visionSubCommentList", {})
-                sub_comment_pcursor = vision_sub_comment_list.get("pcursor", "no_more")
-
-                comments = vision_sub_comment_list.get("subComments", {})
-                if callback:
-                    await callback(photo_id, comments)
-                await asyncio.sleep(crawl_interval)
-                result.extend(comments)
+        root_comment_id = comment.get("commentId")
+        sub_comment_pcursor = ""
+
+        while sub_comment_pcursor != "no_more":
+            comments_res = await self.get_video_sub_comments(
+                photo_id, root_comment_id, sub_comment_pcursor
+            )
+            vision_sub_comment_list = comments_res.get("visionSubCommentList", {})
+            sub_comment_pcursor = vision_sub_comment_list.get("pcursor", "no_more")
+
+            comments = vision_sub_comment_list.get("subComments", {})
+            if callback:
+                await callback(photo_id, comments)
+            await asyncio.sleep(crawl_interval)
+            result.extend(comments)
         return result
 
     async def get_creator_info(self, user_id: str) -> Dict:
@@ -272,29 +307,26 @@ class KuaiShouClient(AbstractApiClient):
         visionProfile = await self.get_creator_profile(user_id)
         return visionProfile.get("userProfile")
 
-    async def get_all_videos_by_creator(
+    async def iter_videos_by_creator(
         self,
         user_id: str,
         crawl_interval: float = 1.0,
-        callback: Optional[Callable] = None,
-    ) -> List[Dict]:
+    ) -> AsyncGenerator[List[Dict], None]:
         """
-        获取指定用户下的所有发过的帖子，该方法会一直查找一个用户下的所有帖子信息
+        按页迭代指定用户下的所有视频，每次产出一页，不在内存中累积
         Args:
             user_id: 用户ID
             crawl_interval: 爬取一次的延迟单位（秒）
-            callback: 一次分页爬取结束后的更新回调函数
         Returns:
 
         """
-        result = []
         pcursor = ""
 
         while pcursor != "no_more":
             videos_res = await self.get_video_by_creater(user_id, pcursor)
             if not videos_res:
                 utils.logger.error(
-                    f"[KuaiShouClient.get_all_videos_by_creator] The current creator may have been banned by ks, so they cannot access the data."
+                    f"[KuaiShouClient.iter_videos_by_creator] The current creator may have been banned by ks, so they cannot access the data."
                 )
                 break
 
@@ -303,11 +335,30 @@ class KuaiShouClient(AbstractApiClient):
 
             videos = vision_profile_photo_list.get("feeds", [])
             utils.logger.info(
-                f"[KuaiShouClient.get_all_videos_by_creator] got user_id:{user_id} videos len : {len(videos)}"
+                f"[KuaiShouClient.iter_videos_by_creator] got user_id:{user_id} videos len : {len(videos)}"
             )
+            yield videos
+            await asyncio.sleep(crawl_interval)
+
+    async def get_all_videos_by_creator(
+        self,
+        user_id: str,
+        crawl_interval: float = 1.0,
+        callback: Optional[Callable] = None,
+    ) -> List[Dict]:
+        """
+        获取指定用户下的所有发过的帖子，该方法会一直查找一个用户下的所有帖子信息
+        视频很多时建议直接使用 iter_videos_by_creator 边翻页边处理
+        Args:
+            user_id: 用户ID
+            crawl_interval: 爬取一次的延迟单位（秒）
+            callback: 一次分页爬取结束后的更新回调函数
+        Returns:
 
+        """
+        result = []
+        async for videos in self.iter_videos_by_creator(user_id, crawl_interval):
             if callback:
                 await callback(videos)
-            await asyncio.sleep(crawl_interval)
             result.extend(videos)
         return result
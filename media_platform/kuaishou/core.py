@@ -21,8 +21,10 @@ from playwright.async_api import BrowserContext, BrowserType, Page, async_playwr
 import config
 from base.base_crawler import AbstractCrawler
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_rotator import ProxyRotator
 from store import kuaishou as kuaishou_store
 from tools import utils
+from tools.async_util import CrawlProgress, gather_with_concurrency, prefetch_iter
 from var import comment_tasks_var, crawler_type_var, source_keyword_var
 
 from .client import KuaiShouClient
@@ -41,11 +43,13 @@ class KuaishouCrawler(AbstractCrawler):
 
     async def start(self):
         playwright_proxy_format, httpx_proxy_format = None, None
+        proxy_rotator: Optional[ProxyRotator] = None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(
                 config.IP_PROXY_POOL_COUNT, enable_validate_ip=True
             )
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
+            proxy_rotator = ProxyRotator(ip_proxy_pool, ip_proxy_info)
             playwright_proxy_format, httpx_proxy_format = self.format_proxy_info(
                 ip_proxy_info
             )
@@ -63,6 +67,7 @@ class KuaishouCrawler(AbstractCrawler):
 
             # Create a client to interact with the kuaishou website.
             self.ks_client = await self.create_ks_client(httpx_proxy_format)
+            self.ks_client.proxy_rotator = proxy_rotator
             if not await self.ks_client.pong():
                 login_obj = KuaishouLogin(
                     login_type=config.LOGIN_TYPE,
@@ -312,21 +317,35 @@ class KuaishouCrawler(AbstractCrawler):
         utils.logger.info(
             "[KuaiShouCrawler.get_creators_and_videos] Begin get kuaishou creators"
         )
-        for user_id in config.KS_CREATOR_ID_LIST:
-            # get creator detail info from web html content
-            createor_info: Dict = await self.ks_client.get_creator_info(user_id=user_id)
-            if createor_info:
-                await kuaishou_store.save_creator(user_id, creator=createor_info)
+        progress = CrawlProgress(
+            "KuaiShouCrawler.get_creators_and_videos", len(config.KS_CREATOR_ID_LIST)
+        )
+        await gather_with_concurrency(
+            config.MAX_CREATOR_CONCURRENCY_NUM,
+            *[
+                progress.track(user_id, self.get_creator_and_videos(user_id))
+                for user_id in config.KS_CREATOR_ID_LIST
+            ],
+        )
 
-            # Get all video information of the creator
-            all_video_list = await self.ks_client.get_all_videos_by_creator(
-                user_id=user_id,
-                crawl_interval=random.random(),
-                callback=self.fetch_creator_video_detail,
-            )
+    async def get_creator_and_videos(self, user_id: str) -> None:
+        """Get a creator's info, videos and their comments."""
+        # get creator detail info from web html content
+        createor_info: Dict = await self.ks_client.get_creator_info(user_id=user_id)
+        if createor_info:
+            await kuaishou_store.save_creator(user_id, creator=createor_info)
 
+        # Get all video information of the creator page by page, the next page is prefetched
+        # while the current page's details and comments are being crawled
+        async for video_list in prefetch_iter(
+            self.ks_client.iter_videos_by_creator(
+                user_id=user_id, crawl_interval=random.random()
+            ),
+            buffer_size=config.CREATOR_PAGE_PREFETCH_NUM,
+        ):
+            await self.fetch_creator_video_detail(video_list)
             video_ids = [
-                video_item.get("photo", {}).get("id") for video_item in all_video_list
+                video_item.get("photo", {}).get("id") for video_item in video_list
             ]
             await self.batch_get_video_comments(video_ids)
 
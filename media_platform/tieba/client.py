@@ -14,15 +14,18 @@ import json
 from typing import Any, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode
 
-import httpx
 from playwright.async_api import BrowserContext
 from tenacity import RetryError, retry, stop_after_attempt, wait_fixed
 
 import config
 from base.base_crawler import AbstractApiClient
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
+from proxy.proxy_health import report_proxy_blocked
 from proxy.proxy_ip_pool import ProxyIpPool
 from tools import utils
+from tools.async_util import gather_with_concurrency, get_platform_rate_limiter, sub_comment_concurrency
+from tools.comment_watermark import get_comment_watermark_store
+from tools.http_client_pool import pooled_client
 
 from .field import SearchNoteType, SearchSortType
 from .help import TieBaExtractor
@@ -59,8 +62,9 @@ class BaiduTieBaClient(AbstractApiClient):
         Returns:
 
         """
-        actual_proxies = proxies if proxies else self.default_ip_proxy
-        async with httpx.AsyncClient(proxies=actual_proxies) as client:
+        actual_proxies = proxies or await self.request_proxies() or self.default_ip_proxy
+        await get_platform_rate_limiter().acquire()
+        async with pooled_client(actual_proxies) as client:
             response = await client.request(
                 method, url, timeout=self.timeout,
                 headers=self.headers, **kwargs
@@ -73,6 +77,7 @@ class BaiduTieBaClient(AbstractApiClient):
 
         if response.text == "" or response.text == "blocked":
             utils.logger.error(f"request params incrr, response.text: {response.text}")
+            report_proxy_blocked(actual_proxies)
             raise Exception("account blocked")
 
         if return_ori_content:
@@ -102,8 +107,11 @@ class BaiduTieBaClient(AbstractApiClient):
             return res
         except RetryError as e:
             if self.ip_pool:
-                proxie_model = await self.ip_pool.get_proxy()
-                _, proxies = utils.format_proxy_info(proxie_model)
+                if self.proxy_rotator is not None:
+                    proxies = await self.proxy_rotator.rotate()
+                else:
+                    proxie_model = await self.ip_pool.get_proxy()
+                    _, proxies = utils.format_proxy_info(proxie_model)
                 res = await self.request(method="GET", url=f"{self._host}{final_uri}",
                                          return_ori_content=return_ori_content,
                                          proxies=proxies,
@@ -220,6 +228,12 @@ class BaiduTieBaClient(AbstractApiClient):
         uri = f"/p/{note_detail.note_id}"
         result: List[TiebaComment] = []
         current_page = 1
+        # 贴吧楼层按时间正序分页，开启增量爬取时从上次爬到的页码继续，并跳过该页已爬取过的楼层
+        watermark_store = get_comment_watermark_store()
+        watermark = watermark_store.get(note_detail.note_id) if watermark_store else None
+        if watermark and watermark.last_cursor:
+            current_page = int(watermark.last_cursor)
+        last_comment: Optional[TiebaComment] = None
         while note_detail.total_replay_page >= current_page and len(result) < max_count:
             params = {
                 "pn": current_page
@@ -229,8 +243,21 @@ class BaiduTieBaClient(AbstractApiClient):
                                                                                 note_id=note_detail.note_id)
             if not comments:
                 break
+            if watermark and watermark.newest_comment_id:
+                comment_ids = [comment.comment_id for comment in comments]
+                if watermark.newest_comment_id in comment_ids:
+                    comments = comments[comment_ids.index(watermark.newest_comment_id) + 1:]
             if len(result) + len(comments) > max_count:
                 comments = comments[:max_count - len(result)]
+            if comments:
+                last_comment = comments[-1]
+            if watermark_store:
+                watermark_store.update(
+                    note_detail.note_id,
+                    newest_comment_id=last_comment.comment_id if last_comment else None,
+                    last_cursor=str(current_page),
+                    new_comment_count=len(comments),
+                )
             if callback:
                 await callback(note_detail.note_id, comments)
             result.extend(comments)
@@ -252,7 +279,6 @@ class BaiduTieBaClient(AbstractApiClient):
         Returns:
 
         """
-        uri = "/p/comment"
         if not config.ENABLE_GET_SUB_COMMENTS:
             return []
 
@@ -260,31 +286,54 @@ class BaiduTieBaClient(AbstractApiClient):
         # if self.headers.get("Cookies") == "" or not self.pong():
         #     raise Exception(f"[BaiduTieBaClient.pong] Cookies is empty, please login first...")
 
+        # 多条楼层的楼中楼并发展开，单条楼层内部按顺序翻页，保证同一条楼层下回调的顺序不变
+        root_results = await gather_with_concurrency(
+            sub_comment_concurrency(),
+            *[self.get_comment_all_sub_comments(parment_comment, crawl_interval, callback)
+              for parment_comment in comments]
+        )
+        all_sub_comments: List[TiebaComment] = []
+        for sub_comments in root_results:
+            all_sub_comments.extend(sub_comments)
+        return all_sub_comments
+
+    async def get_comment_all_sub_comments(self, parment_comment: TiebaComment, crawl_interval: float = 1.0,
+                                           callback: Optional[Callable] = None) -> List[TiebaComment]:
+        """
+        获取单条楼层下的所有子评论
+        Args:
+            parment_comment: 一级评论
+            crawl_interval: 爬取一次笔记的延迟单位（秒）
+            callback: 一次笔记爬取结束后
+
+        Returns:
+
+        """
+        uri = "/p/comment"
         all_sub_comments: List[TiebaComment] = []
-        for parment_comment in comments:
-            if parment_comment.sub_comment_count == 0:
-                continue
-
-            current_page = 1
-            max_sub_page_num = parment_comment.sub_comment_count // 10 + 1
-            while max_sub_page_num >= current_page:
-                params = {
-                    "tid": parment_comment.note_id,  # 帖子ID
-                    "pid": parment_comment.comment_id,  # 父级评论ID
-                    "fid": parment_comment.tieba_id,  # 贴吧ID
-                    "pn": current_page  # 页码
-                }
-                page_content = await self.get(uri, params=params, return_ori_content=True)
-                sub_comments = self._page_extractor.extract_tieba_note_sub_comments(page_content,
-                                                                                    parent_comment=parment_comment)
-
-                if not sub_comments:
-                    break
-                if callback:
-                    await callback(parment_comment.note_id, sub_comments)
-                all_sub_comments.extend(sub_comments)
-                await asyncio.sleep(crawl_interval)
-                current_page += 1
+        if parment_comment.sub_comment_count == 0:
+            return all_sub_comments
+
+        current_page = 1
+        max_sub_page_num = parment_comment.sub_comment_count // 10 + 1
+        while max_sub_page_num >= current_page:
+            params = {
+                "tid": parment_comment.note_id,  # 帖子ID
+                "pid": parment_comment.comment_id,  # 父级评论ID
+                "fid": parment_comment.tieba_id,  # 贴吧ID
+                "pn": current_page  # 页码
+            }
+            page_content = await self.get(uri, params=params, return_ori_content=True)
+            sub_comments = self._page_extractor.extract_tieba_note_sub_comments(page_content,
+                                                                                parent_comment=parment_comment)
+
+            if not sub_comments:
+                break
+            if callback:
+                await callback(parment_comment.note_id, sub_comments)
+            all_sub_comments.extend(sub_comments)
+            await asyncio.sleep(crawl_interval)
+            current_page += 1
         return all_sub_comments
 
     async def get_notes_by_tieba_name(self, tieba_name: str, page_num: int) -> List[TiebaNote]:
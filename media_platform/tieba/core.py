@@ -22,8 +22,10 @@ import config
 from base.base_crawler import AbstractCrawler
 from model.m_baidu_tieba import TiebaCreator, TiebaNote
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_rotator import ProxyRotator
 from store import tieba as tieba_store
 from tools import utils
+from tools.async_util import CrawlProgress, gather_with_concurrency
 from tools.crawler_util import format_proxy_info
 from var import crawler_type_var, source_keyword_var
 
@@ -50,10 +52,12 @@ class TieBaCrawler(AbstractCrawler):
 
         """
         ip_proxy_pool, httpx_proxy_format = None, None
+        proxy_rotator: Optional[ProxyRotator] = None
         if config.ENABLE_IP_PROXY:
             utils.logger.info("[BaiduTieBaCrawler.start] Begin create ip proxy pool ...")
             ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
+            proxy_rotator = ProxyRotator(ip_proxy_pool, ip_proxy_info)
             _, httpx_proxy_format = format_proxy_info(ip_proxy_info)
             utils.logger.info(f"[BaiduTieBaCrawler.start] Init default ip proxy, value: {httpx_proxy_format}")
 
@@ -62,6 +66,7 @@ class TieBaCrawler(AbstractCrawler):
             ip_pool=ip_proxy_pool,
             default_ip_proxy=httpx_proxy_format,
         )
+        self.tieba_client.proxy_rotator = proxy_rotator
         crawler_type_var.set(config.CRAWLER_TYPE)
         if config.CRAWLER_TYPE == "search":
             # Search for notes and retrieve their comment information.
@@ -239,30 +244,45 @@ class TieBaCrawler(AbstractCrawler):
 
         """
         utils.logger.info("[WeiboCrawler.get_creators_and_notes] Begin get weibo creators")
-        for creator_url in config.TIEBA_CREATOR_URL_LIST:
-            creator_page_html_content = await self.tieba_client.get_creator_info_by_url(creator_url=creator_url)
-            creator_info: TiebaCreator = self._page_extractor.extract_creator_info(creator_page_html_content)
-            if creator_info:
-                utils.logger.info(f"[WeiboCrawler.get_creators_and_notes] creator info: {creator_info}")
-                if not creator_info:
-                    raise Exception("Get creator info error")
-
-                await tieba_store.save_creator(user_info=creator_info)
-
-                # Get all note information of the creator
-                all_notes_list = await self.tieba_client.get_all_notes_by_creator_user_name(
-                    user_name=creator_info.user_name,
-                    crawl_interval=0,
-                    callback=tieba_store.batch_update_tieba_notes,
-                    max_note_count=config.CRAWLER_MAX_NOTES_COUNT,
-                    creator_page_html_content=creator_page_html_content,
-                )
+        progress = CrawlProgress("BaiduTieBaCrawler.get_creators_and_notes", len(config.TIEBA_CREATOR_URL_LIST))
+        await gather_with_concurrency(
+            config.MAX_CREATOR_CONCURRENCY_NUM,
+            *[progress.track(creator_url, self.get_creator_and_notes(creator_url))
+              for creator_url in config.TIEBA_CREATOR_URL_LIST]
+        )
 
-                await self.batch_get_note_comments(all_notes_list)
+    async def get_creator_and_notes(self, creator_url: str) -> None:
+        """
+        Get a creator's information and their notes and comments
+        Args:
+            creator_url: creator home page url
 
-            else:
-                utils.logger.error(
-                    f"[WeiboCrawler.get_creators_and_notes] get creator info error, creator_url:{creator_url}")
+        Returns:
+
+        """
+        creator_page_html_content = await self.tieba_client.get_creator_info_by_url(creator_url=creator_url)
+        creator_info: TiebaCreator = self._page_extractor.extract_creator_info(creator_page_html_content)
+        if creator_info:
+            utils.logger.info(f"[WeiboCrawler.get_creators_and_notes] creator info: {creator_info}")
+            if not creator_info:
+                raise Exception("Get creator info error")
+
+            await tieba_store.save_creator(user_info=creator_info)
+
+            # Get all note information of the creator
+            all_notes_list = await self.tieba_client.get_all_notes_by_creator_user_name(
+                user_name=creator_info.user_name,
+                crawl_interval=0,
+                callback=tieba_store.batch_update_tieba_notes,
+                max_note_count=config.CRAWLER_MAX_NOTES_COUNT,
+                creator_page_html_content=creator_page_html_content,
+            )
+
+            await self.batch_get_note_comments(all_notes_list)
+
+        else:
+            utils.logger.error(
+                f"[WeiboCrawler.get_creators_and_notes] get creator info error, creator_url:{creator_url}")
 
     async def launch_browser(
             self,
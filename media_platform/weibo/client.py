@@ -18,21 +18,24 @@ import asyncio
 import copy
 import json
 import re
-from typing import Callable, Dict, List, Optional, Union
+from typing import AsyncGenerator, Callable, Dict, List, Optional, Union
 from urllib.parse import parse_qs, unquote, urlencode
 
-import httpx
 from httpx import Response
 from playwright.async_api import BrowserContext, Page
 
 import config
+from base.base_crawler import AbstractApiClient
 from tools import utils
+from tools.async_util import get_platform_rate_limiter
+from tools.http_client_pool import pooled_client
+from tools.response_cache import cached_response
 
 from .exception import DataFetchError
 from .field import SearchType
 
 
-class WeiboClient:
+class WeiboClient(AbstractApiClient):
     def __init__(
             self,
             timeout=10,
@@ -52,7 +55,9 @@ class WeiboClient:
 
     async def request(self, method, url, **kwargs) -> Union[Response, Dict]:
         enable_return_response = kwargs.pop("return_response", False)
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        await get_platform_rate_limiter().acquire()
+        proxies = await self.request_proxies()
+        async with pooled_client(proxies) as client:
             response = await client.request(
                 method, url, timeout=self.timeout,
                 **kwargs
@@ -212,6 +217,7 @@ class WeiboClient:
                 res_sub_comments.extend(sub_comments)
         return res_sub_comments
 
+    @cached_response("wb.get_note_info_by_id")
     async def get_note_info_by_id(self, note_id: str) -> Dict:
         """
         根据帖子ID获取详情
@@ -219,7 +225,8 @@ class WeiboClient:
         :return:
         """
         url = f"{self._host}/detail/{note_id}"
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        proxies = await self.request_proxies()
+        async with pooled_client(proxies) as client:
             response = await client.request(
                 "GET", url, timeout=self.timeout, headers=self.headers
             )
@@ -252,7 +259,7 @@ class WeiboClient:
         # 微博图床对外存在防盗链，所以需要代理访问
         # 由于微博图片是通过 i1.wp.com 来访问的，所以需要拼接一下
         final_uri = (f"{self._image_agent_host}" f"{image_url}")
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        async with pooled_client(self.proxies) as client:
             response = await client.request("GET", final_uri, timeout=self.timeout)
             if not response.reason_phrase == "OK":
                 utils.logger.error(f"[WeiboClient.get_note_image] request {final_uri} err, res:{response.text}")
@@ -283,6 +290,7 @@ class WeiboClient:
             "lfid_container_id": m_weibocn_params_dict.get("lfid", [""])[0]
         }
 
+    @cached_response("wb.get_creator_info_by_id")
     async def get_creator_info_by_id(self, creator_id: str) -> Dict:
         """
         根据用户ID获取用户详情
@@ -337,20 +345,18 @@ class WeiboClient:
         }
         return await self.get(uri, params)
 
-    async def get_all_notes_by_creator_id(self, creator_id: str, container_id: str, crawl_interval: float = 1.0,
-                                          callback: Optional[Callable] = None) -> List[Dict]:
+    async def iter_notes_by_creator_id(self, creator_id: str, container_id: str,
+                                       crawl_interval: float = 1.0) -> AsyncGenerator[List[Dict], None]:
         """
-        获取指定用户下的所有发过的帖子，该方法会一直查找一个用户下的所有帖子信息
+        按页迭代指定用户下的所有帖子，每次产出一页，不在内存中累积
         Args:
             creator_id:
             container_id:
             crawl_interval:
-            callback:
 
         Returns:
 
         """
-        result = []
         notes_has_more = True
         since_id = ""
         crawler_total_count = 0
@@ -363,18 +369,36 @@ class WeiboClient:
             since_id = notes_res.get("cardlistInfo", {}).get("since_id", "0")
             if "cards" not in notes_res:
                 utils.logger.info(
-                    f"[WeiboClient.get_all_notes_by_creator] No 'notes' key found in response: {notes_res}")
+                    f"[WeiboClient.iter_notes_by_creator_id] No 'notes' key found in response: {notes_res}")
                 break
 
             notes = notes_res["cards"]
             utils.logger.info(
-                f"[WeiboClient.get_all_notes_by_creator] got user_id:{creator_id} notes len : {len(notes)}")
+                f"[WeiboClient.iter_notes_by_creator_id] got user_id:{creator_id} notes len : {len(notes)}")
             notes = [note for note  in notes if note.get("card_type") == 9]
+            crawler_total_count += 10
+            notes_has_more = notes_res.get("cardlistInfo", {}).get("total", 0) > crawler_total_count
+            yield notes
+            await asyncio.sleep(crawl_interval)
+
+    async def get_all_notes_by_creator_id(self, creator_id: str, container_id: str, crawl_interval: float = 1.0,
+                                          callback: Optional[Callable] = None) -> List[Dict]:
+        """
+        获取指定用户下的所有发过的帖子，该方法会一直查找一个用户下的所有帖子信息
+        帖子很多时建议直接使用 iter_notes_by_creator_id 边翻页边处理
+        Args:
+            creator_id:
+            container_id:
+            crawl_interval:
+            callback:
+
+        Returns:
+
+        """
+        result = []
+        async for notes in self.iter_notes_by_creator_id(creator_id, container_id, crawl_interval):
             if callback:
                 await callback(notes)
-            await asyncio.sleep(crawl_interval)
             result.extend(notes)
-            crawler_total_count += 10
-            notes_has_more = notes_res.get("cardlistInfo", {}).get("total", 0) > crawler_total_count
         return result
 
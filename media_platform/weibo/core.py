@@ -27,8 +27,10 @@ from playwright.async_api import (BrowserContext, BrowserType, Page,
 import config
 from base.base_crawler import AbstractCrawler
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_rotator import ProxyRotator
 from store import weibo as weibo_store
 from tools import utils
+from tools.async_util import CrawlProgress, gather_with_concurrency, prefetch_iter
 from var import crawler_type_var, source_keyword_var
 
 from .client import WeiboClient
@@ -51,9 +53,11 @@ class WeiboCrawler(AbstractCrawler):
 
     async def start(self):
         playwright_proxy_format, httpx_proxy_format = None, None
+        proxy_rotator: Optional[ProxyRotator] = None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
+            proxy_rotator = ProxyRotator(ip_proxy_pool, ip_proxy_info)
             playwright_proxy_format, httpx_proxy_format = self.format_proxy_info(ip_proxy_info)
 
         async with async_playwright() as playwright:
@@ -72,6 +76,7 @@ class WeiboCrawler(AbstractCrawler):
 
             # Create a client to interact with the xiaohongshu website.
             self.wb_client = await self.create_weibo_client(httpx_proxy_format)
+            self.wb_client.proxy_rotator = proxy_rotator
             if not await self.wb_client.pong():
                 login_obj = WeiboLogin(
                     login_type=config.LOGIN_TYPE,
@@ -244,32 +249,46 @@ class WeiboCrawler(AbstractCrawler):
 
         """
         utils.logger.info("[WeiboCrawler.get_creators_and_notes] Begin get weibo creators")
-        for user_id in config.WEIBO_CREATOR_ID_LIST:
-            createor_info_res: Dict = await self.wb_client.get_creator_info_by_id(creator_id=user_id)
-            if createor_info_res:
-                createor_info: Dict = createor_info_res.get("userInfo", {})
-                utils.logger.info(f"[WeiboCrawler.get_creators_and_notes] creator info: {createor_info}")
-                if not createor_info:
-                    raise DataFetchError("Get creator info error")
-                await weibo_store.save_creator(user_id, user_info=createor_info)
-
-                # Get all note information of the creator
-                all_notes_list = await self.wb_client.get_all_notes_by_creator_id(
-                    creator_id=user_id,
-                    container_id=createor_info_res.get("lfid_container_id"),
-                    crawl_interval=0,
-                    callback=weibo_store.batch_update_weibo_notes
-                )
+        progress = CrawlProgress("WeiboCrawler.get_creators_and_notes", len(config.WEIBO_CREATOR_ID_LIST))
+        await gather_with_concurrency(
+            config.MAX_CREATOR_CONCURRENCY_NUM,
+            *[progress.track(user_id, self.get_creator_and_notes(user_id)) for user_id in config.WEIBO_CREATOR_ID_LIST]
+        )
 
-                note_ids = [note_item.get("mblog", {}).get("id") for note_item in all_notes_list if
-                            note_item.get("mblog", {}).get("id")]
-                await self.batch_get_notes_comments(note_ids)
+    async def get_creator_and_notes(self, user_id: str) -> None:
+        """
+        Get a creator's information and their notes and comments
+        Args:
+            user_id: creator id
 
-            else:
-                utils.logger.error(
-                    f"[WeiboCrawler.get_creators_and_notes] get creator info error, creator_id:{user_id}")
+        Returns:
 
+        """
+        createor_info_res: Dict = await self.wb_client.get_creator_info_by_id(creator_id=user_id)
+        if createor_info_res:
+            createor_info: Dict = createor_info_res.get("userInfo", {})
+            utils.logger.info(f"[WeiboCrawler.get_creators_and_notes] creator info: {createor_info}")
+            if not createor_info:
+                raise DataFetchError("Get creator info error")
+            await weibo_store.save_creator(user_id, user_info=createor_info)
+
+            # Get all note information of the creator page by page, the next page is prefetched
+            # while the current page's notes and comments are being saved
+            async for note_list in prefetch_iter(
+                    self.wb_client.iter_notes_by_creator_id(
+                        creator_id=user_id,
+                        container_id=createor_info_res.get("lfid_container_id"),
+                        crawl_interval=0,
+                    ),
+                    buffer_size=config.CREATOR_PAGE_PREFETCH_NUM):
+                await weibo_store.batch_update_weibo_notes(note_list)
+                note_ids = [note_item.get("mblog", {}).get("id") for note_item in note_list if
+                            note_item.get("mblog", {}).get("id")]
+                await self.batch_get_notes_comments(note_ids)
 
+        else:
+            utils.logger.error(
+                f"[WeiboCrawler.get_creators_and_notes] get creator info error, creator_id:{user_id}")
 
     async def create_weibo_client(self, httpx_proxy: Optional[str]) -> WeiboClient:
         """Create xhs client"""
@@ -12,16 +12,19 @@
 import asyncio
 import json
 import re
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode
 
-import httpx
 from playwright.async_api import BrowserContext, Page
 from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_result
 
 import config
 from base.base_crawler import AbstractApiClient
+from proxy.proxy_health import report_proxy_blocked
 from tools import utils
+from tools.async_util import gather_with_concurrency, get_platform_rate_limiter, sub_comment_concurrency
+from tools.http_client_pool import pooled_client
+from tools.response_cache import cached_response
 from html import unescape
 
 from .exception import DataFetchError, IPBlockError
@@ -96,13 +99,16 @@ class XiaoHongShuClient(AbstractApiClient):
         # return response.text
         return_response = kwargs.pop("return_response", False)
 
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        await get_platform_rate_limiter().acquire()
+        proxies = await self.request_proxies()
+        async with pooled_client(proxies) as client:
             response = await client.request(method, url, timeout=self.timeout, **kwargs)
 
         if response.status_code == 471 or response.status_code == 461:
             # someday someone maybe will bypass captcha
             verify_type = response.headers["Verifytype"]
             verify_uuid = response.headers["Verifyuuid"]
+            report_proxy_blocked(proxies, captcha=True)
             raise Exception(
                 f"出现验证码，请求失败，Verifytype: {verify_type}，Verifyuuid: {verify_uuid}, Response: {response}"
             )
@@ -113,6 +119,7 @@ class XiaoHongShuClient(AbstractApiClient):
         if data["success"]:
             return data.get("data", data.get("success", {}))
         elif data["code"] == self.IP_ERROR_CODE:
+            report_proxy_blocked(proxies)
             raise IPBlockError(self.IP_ERROR_STR)
         else:
             raise DataFetchError(data.get("msg", None))
@@ -156,7 +163,7 @@ class XiaoHongShuClient(AbstractApiClient):
         )
 
     async def get_note_media(self, url: str) -> Union[bytes, None]:
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        async with pooled_client(self.proxies) as client:
             response = await client.request("GET", url, timeout=self.timeout)
             if not response.reason_phrase == "OK":
                 utils.logger.error(
@@ -231,6 +238,7 @@ class XiaoHongShuClient(AbstractApiClient):
         }
         return await self.post(uri, data)
 
+    @cached_response("xhs.get_note_by_id")
     async def get_note_by_id(
         self, note_id: str, xsec_source: str, xsec_token: str
     ) -> Dict:
@@ -393,42 +401,73 @@ class XiaoHongShuClient(AbstractApiClient):
             )
             return []
 
+        # 多条一级评论的二级评论并发展开，单条一级评论内部按顺序翻页，保证同一条评论下回调的顺序不变
+        root_results = await gather_with_concurrency(
+            sub_comment_concurrency(),
+            *[
+                self.get_comment_all_sub_comments(comment, xsec_token, crawl_interval, callback)
+                for comment in comments
+            ],
+        )
+        result = []
+        for sub_comments in root_results:
+            result.extend(sub_comments)
+        return result
+
+    async def get_comment_all_sub_comments(
+        self,
+        comment: Dict,
+        xsec_token: str,
+        crawl_interval: float = 1.0,
+        callback: Optional[Callable] = None,
+    ) -> List[Dict]:
+        """
+        获取单条一级评论下的所有二级评论
+        Args:
+            comment: 一级评论
+            xsec_token: 验证token
+            crawl_interval: 爬取一次评论的延迟单位（秒）
+            callback: 一次评论爬取结束后
+
+        Returns:
+
+        """
         result = []
-        for comment in comments:
-            note_id = comment.get("note_id")
-            sub_comments = comment.get("sub_comments")
-            if sub_comments and callback:
-                await callback(note_id, sub_comments)
-
-            sub_comment_has_more = comment.get("sub_comment_has_more")
-            if not sub_comment_has_more:
-                continue
-
-            root_comment_id = comment.get("id")
-            sub_comment_cursor = comment.get("sub_comment_cursor")
-
-            while sub_comment_has_more:
-                comments_res = await self.get_note_sub_comments(
-                    note_id=note_id,
-                    root_comment_id=root_comment_id,
-                    xsec_token=xsec_token,
-                    num=10,
-                    cursor=sub_comment_cursor,
+        note_id = comment.get("note_id")
+        sub_comments = comment.get("sub_comments")
+        if sub_comments and callback:
+            await callback(note_id, sub_comments)
+
+        sub_comment_has_more = comment.get("sub_comment_has_more")
+        if not sub_comment_has_more:
+            return result
+
+        root_comment_id = comment.get("id")
+        sub_comment_cursor = comment.get("sub_comment_cursor")
+
+        while sub_comment_has_more:
+            comments_res = await self.get_note_sub_comments(
+                note_id=note_id,
+                root_comment_id=root_comment_id,
+                xsec_token=xsec_token,
+                num=10,
+                cursor=sub_comment_cursor,
+            )
+            sub_comment_has_more = comments_res.get("has_more", False)
+            sub_comment_cursor = comments_res.get("cursor", "")
+            if "comments" not in comments_res:
+                utils.logger.info(
+                    f"[XiaoHongShuClient.get_comment_all_sub_comments] No 'comments' key found in response: {comments_res}"
                 )
-                sub_comment_has_more = comments_res.get("has_more", False)
-                sub_comment_cursor = comments_res.get("cursor", "")
-                if "comments" not in comments_res:
-                    utils.logger.info(
-                        f"[XiaoHongShuClient.get_comments_all_sub_comments] No 'comments' key found in response: {comments_res}"
-                    )
-                    break
-                comments = comments_res["comments"]
-                if callback:
-                    await callback(note_id, comments)
-                await asyncio.sleep(crawl_interval)
-                result.extend(comments)
+                break
+            comments = comments_res["comments"]
+            if callback:
+                await callback(note_id, comments)
+            await asyncio.sleep(crawl_interval)
+            result.extend(comments)
         return result
 
+    @cached_response("xhs.get_creator_info")
     async def get_creator_info(self, user_id: str) -> Dict:
         """
         通过解析网页版的用户主页HTML，获取用户个人简要信息
@@ -473,23 +512,20 @@ class XiaoHongShuClient(AbstractApiClient):
         }
         return await self.get(uri, data)
 
-    async def get_all_notes_by_creator(
+    async def iter_notes_by_creator(
         self,
         user_id: str,
         crawl_interval: float = 1.0,
-        callback: Optional[Callable] = None,
-    ) -> List[Dict]:
+    ) -> AsyncGenerator[List[Dict], None]:
         """
-        获取指定用户下的所有发过的帖子，该方法会一直查找一个用户下的所有帖子信息
+        按页迭代指定用户下的所有帖子，每次产出一页，不在内存中累积
         Args:
             user_id: 用户ID
             crawl_interval: 爬取一次的延迟单位（秒）
-            callback: 一次分页爬取结束后的更新回调函数
 
         Returns:
 
         """
-        result = []
         notes_has_more = True
         notes_cursor = ""
         while notes_has_more:
@@ -504,17 +540,38 @@ class XiaoHongShuClient(AbstractApiClient):
             notes_cursor = notes_res.get("cursor", "")
             if "notes" not in notes_res:
                 utils.logger.info(
-                    f"[XiaoHongShuClient.get_all_notes_by_creator] No 'notes' key found in response: {notes_res}"
+                    f"[XiaoHongShuClient.iter_notes_by_creator] No 'notes' key found in response: {notes_res}"
                 )
                 break
 
             notes = notes_res["notes"]
             utils.logger.info(
-                f"[XiaoHongShuClient.get_all_notes_by_creator] got user_id:{user_id} notes len : {len(notes)}"
+                f"[XiaoHongShuClient.iter_notes_by_creator] got user_id:{user_id} notes len : {len(notes)}"
             )
+            yield notes
+            await asyncio.sleep(crawl_interval)
+
+    async def get_all_notes_by_creator(
+        self,
+        user_id: str,
+        crawl_interval: float = 1.0,
+        callback: Optional[Callable] = None,
+    ) -> List[Dict]:
+        """
+        获取指定用户下的所有发过的帖子，该方法会一直查找一个用户下的所有帖子信息
+        帖子很多时建议直接使用 iter_notes_by_creator 边翻页边处理
+        Args:
+            user_id: 用户ID
+            crawl_interval: 爬取一次的延迟单位（秒）
+            callback: 一次分页爬取结束后的更新回调函数
+
+        Returns:
+
+        """
+        result = []
+        async for notes in self.iter_notes_by_creator(user_id, crawl_interval):
             if callback:
                 await callback(notes)
-            await asyncio.sleep(crawl_interval)
             result.extend(notes)
         return result
 
@@ -24,8 +24,11 @@ from base.base_crawler import AbstractCrawler
 from config import CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES
 from model.m_xiaohongshu import NoteUrlInfo
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_rotator import ProxyRotator
 from store import xhs as xhs_store
 from tools import utils
+from tools.async_util import CrawlProgress, gather_with_concurrency, prefetch_iter
+from tools.seen_filter import get_seen_filter
 from var import crawler_type_var, source_keyword_var
 
 from .client import XiaoHongShuClient
@@ -47,11 +50,13 @@ class XiaoHongShuCrawler(AbstractCrawler):
 
     async def start(self) -> None:
         playwright_proxy_format, httpx_proxy_format = None, None
+        proxy_rotator: Optional[ProxyRotator] = None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(
                 config.IP_PROXY_POOL_COUNT, enable_validate_ip=True
             )
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
+            proxy_rotator = ProxyRotator(ip_proxy_pool, ip_proxy_info)
             playwright_proxy_format, httpx_proxy_format = self.format_proxy_info(
                 ip_proxy_info
             )
@@ -80,6 +85,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
 
             # Create a client to interact with the xiaohongshu website.
             self.xhs_client = await self.create_xhs_client(httpx_proxy_format)
+            self.xhs_client.proxy_rotator = proxy_rotator
             if not await self.xhs_client.pong():
                 login_obj = XiaoHongShuLogin(
                     login_type=config.LOGIN_TYPE,
@@ -155,6 +161,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
                         utils.logger.info("No more content!")
                         break
                     semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+                    seen_filter = get_seen_filter()
                     task_list = [
                         self.get_note_detail_async_task(
                             note_id=post_item.get("id"),
@@ -164,11 +171,12 @@ class XiaoHongShuCrawler(AbstractCrawler):
                         )
                         for post_item in notes_res.get("items", {})
                         if post_item.get("model_type") not in ("rec_query", "hot_query")
+                        and not (seen_filter and seen_filter.should_skip(post_item.get("id"), keyword))
                     ]
                     note_details = await asyncio.gather(*task_list)
                     for note_detail in note_details:
                         if note_detail:
-                            await xhs_store.update_xhs_note(note_detail)
+                            await self.save_note(note_detail)
                             await self.get_notice_media(note_detail)
                             note_ids.append(note_detail.get("note_id"))
                             xsec_tokens.append(note_detail.get("xsec_token"))
@@ -188,31 +196,51 @@ class XiaoHongShuCrawler(AbstractCrawler):
         utils.logger.info(
             "[XiaoHongShuCrawler.get_creators_and_notes] Begin get xiaohongshu creators"
         )
-        for user_id in config.XHS_CREATOR_ID_LIST:
-            # get creator detail info from web html content
-            createor_info: Dict = await self.xhs_client.get_creator_info(
-                user_id=user_id
-            )
-            if createor_info:
-                await xhs_store.save_creator(user_id, creator=createor_info)
+        progress = CrawlProgress(
+            "XiaoHongShuCrawler.get_creators_and_notes", len(config.XHS_CREATOR_ID_LIST)
+        )
+        await gather_with_concurrency(
+            config.MAX_CREATOR_CONCURRENCY_NUM,
+            *[
+                progress.track(user_id, self.get_creator_and_notes(user_id))
+                for user_id in config.XHS_CREATOR_ID_LIST
+            ],
+        )
 
-            # When proxy is not enabled, increase the crawling interval
-            if config.ENABLE_IP_PROXY:
-                crawl_interval = random.random()
-            else:
-                crawl_interval = random.uniform(1, config.CRAWLER_MAX_SLEEP_SEC)
-            # Get all note information of the creator
-            all_notes_list = await self.xhs_client.get_all_notes_by_creator(
-                user_id=user_id,
-                crawl_interval=crawl_interval,
-                callback=self.fetch_creator_notes_detail,
-            )
+    async def get_creator_and_notes(self, user_id: str) -> None:
+        """Get a creator's info, notes and their comments."""
+        # get creator detail info from web html content
+        createor_info: Dict = await self.xhs_client.get_creator_info(
+            user_id=user_id
+        )
+        if createor_info:
+            await xhs_store.save_creator(user_id, creator=createor_info)
 
-            note_ids = []
-            xsec_tokens = []
-            for note_item in all_notes_list:
-                note_ids.append(note_item.get("note_id"))
-                xsec_tokens.append(note_item.get("xsec_token"))
+        # When proxy is not enabled, increase the crawling interval
+        if config.ENABLE_IP_PROXY:
+            crawl_interval = random.random()
+        else:
+            crawl_interval = random.uniform(1, config.CRAWLER_MAX_SLEEP_SEC)
+        # Get all note information of the creator page by page, the next page is prefetched
+        # while the current page's details and comments are being crawled
+        async for note_list in prefetch_iter(
+            self.xhs_client.iter_notes_by_creator(
+                user_id=user_id, crawl_interval=crawl_interval
+            ),
+            buffer_size=config.CREATOR_PAGE_PREFETCH_NUM,
+        ):
+            seen_filter = get_seen_filter()
+            if seen_filter:
+                note_list = [
+                    note_item
+                    for note_item in note_list
+                    if not seen_filter.should_skip(
+                        note_item.get("note_id"), source_keyword_var.get()
+                    )
+                ]
+            await self.fetch_creator_notes_detail(note_list)
+            note_ids = [note_item.get("note_id") for note_item in note_list]
+            xsec_tokens = [note_item.get("xsec_token") for note_item in note_list]
             await self.batch_get_note_comments(note_ids, xsec_tokens)
 
     async def fetch_creator_notes_detail(self, note_list: List[Dict]):
@@ -233,12 +261,13 @@ class XiaoHongShuCrawler(AbstractCrawler):
         note_details = await asyncio.gather(*task_list)
         for note_detail in note_details:
             if note_detail:
-                await xhs_store.update_xhs_note(note_detail)
+                await self.save_note(note_detail)
 
     async def get_specified_notes(self):
         """
         Get the information and comments of the specified post
         must be specified note_id, xsec_source, xsec_token⚠️⚠️⚠️
+        explicitly specified notes ignore the seen filter
         Returns:
 
         """
@@ -263,9 +292,17 @@ class XiaoHongShuCrawler(AbstractCrawler):
             if note_detail:
                 need_get_comment_note_ids.append(note_detail.get("note_id", ""))
                 xsec_tokens.append(note_detail.get("xsec_token", ""))
-                await xhs_store.update_xhs_note(note_detail)
+                await self.save_note(note_detail)
         await self.batch_get_note_comments(need_get_comment_note_ids, xsec_tokens)
 
+    @staticmethod
+    async def save_note(note_detail: Dict):
+        """Save the note and mark it as crawled in the seen filter"""
+        await xhs_store.update_xhs_note(note_detail)
+        seen_filter = get_seen_filter()
+        if seen_filter:
+            seen_filter.add(note_detail.get("note_id", ""))
+
     async def get_note_detail_async_task(
         self,
         note_id: str,
@@ -15,7 +15,6 @@ import json
 from typing import Any, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode
 
-import httpx
 from httpx import Response
 from playwright.async_api import BrowserContext, Page
 from tenacity import retry, stop_after_attempt, wait_fixed
@@ -25,6 +24,9 @@ from base.base_crawler import AbstractApiClient
 from constant import zhihu as zhihu_constant
 from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
 from tools import utils
+from tools.async_util import gather_with_concurrency, get_platform_rate_limiter, sub_comment_concurrency
+from tools.comment_watermark import filter_new_comments, get_comment_watermark_store
+from tools.http_client_pool import pooled_client
 
 from .exception import DataFetchError, ForbiddenError
 from .field import SearchSort, SearchTime, SearchType
@@ -79,7 +81,9 @@ class ZhiHuClient(AbstractApiClient):
         # return response.text
         return_response = kwargs.pop('return_response', False)
 
-        async with httpx.AsyncClient(proxies=self.proxies, ) as client:
+        await get_platform_rate_limiter().acquire()
+        proxies = await self.request_proxies()
+        async with pooled_client(proxies) as client:
             response = await client.request(
                 method, url, timeout=self.timeout,
                 **kwargs
@@ -275,8 +279,18 @@ class ZhiHuClient(AbstractApiClient):
         is_end: bool = False
         offset: str = ""
         limit: int = 10
+        # 开启增量爬取时按时间倒序翻页，遇到上次已爬取到的评论即停止；上次提前停止时从停止处继续
+        watermark_store = get_comment_watermark_store()
+        watermark = watermark_store.get(content.content_id) if watermark_store else None
+        order_by = "ts" if watermark_store else "score"
+        if watermark_store:
+            offset = watermark_store.resume_cursor(content.content_id)
+        newest_comment: Optional[ZhihuComment] = None
+        page_offset = offset
         while not is_end:
-            root_comment_res = await self.get_root_comments(content.content_id, content.content_type, offset, limit)
+            page_offset = offset
+            root_comment_res = await self.get_root_comments(content.content_id, content.content_type, offset, limit,
+                                                            order_by=order_by)
             if not root_comment_res:
                 break
             paging_info = root_comment_res.get("paging", {})
@@ -284,6 +298,17 @@ class ZhiHuClient(AbstractApiClient):
             offset = self._extractor.extract_offset(paging_info)
             comments = self._extractor.extract_comments(content, root_comment_res.get("data"))
 
+            if watermark_store:
+                if newest_comment is None and comments:
+                    newest_comment = comments[0]
+                comments, reach_watermark = filter_new_comments(
+                    comments, watermark,
+                    get_comment_id=lambda c: c.comment_id,
+                    get_create_time=lambda c: c.publish_time,
+                )
+                if reach_watermark:
+                    is_end = True
+
             if not comments:
                 break
 
@@ -293,6 +318,16 @@ class ZhiHuClient(AbstractApiClient):
             result.extend(comments)
             await self.get_comments_all_sub_comments(content, comments, crawl_interval=crawl_interval, callback=callback)
             await asyncio.sleep(crawl_interval)
+        if watermark_store:
+            # 只有到达水位线或翻到最后一页时水位线才前进，请求失败等原因提前停止时保留原来的水位线，下次从停止处继续
+            watermark_store.finish(
+                content.content_id,
+                newest_comment_id=newest_comment.comment_id if newest_comment else None,
+                newest_create_time=newest_comment.publish_time if newest_comment else None,
+                cursor=page_offset,
+                completed=bool(is_end),
+                new_comment_count=len(result),
+            )
         return result
 
     async def get_comments_all_sub_comments(self, content: ZhihuContent, comments: List[ZhihuComment], crawl_interval: float = 1.0,
@@ -311,31 +346,55 @@ class ZhiHuClient(AbstractApiClient):
         if not config.ENABLE_GET_SUB_COMMENTS:
             return []
 
+        # 多条一级评论的子评论并发展开，单条一级评论内部按顺序翻页，保证同一条评论下回调的顺序不变
+        root_results = await gather_with_concurrency(
+            sub_comment_concurrency(),
+            *[self.get_comment_all_sub_comments(content, parment_comment, crawl_interval, callback)
+              for parment_comment in comments]
+        )
+        all_sub_comments: List[ZhihuComment] = []
+        for sub_comments in root_results:
+            all_sub_comments.extend(sub_comments)
+        return all_sub_comments
+
+    async def get_comment_all_sub_comments(self, content: ZhihuContent, parment_comment: ZhihuComment,
+                                           crawl_interval: float = 1.0,
+                                           callback: Optional[Callable] = None) -> List[ZhihuComment]:
+        """
+        获取单条一级评论下的所有子评论
+        Args:
+            content: 内容详情对象(问题｜文章｜视频)
+            parment_comment: 一级评论
+            crawl_interval: 爬取一次笔记的延迟单位（秒）
+            callback: 一次笔记爬取结束后
+
+        Returns:
+
+        """
         all_sub_comments: List[ZhihuComment] = []
-        for parment_comment in comments:
-            if parment_comment.sub_comment_count == 0:
-                continue
-
-            is_end: bool = False
-            offset: str = ""
-            limit: int = 10
-            while not is_end:
-                child_comment_res = await self.get_child_comments(parment_comment.comment_id, offset, limit)
-                if not child_comment_res:
-                    break
-                paging_info = child_comment_res.get("paging", {})
-                is_end = paging_info.get("is_end")
-                offset = self._extractor.extract_offset(paging_info)
-                sub_comments = self._extractor.extract_comments(content, child_comment_res.get("data"))
-
-                if not sub_comments:
-                    break
-
-                if callback:
-                    await callback(sub_comments)
-
-                all_sub_comments.extend(sub_comments)
-                await asyncio.sleep(crawl_interval)
+        if parment_comment.sub_comment_count == 0:
+            return all_sub_comments
+
+        is_end: bool = False
+        offset: str = ""
+        limit: int = 10
+        while not is_end:
+            child_comment_res = await self.get_child_comments(parment_comment.comment_id, offset, limit)
+            if not child_comment_res:
+                break
+            paging_info = child_comment_res.get("paging", {})
+            is_end = paging_info.get("is_end")
+            offset = self._extractor.extract_offset(paging_info)
+            sub_comments = self._extractor.extract_comments(content, child_comment_res.get("data"))
+
+            if not sub_comments:
+                break
+
+            if callback:
+                await callback(sub_comments)
+
+            all_sub_comments.extend(sub_comments)
+            await asyncio.sleep(crawl_interval)
         return all_sub_comments
 
     async def get_creator_info(self, url_token: str) -> Optional[ZhihuCreator]:
@@ -24,8 +24,10 @@ from constant import zhihu as constant
 from base.base_crawler import AbstractCrawler
 from model.m_zhihu import ZhihuContent, ZhihuCreator
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_rotator import ProxyRotator
 from store import zhihu as zhihu_store
 from tools import utils
+from tools.async_util import CrawlProgress, gather_with_concurrency
 from var import crawler_type_var, source_keyword_var
 
 from .client import ZhiHuClient
@@ -52,9 +54,11 @@ class ZhihuCrawler(AbstractCrawler):
 
         """
         playwright_proxy_format, httpx_proxy_format = None, None
+        proxy_rotator: Optional[ProxyRotator] = None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
+            proxy_rotator = ProxyRotator(ip_proxy_pool, ip_proxy_info)
             playwright_proxy_format, httpx_proxy_format = self.format_proxy_info(ip_proxy_info)
 
         async with async_playwright() as playwright:
@@ -74,6 +78,7 @@ class ZhihuCrawler(AbstractCrawler):
 
             # Create a client to interact with the zhihu website.
             self.zhihu_client = await self.create_zhihu_client(httpx_proxy_format)
+            self.zhihu_client.proxy_rotator = proxy_rotator
             if not await self.zhihu_client.pong():
                 login_obj = ZhiHuLogin(
                     login_type=config.LOGIN_TYPE,
@@ -188,44 +193,59 @@ class ZhihuCrawler(AbstractCrawler):
 
         """
         utils.logger.info("[ZhihuCrawler.get_creators_and_notes] Begin get xiaohongshu creators")
-        for user_link in config.ZHIHU_CREATOR_URL_LIST:
-            utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Begin get creator {user_link}")
-            user_url_token = user_link.split("/")[-1]
-            # get creator detail info from web html content
-            createor_info: ZhihuCreator = await self.zhihu_client.get_creator_info(url_token=user_url_token)
-            if not createor_info:
-                utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Creator {user_url_token} not found")
-                continue
+        progress = CrawlProgress("ZhihuCrawler.get_creators_and_notes", len(config.ZHIHU_CREATOR_URL_LIST))
+        await gather_with_concurrency(
+            config.MAX_CREATOR_CONCURRENCY_NUM,
+            *[progress.track(user_link, self.get_creator_and_notes(user_link))
+              for user_link in config.ZHIHU_CREATOR_URL_LIST]
+        )
 
-            utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Creator info: {createor_info}")
-            await zhihu_store.save_creator(creator=createor_info)
+    async def get_creator_and_notes(self, user_link: str) -> None:
+        """
+        Get a creator's information and their notes and comments
+        Args:
+            user_link: creator home page url
 
-            # 默认只提取回答信息，如果需要文章和视频，把下面的注释打开即可
+        Returns:
 
-            # Get all anwser information of the creator
-            all_content_list = await self.zhihu_client.get_all_anwser_by_creator(
-                creator=createor_info,
-                crawl_interval=random.random(),
-                callback=zhihu_store.batch_update_zhihu_contents
-            )
+        """
+        utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Begin get creator {user_link}")
+        user_url_token = user_link.split("/")[-1]
+        # get creator detail info from web html content
+        createor_info: ZhihuCreator = await self.zhihu_client.get_creator_info(url_token=user_url_token)
+        if not createor_info:
+            utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Creator {user_url_token} not found")
+            return
+
+        utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Creator info: {createor_info}")
+        await zhihu_store.save_creator(creator=createor_info)
+
+        # 默认只提取回答信息，如果需要文章和视频，把下面的注释打开即可
+
+        # Get all anwser information of the creator
+        all_content_list = await self.zhihu_client.get_all_anwser_by_creator(
+            creator=createor_info,
+            crawl_interval=random.random(),
+            callback=zhihu_store.batch_update_zhihu_contents
+        )
 
 
-            # Get all articles of the creator's contents
-            # all_content_list = await self.zhihu_client.get_all_articles_by_creator(
-            #     creator=createor_info,
-            #     crawl_interval=random.random(),
-            #     callback=zhihu_store.batch_update_zhihu_contents
-            # )
+        # Get all articles of the creator's contents
+        # all_content_list = await self.zhihu_client.get_all_articles_by_creator(
+        #     creator=createor_info,
+        #     crawl_interval=random.random(),
+        #     callback=zhihu_store.batch_update_zhihu_contents
+        # )
 
-            # Get all videos of the creator's contents
-            # all_content_list = await self.zhihu_client.get_all_videos_by_creator(
-            #     creator=createor_info,
-            #     crawl_interval=random.random(),
-            #     callback=zhihu_store.batch_update_zhihu_contents
-            # )
+        # Get all videos of the creator's contents
+        # all_content_list = await self.zhihu_client.get_all_videos_by_creator(
+        #     creator=createor_info,
+        #     crawl_interval=random.random(),
+        #     callback=zhihu_store.batch_update_zhihu_contents
+        # )
 
-            # Get all comments of the creator's contents
-            await self.batch_get_content_comments(all_content_list)
+        # Get all comments of the creator's contents
+        await self.batch_get_content_comments(all_content_list)
 
     async def get_note_detail(
         self, full_note_url: str, semaphore: asyncio.Semaphore
@@ -0,0 +1,246 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 代理IP健康度统计：每个代理的延迟 EWMA、成功率以及被平台封禁、出现验证码的次数，
+#            代理池按健康度加权选择代理，连续失败或被封禁的代理隔离一段时间后才会再次使用
+
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+import httpx
+
+import config
+from tools import utils
+
+# 没有延迟数据的代理按该延迟（秒）计算得分
+_DEFAULT_LATENCY = 1.0
+# 传输层记为失败的状态码（5xx 之外），403、429 也可能是登录态失效或请求过快，不能据此判断代理被封禁，
+# 按普通失败计入连续失败次数；确认被封禁由平台客户端调用 report_proxy_blocked 上报
+FAILED_STATUS_CODES = {403, 429}
+
+
+def proxy_key(ip: str, port: int) -> str:
+    return f"{ip}:{port}"
+
+
+def proxy_key_from_proxies(proxies: Union[str, Dict, None]) -> Optional[str]:
+    """
+    从 httpx 格式的代理中解析代理的键（ip:port）
+    :param proxies: 代理地址或 {协议: 代理地址}
+    :return: 没有使用代理时返回 None
+    """
+    if isinstance(proxies, dict):
+        proxies = next(iter(proxies.values()), None)
+    if not proxies:
+        return None
+    parts = urlsplit(str(proxies))
+    if not parts.hostname or not parts.port:
+        return None
+    return proxy_key(parts.hostname, parts.port)
+
+
+def _percentile(values: List[float], percent: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent))]
+
+
+class ProxyHealth:
+    """
+    单个代理的健康度
+    """
+
+    def __init__(self, key: str, latency_window: int):
+        self.key = key
+        self.latency_ewma: Optional[float] = None
+        self.latencies: Deque[float] = deque(maxlen=latency_window)
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.blocks = 0
+        self.captchas = 0
+        self.quarantined_until = 0.0
+
+    @property
+    def success_rate(self) -> float:
+        """
+        平滑后的成功率，没有请求记录的代理为 0.5
+        """
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    def score(self) -> float:
+        """
+        得分 = 成功率 / (1 + 延迟秒数)，成功率高、延迟低的代理得分高
+        :return:
+        """
+        latency = _DEFAULT_LATENCY if self.latency_ewma is None else self.latency_ewma
+        return self.success_rate / (1 + latency)
+
+    def is_quarantined(self, now: Optional[float] = None) -> bool:
+        return self.quarantined_until > (time.monotonic() if now is None else now)
+
+    def to_dict(self) -> Dict:
+        return {
+            "proxy": self.key,
+            "score": round(self.score(), 4),
+            "latency_ewma": None if self.latency_ewma is None else round(self.latency_ewma, 4),
+            "latency_p95": _percentile(list(self.latencies), 0.95),
+            "success_rate": round(self.successes / (self.successes + self.failures), 4)
+            if self.successes + self.failures else None,
+            "successes": self.successes,
+            "failures": self.failures,
+            "blocks": self.blocks,
+            "captchas": self.captchas,
+            "quarantined": self.is_quarantined(),
+        }
+
+
+class ProxyHealthTracker:
+    """
+    所有代理的健康度，请求结果由代理池的验证、平台客户端的请求上报；
+    隔离的代理不会被代理池选中，也不会再次加入代理池
+    """
+
+    def __init__(self, ewma_alpha: Optional[float] = None, max_consecutive_failures: Optional[int] = None,
+                 quarantine_sec: Optional[float] = None, latency_window: Optional[int] = None):
+        """
+        :param ewma_alpha: 延迟 EWMA 的平滑系数，默认取 config.PROXY_HEALTH_EWMA_ALPHA
+        :param max_consecutive_failures: 连续失败多少次后隔离，默认取 config.PROXY_HEALTH_MAX_CONSECUTIVE_FAILURES
+        :param quarantine_sec: 隔离的秒数，默认取 config.PROXY_QUARANTINE_SEC
+        :param latency_window: 每个代理保留最近多少次请求的延迟用于统计 p95，默认取 config.PROXY_HEALTH_LATENCY_WINDOW
+        """
+        self.ewma_alpha = config.PROXY_HEALTH_EWMA_ALPHA if ewma_alpha is None else ewma_alpha
+        self.max_consecutive_failures = config.PROXY_HEALTH_MAX_CONSECUTIVE_FAILURES \
+            if max_consecutive_failures is None else max_consecutive_failures
+        self.quarantine_sec = config.PROXY_QUARANTINE_SEC if quarantine_sec is None else quarantine_sec
+        self.latency_window = config.PROXY_HEALTH_LATENCY_WINDOW if latency_window is None else latency_window
+        self._health: Dict[str, ProxyHealth] = {}
+
+    def get(self, key: str) -> ProxyHealth:
+        health = self._health.get(key)
+        if health is None:
+            health = self._health[key] = ProxyHealth(key, self.latency_window)
+        return health
+
+    def score(self, key: str) -> float:
+        health = self._health.get(key)
+        return ProxyHealth(key, 0).score() if health is None else health.score()
+
+    def is_quarantined(self, key: str) -> bool:
+        health = self._health.get(key)
+        return health is not None and health.is_quarantined()
+
+    def record_success(self, key: str, latency: float):
+        """
+        记录一次成功的请求
+        :param key: 代理的键（ip:port）
+        :param latency: 请求耗时（秒）
+        :return:
+        """
+        health = self.get(key)
+        health.successes += 1
+        health.consecutive_failures = 0
+        health.latencies.append(latency)
+        if health.latency_ewma is None:
+            health.latency_ewma = latency
+        else:
+            health.latency_ewma = self.ewma_alpha * latency + (1 - self.ewma_alpha) * health.latency_ewma
+
+    def record_failure(self, key: str, blocked: bool = False, captcha: bool = False):
+        """
+        记录一次失败的请求，被封禁或出现验证码时立即隔离，其他失败连续达到 max_consecutive_failures 次后隔离
+        :param key: 代理的键（ip:port）
+        :param blocked: 是否被平台封禁
+        :param captcha: 是否出现验证码
+        :return:
+        """
+        health = self.get(key)
+        health.failures += 1
+        health.consecutive_failures += 1
+        health.blocks += int(blocked)
+        health.captchas += int(captcha)
+        if blocked or captcha or health.consecutive_failures >= self.max_consecutive_failures:
+            self.quarantine(key)
+
+    def quarantine(self, key: str):
+        health = self.get(key)
+        if not health.is_quarantined():
+            utils.logger.info(f"[ProxyHealthTracker.quarantine] quarantine proxy {key} for {self.quarantine_sec}s, "
+                              f"blocks: {health.blocks}, captchas: {health.captchas}, "
+                              f"consecutive failures: {health.consecutive_failures}")
+        health.quarantined_until = time.monotonic() + self.quarantine_sec
+        health.consecutive_failures = 0
+
+    def stats(self) -> Dict:
+        """
+        所有代理的健康度以及整体的延迟分位数，用于监控
+        :return:
+        """
+        latencies = [latency for health in self._health.values() for latency in health.latencies]
+        return {
+            "proxies": [health.to_dict() for health in sorted(self._health.values(), key=lambda h: -h.score())],
+            "quarantined": sum(1 for health in self._health.values() if health.is_quarantined()),
+            "latency_p50": _percentile(latencies, 0.5),
+            "latency_p95": _percentile(latencies, 0.95),
+        }
+
+
+_tracker: Optional[ProxyHealthTracker] = None
+
+
+def get_proxy_health_tracker() -> ProxyHealthTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = ProxyHealthTracker()
+    return _tracker
+
+
+def report_proxy_blocked(proxies: Union[str, Dict, None], captcha: bool = False):
+    """
+    平台客户端发现请求被封禁或出现验证码时上报，没有使用代理时忽略
+    :param proxies: 请求使用的 httpx 格式的代理
+    :param captcha: 是否是验证码
+    :return:
+    """
+    key = proxy_key_from_proxies(proxies)
+    if key is not None:
+        get_proxy_health_tracker().record_failure(key, blocked=not captcha, captcha=captcha)
+
+
+class ProxyHealthTransport(httpx.AsyncBaseTransport):
+    """
+    记录请求结果的 httpx 传输层：连接错误、超时、5xx、403 和 429 记为失败，其他响应按收到响应头的耗时记为成功
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, key: str, tracker: Optional[ProxyHealthTracker] = None):
+        self.inner = inner
+        self.key = key
+        self.tracker = tracker or get_proxy_health_tracker()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = await self.inner.handle_async_request(request)
+        except httpx.TransportError:
+            self.tracker.record_failure(self.key)
+            raise
+        if response.status_code in FAILED_STATUS_CODES or response.status_code >= 500:
+            self.tracker.record_failure(self.key)
+        else:
+            self.tracker.record_success(self.key, time.perf_counter() - start)
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
@@ -13,42 +13,59 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2023/12/2 13:45
 # @Desc    : ip代理池实现
+import asyncio
 import random
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_fixed
 
 import config
 from proxy.providers import new_jisu_http_proxy, new_kuai_daili_proxy
 from tools import utils
+from tools.async_util import gather_with_concurrency
 
 from .base_proxy import ProxyProvider
+from .proxy_health import ProxyHealthTracker, get_proxy_health_tracker, proxy_key
 from .types import IpInfoModel, ProviderNameEnum
 
 
 class ProxyIpPool:
-    def __init__(self, ip_pool_count: int, enable_validate_ip: bool, ip_provider: ProxyProvider) -> None:
+    def __init__(self, ip_pool_count: int, enable_validate_ip: bool, ip_provider: ProxyProvider,
+                 health_tracker: Optional[ProxyHealthTracker] = None) -> None:
         """
-
+        代理池，后台任务保持池中至少有 ip_pool_count 个验证通过、未临近过期的代理，取代理时不需要等待提取和验证；
+        取代理时按健康度加权随机选择，被隔离的代理移出代理池
         Args:
-            ip_pool_count:
-            enable_validate_ip:
-            ip_provider:
+            ip_pool_count: 池中保持的可用代理数量
+            enable_validate_ip: 是否验证代理
+            ip_provider: 代理提供商
+            health_tracker: 代理健康度统计，默认与平台客户端共用全局的统计
         """
         self.valid_ip_url = "https://httpbin.org/ip"  # 验证 IP 是否有效的地址
         self.ip_pool_count = ip_pool_count
         self.enable_validate_ip = enable_validate_ip
         self.proxy_list: List[IpInfoModel] = []
+        # 被取走独占使用的代理，代理商从缓存中再次返回时不能重新加入代理池
+        self._taken: Dict[str, IpInfoModel] = {}
         self.ip_provider: ProxyProvider = ip_provider
+        self.health: ProxyHealthTracker = health_tracker or get_proxy_health_tracker()
+        self._refill_task: Optional[asyncio.Task] = None
+        # 补充失败后的重试间隔（秒），每次失败翻倍，补充成功后重置
+        self.refill_min_backoff = 1.0
+        self.refill_max_backoff = config.IP_PROXY_REFILL_MAX_BACKOFF_SEC
+        # 代理被取走或临近过期时唤醒后台补充任务
+        self._refill_event: Optional[asyncio.Event] = None
+        # 池中有可用代理时 set，等待代理的 get_proxy 在此等待
+        self._available_event: Optional[asyncio.Event] = None
 
     async def load_proxies(self) -> None:
         """
-        加载IP代理
+        加载IP代理，提取后并发验证，只保留验证通过的代理
         Returns:
 
         """
-        self.proxy_list = await self.ip_provider.get_proxies(self.ip_pool_count)
+        await self._fill()
 
     async def _is_valid_proxy(self, proxy: IpInfoModel) -> bool:
         """
@@ -61,39 +78,216 @@ class ProxyIpPool:
             httpx_proxy = {
                 f"{proxy.protocol}": f"http://{proxy.user}:{proxy.password}@{proxy.ip}:{proxy.port}"
             }
-            async with httpx.AsyncClient(proxies=httpx_proxy) as client:
+            async with httpx.AsyncClient(proxies=httpx_proxy, timeout=config.IP_PROXY_VALIDATE_TIMEOUT) as client:
                 response = await client.get(self.valid_ip_url)
-            if response.status_code == 200:
-                return True
-            else:
-                return False
+            return response.status_code == 200
         except Exception as e:
             utils.logger.info(f"[ProxyIpPool._is_valid_proxy] testing {proxy.ip} err: {e}")
-            raise e
+            return False
+
+    async def validate_proxies(self, proxies: List[IpInfoModel]) -> List[IpInfoModel]:
+        """
+        并发验证代理，每个代理最多等待 IP_PROXY_VALIDATE_TIMEOUT 秒
+        :param proxies:
+        :return: 验证通过的代理
+        """
+        if not self.enable_validate_ip:
+            return proxies
+
+        async def _validate(proxy: IpInfoModel) -> bool:
+            start = time.perf_counter()
+            try:
+                valid = await asyncio.wait_for(self._is_valid_proxy(proxy), timeout=config.IP_PROXY_VALIDATE_TIMEOUT)
+            except asyncio.TimeoutError:
+                utils.logger.info(f"[ProxyIpPool.validate_proxies] testing {proxy.ip} timeout")
+                valid = False
+            # 验证请求的耗时作为代理的初始延迟
+            if valid:
+                self.health.record_success(self._key(proxy), time.perf_counter() - start)
+            else:
+                self.health.record_failure(self._key(proxy))
+            return valid
+
+        results = await gather_with_concurrency(config.IP_PROXY_VALIDATE_CONCURRENCY,
+                                                *(_validate(proxy) for proxy in proxies))
+        return [proxy for proxy, valid in zip(proxies, results) if valid]
+
+    @staticmethod
+    def _key(proxy: IpInfoModel) -> str:
+        return proxy_key(proxy.ip, proxy.port)
+
+    @staticmethod
+    def _seconds_to_expire(proxy: IpInfoModel) -> float:
+        if not proxy.expired_time_ts:
+            return float("inf")
+        return proxy.expired_time_ts - time.time()
+
+    def _is_usable(self, proxy: IpInfoModel) -> bool:
+        return self._seconds_to_expire(proxy) > config.IP_PROXY_EXPIRE_MARGIN_SEC \
+            and not self.health.is_quarantined(self._key(proxy))
+
+    def _drop_unusable(self):
+        """
+        移除临近过期和被隔离的代理
+        :return:
+        """
+        self.proxy_list = [proxy for proxy in self.proxy_list if self._is_usable(proxy)]
+        self._update_available()
+
+    def _update_available(self):
+        if self._available_event is None:
+            return
+        if self.proxy_list:
+            self._available_event.set()
+        else:
+            self._available_event.clear()
+
+    async def _fill(self) -> int:
+        """
+        从代理商提取代理补充到池中，验证不通过的代理直接丢弃；
+        代理商优先返回缓存中的代理（包括池中已有和被取走的代理），所以多提取这部分数量再排除掉
+        :return: 补充的代理数量
+        """
+        self._drop_unusable()
+        need_count = self.ip_pool_count - len(self.proxy_list)
+        if need_count <= 0:
+            return 0
+        self._taken = {key: proxy for key, proxy in self._taken.items() if self._is_usable(proxy)}
+        known = {self._key(proxy) for proxy in self.proxy_list} | set(self._taken)
+        proxies = [proxy for proxy in await self.ip_provider.get_proxies(need_count + len(known))
+                   if self._key(proxy) not in known and self._is_usable(proxy)][:need_count]
+        valid_proxies = await self.validate_proxies(proxies)
+        utils.logger.info(f"[ProxyIpPool._fill] {len(valid_proxies)}/{len(proxies)} proxies valid, "
+                          f"pool size: {len(self.proxy_list) + len(valid_proxies)}")
+        self.proxy_list.extend(valid_proxies)
+        self._update_available()
+        return len(valid_proxies)
+
+    def _next_refill_delay(self) -> float:
+        """
+        距离池中最早临近过期的代理需要被替换还有多少秒
+        :return:
+        """
+        if not self.proxy_list:
+            return 0
+        return max(0.0, min(self._seconds_to_expire(proxy) for proxy in self.proxy_list)
+                   - config.IP_PROXY_EXPIRE_MARGIN_SEC)
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
-    async def get_proxy(self) -> IpInfoModel:
+    async def _refill_loop(self):
         """
-        从代理池中随机提取一个代理IP
+        后台补充代理：池中代理不足、代理被取走或临近过期时提取新的代理，
+        提取报错或没有补充到可用代理时按指数退避重试，避免频繁请求代理商
         :return:
         """
-        if len(self.proxy_list) == 0:
-            await self._reload_proxies()
+        backoff = self.refill_min_backoff
+        while True:
+            try:
+                if len(self.proxy_list) < self.ip_pool_count:
+                    if await self._fill() == 0:
+                        utils.logger.info(f"[ProxyIpPool._refill_loop] no valid proxy added, retry after {backoff}s")
+                        await asyncio.sleep(backoff)
+                        backoff = min(backoff * 2, self.refill_max_backoff)
+                    else:
+                        backoff = self.refill_min_backoff
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                utils.logger.error(f"[ProxyIpPool._refill_loop] refill proxies err: {ex}, retry after {backoff}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.refill_max_backoff)
+                continue
+            backoff = self.refill_min_backoff
+            self._refill_event.clear()
+            try:
+                await asyncio.wait_for(self._refill_event.wait(),
+                                       timeout=min(max(self._next_refill_delay(), 1), 60))
+            except asyncio.TimeoutError:
+                pass
+            self._drop_unusable()
 
-        proxy = random.choice(self.proxy_list)
-        self.proxy_list.remove(proxy) # 取出来一个IP就应该移出掉
-        if self.enable_validate_ip:
-            if not await self._is_valid_proxy(proxy):
-                raise Exception("[ProxyIpPool.get_proxy] current ip invalid and again get it")
+    def start_refill(self):
+        """
+        启动后台补充任务，需要在事件循环中调用
+        :return:
+        """
+        if self._refill_task is not None:
+            return
+        self._refill_event = asyncio.Event()
+        self._available_event = asyncio.Event()
+        self._update_available()
+        self._refill_task = asyncio.create_task(self._refill_loop())
+
+    async def close(self):
+        """
+        停止后台补充任务
+        :return:
+        """
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+
+    async def get_proxy(self, remove: bool = True) -> IpInfoModel:
+        """
+        从代理池中按健康度加权随机提取一个代理IP，池中有可用代理时立即返回，池为空时等待后台任务补充
+        :param remove: 是否将代理移出代理池独占使用，按请求轮换代理时不移出，多个请求共用池中的代理
+        :return:
+        """
+        self.start_refill()
+        self._drop_unusable()
+        deadline = time.monotonic() + config.IP_PROXY_GET_TIMEOUT
+        # 多个协程同时等待时，被唤醒后代理可能已经被其他协程取走，需要重新检查
+        while not self.proxy_list:
+            self._refill_event.set()
+            try:
+                await asyncio.wait_for(self._available_event.wait(), timeout=max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                raise Exception("[ProxyIpPool.get_proxy] no valid proxy available") from None
+            self._drop_unusable()
+
+        proxy = random.choices(self.proxy_list, weights=[self.health.score(self._key(p)) for p in self.proxy_list])[0]
+        if not remove:
+            return proxy
+        self.proxy_list.remove(proxy)  # 取出来一个IP就应该移出掉
+        self._taken[self._key(proxy)] = proxy
+        self._update_available()
+        # 通知后台任务补充被取走的代理
+        self._refill_event.set()
         return proxy
 
-    async def _reload_proxies(self):
+    def report_success(self, proxy: IpInfoModel, latency: float):
+        """
+        上报代理的一次成功请求
+        :param proxy:
+        :param latency: 请求耗时（秒）
+        :return:
+        """
+        self.health.record_success(self._key(proxy), latency)
+
+    def report_failure(self, proxy: IpInfoModel, blocked: bool = False, captcha: bool = False):
+        """
+        上报代理的一次失败请求，代理被隔离时从池中移除并通知后台任务补充
+        :param proxy:
+        :param blocked: 是否被平台封禁
+        :param captcha: 是否出现验证码
+        :return:
+        """
+        self.health.record_failure(self._key(proxy), blocked=blocked, captcha=captcha)
+        if self.health.is_quarantined(self._key(proxy)):
+            self._drop_unusable()
+            if self._refill_event is not None:
+                self._refill_event.set()
+
+    def stats(self) -> Dict:
         """
-        # 重新加载代理池
+        代理池大小和代理健康度，用于监控
         :return:
         """
-        self.proxy_list = []
-        await self.load_proxies()
+        return {"pool_size": len(self.proxy_list), **self.health.stats()}
 
 
 IpProxyProvider: Dict[str, ProxyProvider] = {
@@ -114,6 +308,7 @@ async def create_ip_pool(ip_pool_count: int, enable_validate_ip: bool) -> ProxyI
                        ip_provider=IpProxyProvider.get(config.IP_PROXY_PROVIDER_NAME)
                        )
     await pool.load_proxies()
+    pool.start_refill()
     return pool
 
 
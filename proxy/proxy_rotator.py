@@ -0,0 +1,116 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 代理轮换：平台客户端每次请求前按轮换策略从代理池中选择代理
+
+import asyncio
+from typing import Dict, Optional
+
+import config
+from tools import utils
+from tools.crawler_util import format_proxy_info
+
+from .proxy_health import proxy_key
+from .proxy_ip_pool import ProxyIpPool
+from .types import IpInfoModel
+
+ROTATION_SESSION = "session"
+ROTATION_REQUEST = "request"
+ROTATION_EVERY_N = "every_n"
+ROTATION_ON_BLOCK = "on_block"
+
+_ROTATION_POLICIES = (ROTATION_SESSION, ROTATION_REQUEST, ROTATION_EVERY_N, ROTATION_ON_BLOCK)
+
+
+class ProxyRotator:
+    """
+    代理轮换器，request、every_n 策略与其他请求共用代理池中的代理，
+    on_block 策略更换代理时与启动时一样从代理池中取走代理独占使用
+    """
+
+    def __init__(self, ip_pool: ProxyIpPool, proxy: Optional[IpInfoModel] = None, policy: Optional[str] = None,
+                 rotate_every: Optional[int] = None):
+        """
+        :param ip_pool: 代理池
+        :param proxy: 当前使用的代理（爬虫启动时取得的代理），为空时第一次请求从代理池中选择
+        :param policy: 轮换策略，默认取 config.IP_PROXY_ROTATION
+        :param rotate_every: every_n 策略下每个代理使用的请求次数，默认取 config.IP_PROXY_ROTATE_EVERY_N
+        """
+        self.policy = policy or config.IP_PROXY_ROTATION
+        if self.policy not in _ROTATION_POLICIES:
+            raise ValueError(f"Unknown proxy rotation policy: {self.policy}")
+        self.ip_pool = ip_pool
+        self.rotate_every = max(1, config.IP_PROXY_ROTATE_EVERY_N if rotate_every is None else rotate_every)
+        self.proxy: Optional[IpInfoModel] = None
+        self._proxies: Optional[Dict] = None
+        # 当前代理已经使用的请求次数
+        self._requests = 0
+        self.rotations = 0
+        self._lock: Optional[asyncio.Lock] = None
+        if proxy is not None:
+            self._use(proxy)
+
+    def _use(self, proxy: IpInfoModel):
+        self.proxy = proxy
+        _, self._proxies = format_proxy_info(proxy)
+        self._requests = 0
+
+    def _is_blocked(self) -> bool:
+        return self.ip_pool.health.is_quarantined(proxy_key(self.proxy.ip, self.proxy.port))
+
+    def _should_rotate(self) -> bool:
+        if self.proxy is None:
+            return True
+        if self.policy == ROTATION_SESSION:
+            return False
+        if self._is_blocked():
+            return True
+        if self.policy == ROTATION_REQUEST:
+            return self._requests >= 1
+        if self.policy == ROTATION_EVERY_N:
+            return self._requests >= self.rotate_every
+        return False
+
+    async def _rotate(self):
+        if self.proxy is not None and self._is_blocked():
+            utils.logger.info(f"[ProxyRotator._rotate] proxy {self.proxy.ip}:{self.proxy.port} is blocked, "
+                              f"switch to another proxy")
+        proxy = await self.ip_pool.get_proxy(remove=self.policy in (ROTATION_SESSION, ROTATION_ON_BLOCK))
+        self._use(proxy)
+        self.rotations += 1
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def rotate(self) -> Dict:
+        """
+        立即更换代理，不受轮换策略限制，用于客户端重试多次仍然失败的情况
+        :return: 新代理的 httpx 格式
+        """
+        async with self._get_lock():
+            await self._rotate()
+        return self._proxies
+
+    async def next_proxies(self) -> Dict:
+        """
+        本次请求使用的 httpx 格式的代理，需要更换代理时从代理池中选择
+        :return:
+        """
+        if self._should_rotate():
+            async with self._get_lock():
+                # 并发的请求等待锁期间代理可能已经被其他请求更换
+                if self._should_rotate():
+                    await self._rotate()
+        self._requests += 1
+        return self._proxies
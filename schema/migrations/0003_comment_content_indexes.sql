@@ -0,0 +1,10 @@
+-- ----------------------------
+-- 评论表的索引按查询方式调整：
+-- 按内容查询评论（并按评论时间排序）使用 (内容ID, create_time) 联合索引，
+-- 小红书评论表之前缺少 note_id 索引
+-- ----------------------------
+ALTER TABLE `bilibili_video_comment` DROP INDEX `idx_bilibili_vi_video_i_f22873`, ADD KEY `idx_bilibili_video_comment_video_id_create_time` (`video_id`, `create_time`);
+ALTER TABLE `douyin_aweme_comment` DROP INDEX `idx_douyin_awem_aweme_i_c50049`, ADD KEY `idx_douyin_aweme_comment_aweme_id_create_time` (`aweme_id`, `create_time`);
+ALTER TABLE `kuaishou_video_comment` DROP INDEX `idx_kuaishou_vi_video_i_e50914`, ADD KEY `idx_kuaishou_video_comment_video_id_create_time` (`video_id`, `create_time`);
+ALTER TABLE `weibo_note_comment` DROP INDEX `idx_weibo_note__note_id_24f108`, ADD KEY `idx_weibo_note_comment_note_id_create_time` (`note_id`, `create_time`);
+ALTER TABLE `xhs_note_comment` ADD KEY `idx_xhs_note_comment_note_id_create_time` (`note_id`, `create_time`);
@@ -0,0 +1,87 @@
+-- ----------------------------
+-- 评论表按评论时间（create_time）分区，每年一个分区
+-- MySQL 要求分区字段包含在所有主键和唯一键中，评论的 create_time 不会变化，
+-- 唯一键改为 (comment_id, create_time) 后 INSERT ... ON DUPLICATE KEY UPDATE 的去重效果不变
+-- 执行前需要先清理 comment_id 重复的记录；大表执行时间较长，建议在低峰期执行
+-- 这里只建到 p2026，之后的年分区由 python db.py 执行完迁移后按当前日期从 pmax 分区拆分（db.ensure_comment_partitions），需要定期执行
+-- ----------------------------
+
+-- bilibili_video_comment: create_time 单位为秒
+ALTER TABLE `bilibili_video_comment`
+    DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `create_time`),
+    DROP INDEX `idx_bilibili_vi_comment_41c34e`, ADD UNIQUE KEY `idx_bilibili_video_comment_comment_id_create_time` (`comment_id`, `create_time`)
+PARTITION BY RANGE (`create_time`) (
+    PARTITION p2019 VALUES LESS THAN (1577808000),
+    PARTITION p2020 VALUES LESS THAN (1609430400),
+    PARTITION p2021 VALUES LESS THAN (1640966400),
+    PARTITION p2022 VALUES LESS THAN (1672502400),
+    PARTITION p2023 VALUES LESS THAN (1704038400),
+    PARTITION p2024 VALUES LESS THAN (1735660800),
+    PARTITION p2025 VALUES LESS THAN (1767196800),
+    PARTITION p2026 VALUES LESS THAN (1798732800),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- douyin_aweme_comment: create_time 单位为秒
+ALTER TABLE `douyin_aweme_comment`
+    DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `create_time`),
+    DROP INDEX `idx_douyin_awem_comment_fcd7e4`, ADD UNIQUE KEY `idx_douyin_aweme_comment_comment_id_create_time` (`comment_id`, `create_time`)
+PARTITION BY RANGE (`create_time`) (
+    PARTITION p2019 VALUES LESS THAN (1577808000),
+    PARTITION p2020 VALUES LESS THAN (1609430400),
+    PARTITION p2021 VALUES LESS THAN (1640966400),
+    PARTITION p2022 VALUES LESS THAN (1672502400),
+    PARTITION p2023 VALUES LESS THAN (1704038400),
+    PARTITION p2024 VALUES LESS THAN (1735660800),
+    PARTITION p2025 VALUES LESS THAN (1767196800),
+    PARTITION p2026 VALUES LESS THAN (1798732800),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- kuaishou_video_comment: create_time 单位为毫秒
+ALTER TABLE `kuaishou_video_comment`
+    DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `create_time`),
+    DROP INDEX `idx_kuaishou_vi_comment_ed48fa`, ADD UNIQUE KEY `idx_kuaishou_video_comment_comment_id_create_time` (`comment_id`, `create_time`)
+PARTITION BY RANGE (`create_time`) (
+    PARTITION p2019 VALUES LESS THAN (1577808000000),
+    PARTITION p2020 VALUES LESS THAN (1609430400000),
+    PARTITION p2021 VALUES LESS THAN (1640966400000),
+    PARTITION p2022 VALUES LESS THAN (1672502400000),
+    PARTITION p2023 VALUES LESS THAN (1704038400000),
+    PARTITION p2024 VALUES LESS THAN (1735660800000),
+    PARTITION p2025 VALUES LESS THAN (1767196800000),
+    PARTITION p2026 VALUES LESS THAN (1798732800000),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- weibo_note_comment: create_time 单位为秒
+ALTER TABLE `weibo_note_comment`
+    DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `create_time`),
+    DROP INDEX `idx_weibo_note__comment_c7611c`, ADD UNIQUE KEY `idx_weibo_note_comment_comment_id_create_time` (`comment_id`, `create_time`)
+PARTITION BY RANGE (`create_time`) (
+    PARTITION p2019 VALUES LESS THAN (1577808000),
+    PARTITION p2020 VALUES LESS THAN (1609430400),
+    PARTITION p2021 VALUES LESS THAN (1640966400),
+    PARTITION p2022 VALUES LESS THAN (1672502400),
+    PARTITION p2023 VALUES LESS THAN (1704038400),
+    PARTITION p2024 VALUES LESS THAN (1735660800),
+    PARTITION p2025 VALUES LESS THAN (1767196800),
+    PARTITION p2026 VALUES LESS THAN (1798732800),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- xhs_note_comment: create_time 单位为毫秒
+ALTER TABLE `xhs_note_comment`
+    DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `create_time`),
+    DROP INDEX `idx_xhs_note_co_comment_8e8349`, ADD UNIQUE KEY `idx_xhs_note_comment_comment_id_create_time` (`comment_id`, `create_time`)
+PARTITION BY RANGE (`create_time`) (
+    PARTITION p2019 VALUES LESS THAN (1577808000000),
+    PARTITION p2020 VALUES LESS THAN (1609430400000),
+    PARTITION p2021 VALUES LESS THAN (1640966400000),
+    PARTITION p2022 VALUES LESS THAN (1672502400000),
+    PARTITION p2023 VALUES LESS THAN (1704038400000),
+    PARTITION p2024 VALUES LESS THAN (1735660800000),
+    PARTITION p2025 VALUES LESS THAN (1767196800000),
+    PARTITION p2026 VALUES LESS THAN (1798732800000),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
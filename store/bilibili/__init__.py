@@ -14,9 +14,10 @@
 # @Time    : 2024/1/14 19:34
 # @Desc    :
 
-from typing import List
+from typing import Dict, List
 
 import config
+from store.write_behind import get_store_instance
 from var import source_keyword_var
 
 from .bilibili_store_impl import *
@@ -27,7 +28,10 @@ class BiliStoreFactory:
     STORES = {
         "csv": BiliCsvStoreImplement,
         "db": BiliDbStoreImplement,
-        "json": BiliJsonStoreImplement
+        "sqlite": BiliDbStoreImplement,
+        "json": BiliJsonStoreImplement,
+        "jsonl": BiliJsonlStoreImplement,
+        "parquet": BiliParquetStoreImplement
     }
 
     @staticmethod
@@ -35,8 +39,8 @@ class BiliStoreFactory:
         store_class = BiliStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError(
-                "[BiliStoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+                "[BiliStoreFactory.create_store] Invalid save option only supported csv or db or sqlite or json or jsonl or parquet ...")
+        return get_store_instance(store_class)
 
 
 async def update_bilibili_video(video_item: Dict):
@@ -88,11 +92,14 @@ async def update_up_info(video_item: Dict):
 async def batch_update_bilibili_video_comments(video_id: str, comments: List[Dict]):
     if not comments:
         return
-    for comment_item in comments:
-        await update_bilibili_video_comment(video_id, comment_item)
+    save_comment_items = [_build_bilibili_video_comment(video_id, comment_item) for comment_item in comments]
+    await BiliStoreFactory.create_store().store_comments([item for item in save_comment_items if item])
 
 
-async def update_bilibili_video_comment(video_id: str, comment_item: Dict):
+def _build_bilibili_video_comment(video_id: str, comment_item: Dict) -> Dict:
+    """
+    将评论转换成入库的字段
+    """
     comment_id = str(comment_item.get("rpid"))
     parent_comment_id = str(comment_item.get("parent", 0))
     content: Dict = comment_item.get("content")
@@ -111,7 +118,13 @@ async def update_bilibili_video_comment(video_id: str, comment_item: Dict):
     }
     utils.logger.info(
         f"[store.bilibili.update_bilibili_video_comment] Bilibili video comment: {comment_id}, content: {save_comment_item.get('content')}")
-    await BiliStoreFactory.create_store().store_comment(comment_item=save_comment_item)
+    return save_comment_item
+
+
+async def update_bilibili_video_comment(video_id: str, comment_item: Dict):
+    save_comment_item = _build_bilibili_video_comment(video_id, comment_item)
+    if save_comment_item:
+        await BiliStoreFactory.create_store().store_comment(save_comment_item)
 
 
 async def store_video(aid, video_content, extension_file_name):
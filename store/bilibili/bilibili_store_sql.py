@@ -30,8 +30,8 @@ async def query_content_by_content_id(content_id: str) -> Dict:
 
     """
     async_db_conn: AsyncMysqlDB = media_crawler_db_var.get()
-    sql: str = f"select * from bilibili_video where video_id = '{content_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    sql: str = "select * from bilibili_video where video_id = %s"
+    rows: List[Dict] = await async_db_conn.query(sql, content_id)
     if len(rows) > 0:
         return rows[0]
     return dict()
@@ -77,8 +77,8 @@ async def query_comment_by_comment_id(comment_id: str) -> Dict:
 
     """
     async_db_conn: AsyncMysqlDB = media_crawler_db_var.get()
-    sql: str = f"select * from bilibili_video_comment where comment_id = '{comment_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    sql: str = "select * from bilibili_video_comment where comment_id = %s"
+    rows: List[Dict] = await async_db_conn.query(sql, comment_id)
     if len(rows) > 0:
         return rows[0]
     return dict()
@@ -123,8 +123,8 @@ async def query_creator_by_creator_id(creator_id: str) -> Dict:
 
     """
     async_db_conn: AsyncMysqlDB = media_crawler_db_var.get()
-    sql: str = f"select * from bilibili_up_info where user_id = '{creator_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    sql: str = "select * from bilibili_up_info where user_id = %s"
+    rows: List[Dict] = await async_db_conn.query(sql, creator_id)
     if len(rows) > 0:
         return rows[0]
     return dict()
@@ -158,3 +158,44 @@ async def update_creator_by_creator_id(creator_id: str, creator_item: Dict) -> i
     effect_row: int = await async_db_conn.update_table("bilibili_up_info", creator_item, "user_id", creator_id)
     return effect_row
 
+
+async def batch_add_or_update_contents(content_items: List[Dict]) -> int:
+    """
+    批量新增或更新内容记录，video_id 已存在时更新
+    Args:
+        content_items:
+
+    Returns:
+
+    """
+    async_db_conn: AsyncMysqlDB = media_crawler_db_var.get()
+    effect_row: int = await async_db_conn.batch_upsert("bilibili_video", content_items)
+    return effect_row
+
+
+async def batch_add_or_update_comments(comment_items: List[Dict]) -> int:
+    """
+    批量新增或更新评论记录，comment_id 已存在时更新
+    Args:
+        comment_items:
+
+    Returns:
+
+    """
+    async_db_conn: AsyncMysqlDB = media_crawler_db_var.get()
+    effect_row: int = await async_db_conn.batch_upsert("bilibili_video_comment", comment_items)
+    return effect_row
+
+
+async def batch_add_or_update_creators(creator_items: List[Dict]) -> int:
+    """
+    批量新增或更新创作者记录，user_id 已存在时更新
+    Args:
+        creator_items:
+
+    Returns:
+
+    """
+    async_db_conn: AsyncMysqlDB = media_crawler_db_var.get()
+    effect_row: int = await async_db_conn.batch_upsert("bilibili_up_info", creator_items)
+    return effect_row
@@ -0,0 +1,184 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 各平台共用的 JSONL、Parquet 存储实现，平台存储类继承后设置 platform 即可
+
+import pathlib
+from typing import Dict, Tuple
+
+from base.base_crawler import AbstractStore
+from store.file_writer import get_jsonl_writer, get_parquet_writer
+from tools import utils
+from var import crawler_type_var
+
+
+class JsonlStoreImplement(AbstractStore):
+    # 平台目录名，数据保存在 data/<platform>/ 下
+    platform: str = ""
+    # 创作者数据的存储类型，与该平台其他存储方式的文件名保持一致
+    creator_store_type: str = "creator"
+
+    @property
+    def jsonl_store_path(self) -> str:
+        return f"data/{self.platform}/jsonl"
+
+    @property
+    def json_store_path(self) -> str:
+        return f"data/{self.platform}/json"
+
+    @property
+    def words_store_path(self) -> str:
+        return f"data/{self.platform}/words"
+
+    async def open(self):
+        """
+        启动时创建数据目录，没有写入权限时在启动时报错
+        """
+        pathlib.Path(self.jsonl_store_path).mkdir(parents=True, exist_ok=True)
+
+    def make_save_file_name(self, store_type: str) -> Tuple[str, str, str]:
+        """
+        make save file name by store type
+        Args:
+            store_type: Save type contains content and comments（contents | comments）
+
+        Returns:
+            (jsonl file name, finalized json file name, word cloud file prefix)
+        """
+        file_name = f"{crawler_type_var.get()}_{store_type}_{utils.get_current_date()}"
+        return (
+            f"{self.jsonl_store_path}/{file_name}.jsonl",
+            f"{self.json_store_path}/{file_name}.json",
+            f"{self.words_store_path}/{file_name}" if store_type == "comments" else ""
+        )
+
+    async def save_data_to_jsonl(self, save_item: Dict, store_type: str):
+        """
+        Append one line per record through the shared buffered writer
+        Args:
+            save_item: save content dict info
+            store_type: Save type contains content and comments（contents | comments）
+
+        Returns:
+
+        """
+        save_file_name, json_file_name, words_file_name_prefix = self.make_save_file_name(store_type=store_type)
+        writer = get_jsonl_writer(save_file_name, json_file_path=json_file_name,
+                                  words_file_prefix=words_file_name_prefix)
+        await writer.write(save_item)
+
+    async def store_content(self, content_item: Dict):
+        """
+        content JSONL storage implementation
+        Args:
+            content_item:
+
+        Returns:
+
+        """
+        await self.save_data_to_jsonl(content_item, "contents")
+
+    async def store_comment(self, comment_item: Dict):
+        """
+        comment JSONL storage implementation
+        Args:
+            comment_item:
+
+        Returns:
+
+        """
+        await self.save_data_to_jsonl(comment_item, "comments")
+
+    async def store_creator(self, creator: Dict):
+        """
+        creator JSONL storage implementation
+        Args:
+            creator: creator dict
+
+        Returns:
+
+        """
+        await self.save_data_to_jsonl(creator, self.creator_store_type)
+
+
+class ParquetStoreImplement(AbstractStore):
+    # 平台目录名，数据保存在 data/parquet/platform=<platform>/ 下
+    platform: str = ""
+    # 创作者数据的存储类型，与该平台其他存储方式的文件名保持一致
+    creator_store_type: str = "creator"
+
+    @property
+    def parquet_store_path(self) -> str:
+        return f"data/parquet/platform={self.platform}"
+
+    async def open(self):
+        """
+        启动时创建数据目录，没有写入权限时在启动时报错
+        """
+        pathlib.Path(self.parquet_store_path).mkdir(parents=True, exist_ok=True)
+
+    def make_save_dir_name(self, store_type: str) -> str:
+        """
+        make partition dir name by store type
+        Args:
+            store_type: Save type contains content and comments（contents | comments）
+
+        Returns:
+            partition dir, partitioned as platform/crawler_type/store_type/date
+        """
+        return (f"{self.parquet_store_path}/crawler_type={crawler_type_var.get()}"
+                f"/store_type={store_type}/date={utils.get_current_date()}")
+
+    async def save_data_to_parquet(self, save_item: Dict, store_type: str):
+        """
+        Buffer the record in the shared parquet writer of its partition
+        Args:
+            save_item: save content dict info
+            store_type: Save type contains content and comments（contents | comments）
+
+        Returns:
+
+        """
+        await get_parquet_writer(self.make_save_dir_name(store_type=store_type)).write(save_item)
+
+    async def store_content(self, content_item: Dict):
+        """
+        content Parquet storage implementation
+        Args:
+            content_item:
+
+        Returns:
+
+        """
+        await self.save_data_to_parquet(content_item, "contents")
+
+    async def store_comment(self, comment_item: Dict):
+        """
+        comment Parquet storage implementation
+        Args:
+            comment_item:
+
+        Returns:
+
+        """
+        await self.save_data_to_parquet(comment_item, "comments")
+
+    async def store_creator(self, creator: Dict):
+        """
+        creator Parquet storage implementation
+        Args:
+            creator: creator dict
+
+        Returns:
+
+        """
+        await self.save_data_to_parquet(creator, self.creator_store_type)
@@ -0,0 +1,416 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 文件类存储共用的缓冲写入器，每个输出文件保持一个打开的句柄，按条数/时间批量落盘，进程退出时统一关闭
+
+import asyncio
+import csv
+import importlib.util
+import io
+import json
+import os
+import pathlib
+import time
+from typing import Any, Dict, List, Optional, TextIO, Tuple, Union
+
+import config
+from tools import utils
+
+
+class AsyncBufferedFileWriter:
+    """
+    追加写入的缓冲文件写入器，数据先写入内存缓冲区，达到 FILE_WRITER_FLUSH_SIZE 条或距上次落盘超过
+    FILE_WRITER_FLUSH_INTERVAL_SEC 秒时在线程池中一次性写入，文件句柄在整个运行期间保持打开
+    """
+
+    # 是否参与后台定时刷新
+    periodic_flush = True
+
+    def __init__(self, file_path: str, encoding: str = "utf-8", flush_size: int = 0, flush_interval: float = 0):
+        self.file_path = file_path
+        self.encoding = encoding
+        self.flush_size = flush_size or config.FILE_WRITER_FLUSH_SIZE
+        self.flush_interval = flush_interval or config.FILE_WRITER_FLUSH_INTERVAL_SEC
+        self._buffer: List[str] = []
+        self._file: Optional[TextIO] = None
+        self._lock = asyncio.Lock()
+        self._last_flush_time = time.monotonic()
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def _write_chunk(self, chunk: str):
+        if self._file is None:
+            pathlib.Path(self.file_path).parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.file_path, "a", encoding=self.encoding, newline="")
+        self._file.write(chunk)
+        self._file.flush()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def write_line(self, line: str):
+        """
+        写入一行数据，行尾需自带换行符
+        :param line:
+        :return:
+        """
+        self._buffer.append(line)
+        if len(self._buffer) >= self.flush_size or time.monotonic() - self._last_flush_time >= self.flush_interval:
+            await self.flush()
+
+    async def flush(self):
+        """
+        将缓冲区的数据写入文件
+        :return:
+        """
+        async with self._lock:
+            self._last_flush_time = time.monotonic()
+            if not self._buffer:
+                return
+            chunk, self._buffer = "".join(self._buffer), []
+            await asyncio.to_thread(self._write_chunk, chunk)
+
+    async def close(self):
+        await self.flush()
+        async with self._lock:
+            await asyncio.to_thread(self._close_file)
+
+
+class AsyncJsonlWriter(AsyncBufferedFileWriter):
+    """
+    JSON Lines 写入器，每条数据占一行，追加写入的开销与已有数据量无关
+    """
+
+    def __init__(self, file_path: str, json_file_path: str = "", words_file_prefix: str = ""):
+        """
+        Args:
+            file_path: jsonl 文件路径
+            json_file_path: 关闭时转换成的 JSON 数组文件路径，需开启 JSONL_FINALIZE_TO_JSON
+            words_file_prefix: 关闭时生成评论词云的文件前缀，需开启 ENABLE_GET_COMMENTS 和 ENABLE_GET_WORDCLOUD
+        """
+        super().__init__(file_path)
+        self.json_file_path = json_file_path
+        self.words_file_prefix = words_file_prefix
+
+    async def write(self, item: Dict):
+        await self.write_line(json.dumps(item, ensure_ascii=False) + "\n")
+
+    def read_all(self) -> List[Dict]:
+        if not os.path.exists(self.file_path):
+            return []
+        with open(self.file_path, "r", encoding=self.encoding) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _finalize_to_json(self):
+        pathlib.Path(self.json_file_path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.json_file_path + ".tmp"
+        with open(self.file_path, "r", encoding=self.encoding) as src, \
+                open(tmp_path, "w", encoding="utf-8") as dst:
+            dst.write("[")
+            first = True
+            for line in src:
+                if not line.strip():
+                    continue
+                dst.write("\n" if first else ",\n")
+                dst.write(json.dumps(json.loads(line), ensure_ascii=False, indent=4))
+                first = False
+            dst.write("\n]" if not first else "]")
+        os.replace(tmp_path, self.json_file_path)
+
+    async def close(self):
+        await super().close()
+        if config.JSONL_FINALIZE_TO_JSON and self.json_file_path and os.path.exists(self.file_path):
+            await asyncio.to_thread(self._finalize_to_json)
+        if self.words_file_prefix and config.ENABLE_GET_COMMENTS and config.ENABLE_GET_WORDCLOUD:
+            from tools import words
+            pathlib.Path(self.words_file_prefix).parent.mkdir(parents=True, exist_ok=True)
+            await words.AsyncWordCloudGenerator().generate_word_frequency_and_cloud(
+                await asyncio.to_thread(self.read_all), self.words_file_prefix)
+
+
+class AsyncCsvWriter(AsyncBufferedFileWriter):
+    """
+    CSV 写入器，首次写入时检查一次文件是否已有内容来决定是否写表头，之后不再检查
+    """
+
+    def __init__(self, file_path: str):
+        super().__init__(file_path, encoding="utf-8-sig")
+        self._header_written: Optional[bool] = None
+
+    def _has_content(self) -> bool:
+        return os.path.exists(self.file_path) and os.path.getsize(self.file_path) > 0
+
+    async def write_row(self, item: Dict):
+        if self._header_written is None:
+            self._header_written = await asyncio.to_thread(self._has_content)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not self._header_written:
+            writer.writerow(item.keys())
+            self._header_written = True
+        writer.writerow(item.values())
+        await self.write_line(buffer.getvalue())
+
+
+# 同一次运行生成的 parquet 文件名，Parquet 不能追加写入，每次运行在分区目录下生成新的 part 文件
+_PARQUET_PART_NAME = f"part-{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}.parquet"
+
+# 字段类型从窄到宽，一列的新数据放不进当前类型时换成能无损容纳所有数据的最窄类型
+_PARQUET_TYPE_ORDER = ("bool", "int64", "double", "string")
+
+
+def _parquet_type(type_name: str):
+    import pyarrow as pa
+    return {"bool": pa.bool_(), "int64": pa.int64(), "double": pa.float64(), "string": pa.string()}[type_name]
+
+
+def _fits_parquet_type(value: Any, type_name: str) -> bool:
+    """
+    值能否无损地转换成该类型，None 和空字符串作为空值
+    """
+    if value is None or value == "" or type_name == "string":
+        return True
+    if isinstance(value, bool):
+        return type_name in ("bool", "int64")
+    if type_name == "bool":
+        return False
+    if isinstance(value, int):
+        return type_name == "double" or -2 ** 63 <= value < 2 ** 63
+    if isinstance(value, float):
+        return type_name == "double"
+    if isinstance(value, str):
+        try:
+            if type_name == "int64":
+                return str(int(value)) == value.strip() and -2 ** 63 <= int(value) < 2 ** 63
+            float(value)
+            return True
+        except ValueError:
+            return False
+    return False
+
+
+def _infer_parquet_type(values: List[Any], current: str = "") -> str:
+    """
+    根据一列的数据推断 parquet 字段类型：新字段全部为布尔/整数/浮点时使用对应类型，其余使用字符串；
+    已有字段的类型只会放宽（例如整数列出现小数时改为浮点），不会截断数据
+    :param values: 一列的数据
+    :param current: 该列当前的类型，新字段为空
+    :return: 类型名，见 _PARQUET_TYPE_ORDER
+    """
+    values = [value for value in values if value is not None and value != ""]
+    # 新字段不把数字字符串推断为数字
+    if not current and (not values or any(isinstance(value, str) for value in values)):
+        return "string"
+    for type_name in _PARQUET_TYPE_ORDER[_PARQUET_TYPE_ORDER.index(current) if current else 0:]:
+        if all(_fits_parquet_type(value, type_name) for value in values):
+            return type_name
+    return "string"
+
+
+def _to_parquet_value(value: Any, type_name: str) -> Any:
+    if value is None:
+        return None
+    if type_name == "string":
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        return str(value)
+    if value == "":
+        return None
+    if type_name == "bool":
+        return bool(value)
+    if type_name == "int64":
+        return int(value)
+    return float(value)
+
+
+class AsyncParquetWriter:
+    """
+    Parquet 写入器，数据在内存中攒够 PARQUET_ROW_GROUP_SIZE 条后在线程池中写成一个压缩的 row group，按列存储，
+    下游可以只读取需要的列；字段和类型由已写入的数据推断，后续数据出现新字段或需要放宽类型时
+    关闭当前文件并按合并后的 schema 写入新的 part 文件，读取整个分区时需要合并各文件的 schema
+    （例如 pyarrow.concat_tables(tables, promote_options="permissive")）
+    """
+
+    # 定时刷新会产生很小的 row group，只在攒够一批或关闭时写入
+    periodic_flush = False
+
+    def __init__(self, partition_dir: str, row_group_size: int = 0):
+        """
+        Args:
+            partition_dir: 分区目录，文件写入该目录下的 part 文件
+            row_group_size: 每个 row group 的数据条数
+        """
+        if importlib.util.find_spec("pyarrow") is None:
+            raise ImportError("SAVE_DATA_OPTION=parquet requires pyarrow, "
+                              "install it with: pip install pyarrow (or pip install .[parquet])")
+        self.partition_dir = partition_dir
+        self.file_path = f"{partition_dir}/{_PARQUET_PART_NAME}"
+        self.row_group_size = row_group_size or config.PARQUET_ROW_GROUP_SIZE
+        self._buffer: List[Dict] = []
+        # [(字段名, 类型名)]
+        self._fields: List[Tuple[str, str]] = []
+        self._parts = 0
+        self._writer = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    async def write(self, item: Dict):
+        self._buffer.append(item)
+        if len(self._buffer) >= self.row_group_size:
+            await self.flush()
+
+    def _merge_fields(self, items: List[Dict]) -> List[Tuple[str, str]]:
+        """
+        当前字段与本批数据的字段合并，新字段追加在后面，已有字段按本批数据放宽类型
+        """
+        current = dict(self._fields)
+        names = list(dict.fromkeys([name for name, _ in self._fields] + [key for item in items for key in item]))
+        return [(name, _infer_parquet_type([item.get(name) for item in items], current.get(name, "")))
+                for name in names]
+
+    def _write_row_group(self, items: List[Dict]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        fields = self._merge_fields(items)
+        if self._writer is not None and fields != self._fields:
+            self._close_file()
+            self._parts += 1
+            self.file_path = f"{self.partition_dir}/{_PARQUET_PART_NAME[:-len('.parquet')]}-{self._parts}.parquet"
+            utils.logger.info(f"[AsyncParquetWriter._write_row_group] schema changed, write to {self.file_path}")
+        self._fields = fields
+        schema = pa.schema([(name, _parquet_type(type_name)) for name, type_name in fields])
+        table = pa.Table.from_pydict({
+            name: [_to_parquet_value(item.get(name), type_name) for item in items] for name, type_name in fields
+        }, schema=schema)
+        if self._writer is None:
+            pathlib.Path(self.partition_dir).mkdir(parents=True, exist_ok=True)
+            self._writer = pq.ParquetWriter(self.file_path, schema, compression=config.PARQUET_COMPRESSION)
+        self._writer.write_table(table, row_group_size=len(items))
+
+    def _close_file(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def flush(self):
+        """
+        将缓冲区的数据写成一个 row group
+        :return:
+        """
+        async with self._lock:
+            if not self._buffer:
+                return
+            items, self._buffer = self._buffer, []
+            await asyncio.to_thread(self._write_row_group, items)
+
+    async def close(self):
+        await self.flush()
+        async with self._lock:
+            await asyncio.to_thread(self._close_file)
+
+
+_file_writers: Dict[str, Union[AsyncBufferedFileWriter, AsyncParquetWriter]] = {}
+_flush_task: Optional[asyncio.Task] = None
+
+
+async def _periodic_flush():
+    """
+    定时刷新所有写入器，避免爬取间隙数据长时间停留在缓冲区
+    :return:
+    """
+    while True:
+        await asyncio.sleep(config.FILE_WRITER_FLUSH_INTERVAL_SEC)
+        for writer in list(_file_writers.values()):
+            if writer.periodic_flush and writer.pending:
+                try:
+                    await writer.flush()
+                except Exception as ex:
+                    utils.logger.error(f"[_periodic_flush] flush {writer.file_path} failed, err: {ex}")
+
+
+def _register_writer(writer: Union[AsyncBufferedFileWriter, AsyncParquetWriter]):
+    global _flush_task
+    _file_writers[writer.file_path] = writer
+    loop = asyncio.get_running_loop()
+    if _flush_task is None or _flush_task.done() or _flush_task.get_loop() is not loop:
+        _flush_task = loop.create_task(_periodic_flush())
+
+
+def get_jsonl_writer(file_path: str, json_file_path: str = "", words_file_prefix: str = "") -> AsyncJsonlWriter:
+    """
+    获取文件对应的 JSONL 写入器，同一个文件在整个运行期间共用一个写入器
+    :param file_path: jsonl 文件路径
+    :param json_file_path: 关闭时转换成的 JSON 数组文件路径
+    :param words_file_prefix: 关闭时生成评论词云的文件前缀
+    :return:
+    """
+    writer = _file_writers.get(file_path)
+    if writer is None:
+        writer = AsyncJsonlWriter(file_path, json_file_path=json_file_path, words_file_prefix=words_file_prefix)
+        _register_writer(writer)
+    return writer
+
+
+def get_csv_writer(file_path: str) -> AsyncCsvWriter:
+    """
+    获取文件对应的 CSV 写入器，同一个文件在整个运行期间共用一个写入器
+    :param file_path: csv 文件路径
+    :return:
+    """
+    writer = _file_writers.get(file_path)
+    if writer is None:
+        writer = AsyncCsvWriter(file_path)
+        _register_writer(writer)
+    return writer
+
+
+def get_parquet_writer(partition_dir: str) -> AsyncParquetWriter:
+    """
+    获取分区目录对应的 Parquet 写入器，同一个分区在整个运行期间共用一个写入器
+    :param partition_dir: 分区目录
+    :return:
+    """
+    file_path = f"{partition_dir}/{_PARQUET_PART_NAME}"
+    writer = _file_writers.get(file_path)
+    if writer is None:
+        writer = AsyncParquetWriter(partition_dir)
+        _register_writer(writer)
+    return writer
+
+
+async def close_all_file_writers():
+    """
+    刷新并关闭所有写入器，程序退出前调用
+    :return:
+    """
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        if _flush_task.get_loop() is asyncio.get_running_loop():
+            try:
+                await _flush_task
+            except asyncio.CancelledError:
+                pass
+        _flush_task = None
+    while _file_writers:
+        _, writer = _file_writers.popitem()
+        try:
+            await writer.close()
+        except Exception as ex:
+            utils.logger.error(f"[close_all_file_writers] close {writer.file_path} failed, err: {ex}")
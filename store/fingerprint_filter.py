@@ -0,0 +1,77 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 存储层的内容指纹过滤，与上次写入完全相同的记录不再写入实际的存储
+
+from typing import Dict, List, Optional, Tuple
+
+from base.base_crawler import AbstractStore
+from tools.record_fingerprint import RecordFingerprintIndex, record_fingerprint, record_key
+
+
+class FingerprintFilterStore(AbstractStore):
+    """
+    包装实际的存储，写入前计算记录指纹，与该业务ID上次写入的指纹相同（内容没有变化）的记录直接跳过，
+    写入成功后才记录指纹，写入失败的记录下次仍会重新写入
+    """
+
+    def __init__(self, store: AbstractStore, fingerprint_index: RecordFingerprintIndex):
+        self.store = store
+        self.fingerprint_index = fingerprint_index
+
+    def _filter(self, table: str, items: List[Dict]) -> Tuple[List[Dict], List[Tuple[Optional[int], int]]]:
+        changed_items, fingerprints, batch_fingerprints = [], [], set()
+        for item in items:
+            key, fingerprint = record_key(table, item), record_fingerprint(item)
+            if (key, fingerprint) in batch_fingerprints or self.fingerprint_index.is_unchanged(table, key, fingerprint):
+                continue
+            batch_fingerprints.add((key, fingerprint))
+            changed_items.append(item)
+            fingerprints.append((key, fingerprint))
+        return changed_items, fingerprints
+
+    def _commit(self, table: str, fingerprints: List[Tuple[Optional[int], int]]):
+        for key, fingerprint in fingerprints:
+            self.fingerprint_index.add(table, key, fingerprint)
+
+    async def store_content(self, content_item: Dict):
+        await self.store_contents([content_item])
+
+    async def store_contents(self, content_items: List[Dict]):
+        content_items, fingerprints = self._filter("contents", content_items)
+        if content_items:
+            await self.store.store_contents(content_items)
+            self._commit("contents", fingerprints)
+
+    async def store_comment(self, comment_item: Dict):
+        await self.store_comments([comment_item])
+
+    async def store_comments(self, comment_items: List[Dict]):
+        comment_items, fingerprints = self._filter("comments", comment_items)
+        if comment_items:
+            await self.store.store_comments(comment_items)
+            self._commit("comments", fingerprints)
+
+    async def store_creator(self, creator: Dict):
+        creators, fingerprints = self._filter("creators", [creator])
+        if creators:
+            await self.store.store_creator(creators[0])
+            self._commit("creators", fingerprints)
+
+    async def open(self):
+        await self.store.open()
+
+    async def flush(self):
+        await self.store.flush()
+
+    async def close(self):
+        await self.store.close()
@@ -0,0 +1,54 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 存储层的全文索引，数据写入实际的存储后增量更新本地全文索引
+
+from typing import Dict, List
+
+from base.base_crawler import AbstractStore
+from tools.search_index import comment_document, content_document, index_documents
+
+
+class SearchIndexStore(AbstractStore):
+    """
+    包装实际的存储，内容的标题、描述和评论内容在写入存储后加入全文索引，创作者不建立索引
+    """
+
+    def __init__(self, store: AbstractStore, platform: str):
+        self.store = store
+        self.platform = platform
+
+    async def store_content(self, content_item: Dict):
+        await self.store_contents([content_item])
+
+    async def store_contents(self, content_items: List[Dict]):
+        await self.store.store_contents(content_items)
+        await index_documents([doc for doc in (content_document(self.platform, item) for item in content_items) if doc])
+
+    async def store_comment(self, comment_item: Dict):
+        await self.store_comments([comment_item])
+
+    async def store_comments(self, comment_items: List[Dict]):
+        await self.store.store_comments(comment_items)
+        await index_documents([doc for doc in (comment_document(self.platform, item) for item in comment_items) if doc])
+
+    async def store_creator(self, creator: Dict):
+        await self.store.store_creator(creator)
+
+    async def open(self):
+        await self.store.open()
+
+    async def flush(self):
+        await self.store.flush()
+
+    async def close(self):
+        await self.store.close()
@@ -10,9 +10,10 @@
 
 
 # -*- coding: utf-8 -*-
-from typing import List
+from typing import Dict, List
 
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
+from store.write_behind import get_store_instance
 from var import source_keyword_var
 
 from . import tieba_store_impl
@@ -23,7 +24,10 @@ class TieBaStoreFactory:
     STORES = {
         "csv": TieBaCsvStoreImplement,
         "db": TieBaDbStoreImplement,
-        "json": TieBaJsonStoreImplement
+        "sqlite": TieBaDbStoreImplement,
+        "json": TieBaJsonStoreImplement,
+        "jsonl": TieBaJsonlStoreImplement,
+        "parquet": TieBaParquetStoreImplement
     }
 
     @staticmethod
@@ -31,8 +35,8 @@ class TieBaStoreFactory:
         store_class = TieBaStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError(
-                "[TieBaStoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+                "[TieBaStoreFactory.create_store] Invalid save option only supported csv or db or sqlite or json or jsonl or parquet ...")
+        return get_store_instance(store_class)
 
 
 async def batch_update_tieba_notes(note_list: List[TiebaNote]):
@@ -46,8 +50,20 @@ async def batch_update_tieba_notes(note_list: List[TiebaNote]):
     """
     if not note_list:
         return
-    for note_item in note_list:
-        await update_tieba_note(note_item)
+    save_content_items = [_build_tieba_note(note_item) for note_item in note_list]
+    await TieBaStoreFactory.create_store().store_contents([item for item in save_content_items if item])
+
+
+def _build_tieba_note(note_item: TiebaNote) -> Dict:
+    """
+    将内容转换成入库的字段
+    """
+    note_item.source_keyword = source_keyword_var.get()
+    save_note_item = note_item.model_dump()
+    save_note_item.update({"last_modify_ts": utils.get_current_timestamp()})
+    utils.logger.info(f"[store.tieba.update_tieba_note] tieba note: {save_note_item}")
+
+    return save_note_item
 
 
 async def update_tieba_note(note_item: TiebaNote):
@@ -59,12 +75,9 @@ async def update_tieba_note(note_item: TiebaNote):
     Returns:
 
     """
-    note_item.source_keyword = source_keyword_var.get()
-    save_note_item = note_item.model_dump()
-    save_note_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.tieba.update_tieba_note] tieba note: {save_note_item}")
-
-    await TieBaStoreFactory.create_store().store_content(save_note_item)
+    save_note_item = _build_tieba_note(note_item)
+    if save_note_item:
+        await TieBaStoreFactory.create_store().store_content(save_note_item)
 
 
 async def batch_update_tieba_note_comments(note_id: str, comments: List[TiebaComment]):
@@ -79,8 +92,18 @@ async def batch_update_tieba_note_comments(note_id: str, comments: List[TiebaCom
     """
     if not comments:
         return
-    for comment_item in comments:
-        await update_tieba_note_comment(note_id, comment_item)
+    save_comment_items = [_build_tieba_note_comment(note_id, comment_item) for comment_item in comments]
+    await TieBaStoreFactory.create_store().store_comments([item for item in save_comment_items if item])
+
+
+def _build_tieba_note_comment(note_id: str, comment_item: TiebaComment) -> Dict:
+    """
+    将评论转换成入库的字段
+    """
+    save_comment_item = comment_item.model_dump()
+    save_comment_item.update({"last_modify_ts": utils.get_current_timestamp()})
+    utils.logger.info(f"[store.tieba.update_tieba_note_comment] tieba note id: {note_id} comment:{save_comment_item}")
+    return save_comment_item
 
 
 async def update_tieba_note_comment(note_id: str, comment_item: TiebaComment):
@@ -93,10 +116,9 @@ async def update_tieba_note_comment(note_id: str, comment_item: TiebaComment):
     Returns:
 
     """
-    save_comment_item = comment_item.model_dump()
-    save_comment_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.tieba.update_tieba_note_comment] tieba note id: {note_id} comment:{save_comment_item}")
-    await TieBaStoreFactory.create_store().store_comment(save_comment_item)
+    save_comment_item = _build_tieba_note_comment(note_id, comment_item)
+    if save_comment_item:
+        await TieBaStoreFactory.create_store().store_comment(save_comment_item)
 
 
 async def save_creator(user_info: TiebaCreator):
@@ -11,16 +11,17 @@
 
 # -*- coding: utf-8 -*-
 import asyncio
-import csv
 import json
 import os
 import pathlib
-from typing import Dict
+from typing import Dict, List
 
 import aiofiles
 
 import config
 from base.base_crawler import AbstractStore
+from store.file_store import JsonlStoreImplement, ParquetStoreImplement
+from store.file_writer import get_csv_writer
 from tools import utils, words
 from var import crawler_type_var
 
@@ -57,7 +58,7 @@ class TieBaCsvStoreImplement(AbstractStore):
 
     async def save_data_to_csv(self, save_item: Dict, store_type: str):
         """
-        Below is a simple way to save it in CSV format.
+        Append one row through the shared buffered csv writer of the file.
         Args:
             save_item:  save content dict info
             store_type: Save type contains content and comments（contents | comments）
@@ -65,14 +66,8 @@ class TieBaCsvStoreImplement(AbstractStore):
         Returns: no returns
 
         """
-        pathlib.Path(self.csv_store_path).mkdir(parents=True, exist_ok=True)
         save_file_name = self.make_save_file_name(store_type=store_type)
-        async with aiofiles.open(save_file_name, mode='a+', encoding="utf-8-sig", newline="") as f:
-            f.fileno()
-            writer = csv.writer(f)
-            if await f.tell() == 0:
-                await writer.writerow(save_item.keys())
-            await writer.writerow(save_item.values())
+        await get_csv_writer(save_file_name).write_row(save_item)
 
     async def store_content(self, content_item: Dict):
         """
@@ -113,61 +108,66 @@ class TieBaDbStoreImplement(AbstractStore):
         """
         tieba content DB storage implementation
         Args:
-            content_item: content item dict
+            content_item:
+
+        Returns:
+
+        """
+        await self.store_contents([content_item])
+
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        tieba content DB batch storage implementation, add_ts is kept for existing rows
+        Args:
+            content_items:
 
         Returns:
 
         """
-        from .tieba_store_sql import (add_new_content,
-                                      query_content_by_content_id,
-                                      update_content_by_content_id)
-        note_id = content_item.get("note_id")
-        note_detail: Dict = await query_content_by_content_id(content_id=note_id)
-        if not note_detail:
-            content_item["add_ts"] = utils.get_current_timestamp()
-            await add_new_content(content_item)
-        else:
-            await update_content_by_content_id(note_id, content_item=content_item)
+        from .tieba_store_sql import batch_add_or_update_contents
+        add_ts = utils.get_current_timestamp()
+        for content_item in content_items:
+            content_item["add_ts"] = add_ts
+        await batch_add_or_update_contents(content_items)
 
     async def store_comment(self, comment_item: Dict):
         """
-        tieba content DB storage implementation
+        tieba comment DB storage implementation
         Args:
-            comment_item: comment item dict
+            comment_item:
+
+        Returns:
+
+        """
+        await self.store_comments([comment_item])
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        tieba comment DB batch storage implementation, add_ts is kept for existing rows
+        Args:
+            comment_items:
 
         Returns:
 
         """
-        from .tieba_store_sql import (add_new_comment,
-                                      query_comment_by_comment_id,
-                                      update_comment_by_comment_id)
-        comment_id = comment_item.get("comment_id")
-        comment_detail: Dict = await query_comment_by_comment_id(comment_id=comment_id)
-        if not comment_detail:
-            comment_item["add_ts"] = utils.get_current_timestamp()
-            await add_new_comment(comment_item)
-        else:
-            await update_comment_by_comment_id(comment_id, comment_item=comment_item)
+        from .tieba_store_sql import batch_add_or_update_comments
+        add_ts = utils.get_current_timestamp()
+        for comment_item in comment_items:
+            comment_item["add_ts"] = add_ts
+        await batch_add_or_update_comments(comment_items)
 
     async def store_creator(self, creator: Dict):
         """
-        tieba content DB storage implementation
+        tieba creator DB storage implementation
         Args:
-            creator: creator dict
+            creator:
 
         Returns:
 
         """
-        from .tieba_store_sql import (add_new_creator,
-                                      query_creator_by_user_id,
-                                      update_creator_by_user_id)
-        user_id = creator.get("user_id")
-        user_detail: Dict = await query_creator_by_user_id(user_id)
-        if not user_detail:
-            creator["add_ts"] = utils.get_current_timestamp()
-            await add_new_creator(creator)
-        else:
-            await update_creator_by_user_id(user_id, creator)
+        from .tieba_store_sql import batch_add_or_update_creators
+        creator["add_ts"] = utils.get_current_timestamp()
+        await batch_add_or_update_creators([creator])
 
 
 class TieBaJsonStoreImplement(AbstractStore):
@@ -254,3 +254,11 @@ class TieBaJsonStoreImplement(AbstractStore):
 
         """
         await self.save_data_to_json(creator, "creator")
+
+
+class TieBaJsonlStoreImplement(JsonlStoreImplement):
+    platform: str = "tieba"
+
+
+class TieBaParquetStoreImplement(ParquetStoreImplement):
+    platform: str = "tieba"
@@ -15,8 +15,9 @@
 # @Desc    :
 
 import re
-from typing import List
+from typing import Dict, List
 
+from store.write_behind import get_store_instance
 from var import source_keyword_var
 
 from .weibo_store_image import *
@@ -27,7 +28,10 @@ class WeibostoreFactory:
     STORES = {
         "csv": WeiboCsvStoreImplement,
         "db": WeiboDbStoreImplement,
+        "sqlite": WeiboDbStoreImplement,
         "json": WeiboJsonStoreImplement,
+        "jsonl": WeiboJsonlStoreImplement,
+        "parquet": WeiboParquetStoreImplement
     }
 
     @staticmethod
@@ -35,8 +39,8 @@ class WeibostoreFactory:
         store_class = WeibostoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError(
-                "[WeibotoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+                "[WeibotoreFactory.create_store] Invalid save option only supported csv or db or sqlite or json or jsonl or parquet ...")
+        return get_store_instance(store_class)
 
 
 async def batch_update_weibo_notes(note_list: List[Dict]):
@@ -50,21 +54,16 @@ async def batch_update_weibo_notes(note_list: List[Dict]):
     """
     if not note_list:
         return
-    for note_item in note_list:
-        await update_weibo_note(note_item)
+    save_content_items = [_build_weibo_note(note_item) for note_item in note_list]
+    await WeibostoreFactory.create_store().store_contents([item for item in save_content_items if item])
 
 
-async def update_weibo_note(note_item: Dict):
+def _build_weibo_note(note_item: Dict) -> Dict:
     """
-    Update weibo note
-    Args:
-        note_item:
-
-    Returns:
-
+    将内容转换成入库的字段
     """
     if not note_item:
-        return
+        return {}
 
     mblog: Dict = note_item.get("mblog")
     user_info: Dict = mblog.get("user")
@@ -95,7 +94,21 @@ async def update_weibo_note(note_item: Dict):
     }
     utils.logger.info(
         f"[store.weibo.update_weibo_note] weibo note id:{note_id}, title:{save_content_item.get('content')[:24]} ...")
-    await WeibostoreFactory.create_store().store_content(content_item=save_content_item)
+    return save_content_item
+
+
+async def update_weibo_note(note_item: Dict):
+    """
+    Update weibo note
+    Args:
+        note_item:
+
+    Returns:
+
+    """
+    save_content_item = _build_weibo_note(note_item)
+    if save_content_item:
+        await WeibostoreFactory.create_store().store_content(save_content_item)
 
 
 async def batch_update_weibo_note_comments(note_id: str, comments: List[Dict]):
@@ -110,22 +123,16 @@ async def batch_update_weibo_note_comments(note_id: str, comments: List[Dict]):
     """
     if not comments:
         return
-    for comment_item in comments:
-        await update_weibo_note_comment(note_id, comment_item)
+    save_comment_items = [_build_weibo_note_comment(note_id, comment_item) for comment_item in comments]
+    await WeibostoreFactory.create_store().store_comments([item for item in save_comment_items if item])
 
 
-async def update_weibo_note_comment(note_id: str, comment_item: Dict):
+def _build_weibo_note_comment(note_id: str, comment_item: Dict) -> Dict:
     """
-    Update weibo note comment
-    Args:
-        note_id: weibo note id
-        comment_item: weibo comment item
-
-    Returns:
-
+    将评论转换成入库的字段
     """
     if not comment_item or not note_id:
-        return
+        return {}
     comment_id = str(comment_item.get("id"))
     user_info: Dict = comment_item.get("user")
     content_text = comment_item.get("text")
@@ -151,7 +158,22 @@ async def update_weibo_note_comment(note_id: str, comment_item: Dict):
     }
     utils.logger.info(
         f"[store.weibo.update_weibo_note_comment] Weibo note comment: {comment_id}, content: {save_comment_item.get('content', '')[:24]} ...")
-    await WeibostoreFactory.create_store().store_comment(comment_item=save_comment_item)
+    return save_comment_item
+
+
+async def update_weibo_note_comment(note_id: str, comment_item: Dict):
+    """
+    Update weibo note comment
+    Args:
+        note_id: weibo note id
+        comment_item: weibo comment item
+
+    Returns:
+
+    """
+    save_comment_item = _build_weibo_note_comment(note_id, comment_item)
+    if save_comment_item:
+        await WeibostoreFactory.create_store().store_comment(save_comment_item)
 
 
 async def update_weibo_note_image(picid: str, pic_content, extension_file_name):
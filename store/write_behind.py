@@ -0,0 +1,210 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 异步写入缓冲层，爬取协程只负责把数据放入有界队列，后台任务按表批量写入实际的存储
+
+import asyncio
+from typing import Dict, List, Optional, Type
+
+import config
+from base.base_crawler import AbstractStore
+from store.fingerprint_filter import FingerprintFilterStore
+from store.search_index_store import SearchIndexStore
+from tools import utils
+from tools.record_fingerprint import get_fingerprint_index
+
+_FLUSH = "flush"
+
+
+class WriteBehindError(Exception):
+    """关闭存储时仍有数据没有写入"""
+
+
+class WriteBehindStore(AbstractStore):
+    """
+    包装实际的存储，数据先进入有界队列，后台任务按 内容/评论/创作者 分别攒批，
+    达到 WRITE_BEHIND_BATCH_SIZE 条或等待超过 WRITE_BEHIND_FLUSH_INTERVAL_SEC 秒时写入；
+    存储写入跟不上时队列写满，爬取协程在入队时等待（背压）；
+    写入失败的数据保留在缓冲区中，逐步延长间隔后重试，flush、关闭时仍未写入的数据抛出 WriteBehindError；
+    爬虫启动前调用 open 打开实际的存储，存储不可用时在启动时报错，而不是在写入第一条数据时
+    """
+
+    def __init__(self, store: AbstractStore, queue_size: int = 0, batch_size: int = 0, flush_interval: float = 0,
+                 max_retry_delay: float = 30):
+        self.store = store
+        self.max_retry_delay = max_retry_delay
+        self.queue_size = queue_size or config.WRITE_BEHIND_QUEUE_SIZE
+        self.batch_size = batch_size or config.WRITE_BEHIND_BATCH_SIZE
+        self.flush_interval = flush_interval or config.WRITE_BEHIND_FLUSH_INTERVAL_SEC
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._buffers: Dict[str, List[Dict]] = {"content": [], "comment": [], "creator": []}
+        # 已从队列中取出、还没有调用 task_done 的数量
+        self._pending = 0
+        self._last_error: Optional[Exception] = None
+
+    async def open(self):
+        """
+        打开实际的存储并启动后台写入任务，程序启动时调用，没有调用时在第一次写入时打开
+        :return:
+        """
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        await self.store.open()
+        self._worker = asyncio.create_task(self._run())
+
+    async def _put(self, kind: str, item: Dict):
+        if self._worker is None:
+            await self.open()
+        await self._queue.put((kind, item))
+
+    async def store_content(self, content_item: Dict):
+        await self._put("content", content_item)
+
+    async def store_contents(self, content_items: List[Dict]):
+        for content_item in content_items:
+            await self._put("content", content_item)
+
+    async def store_comment(self, comment_item: Dict):
+        await self._put("comment", comment_item)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        for comment_item in comment_items:
+            await self._put("comment", comment_item)
+
+    async def store_creator(self, creator: Dict):
+        await self._put("creator", creator)
+
+    def _buffered(self) -> int:
+        return sum(len(items) for items in self._buffers.values())
+
+    async def _write_buffers(self) -> bool:
+        """
+        写入缓冲区中的数据，写入成功的部分从缓冲区移除，失败的数据保留到下次写入时重试
+        :return: 是否全部写入成功
+        """
+        pending, self._pending = self._pending, 0
+        try:
+            if self._buffers["content"]:
+                await self.store.store_contents(self._buffers["content"])
+                self._buffers["content"] = []
+            if self._buffers["comment"]:
+                await self.store.store_comments(self._buffers["comment"])
+                self._buffers["comment"] = []
+            while self._buffers["creator"]:
+                await self.store.store_creator(self._buffers["creator"][0])
+                self._buffers["creator"].pop(0)
+            await self.store.flush()
+            self._last_error = None
+            return True
+        except Exception as ex:
+            self._last_error = ex
+            utils.logger.error(f"[WriteBehindStore._write_buffers] write failed, {self._buffered()} items kept "
+                               f"for retry, err: {ex}")
+            return False
+        finally:
+            for _ in range(pending):
+                self._queue.task_done()
+
+    async def _run(self):
+        retry_delay = 0
+        while True:
+            try:
+                kind, item = await asyncio.wait_for(self._queue.get(), timeout=self.flush_interval)
+                self._pending += 1
+                if kind != _FLUSH:
+                    self._buffers[kind].append(item)
+                    if self._buffered() < self.batch_size:
+                        continue
+            except asyncio.TimeoutError:
+                if not self._buffered():
+                    continue
+            if await self._write_buffers():
+                retry_delay = 0
+            else:
+                # 存储持续失败时逐步延长重试间隔，期间队列写满后爬取协程等待，失败的数据不会无限堆积
+                retry_delay = min(max(retry_delay * 2, 1), self.max_retry_delay)
+                await asyncio.sleep(retry_delay)
+
+    async def flush(self):
+        """
+        等待队列中已有的数据全部写入存储，写入失败的数据仍在缓冲区中时抛出 WriteBehindError
+        :return:
+        """
+        if self._worker is None:
+            return
+        await self._queue.put((_FLUSH, None))
+        await self._queue.join()
+        if self._buffered():
+            raise WriteBehindError(f"{self._buffered()} items were not written to "
+                                   f"{self.store.__class__.__name__}, last err: {self._last_error}")
+
+    async def close(self):
+        """
+        写入队列中剩余的数据后关闭存储，仍有数据写入失败时关闭存储后抛出 WriteBehindError
+        :return:
+        """
+        if self._worker is None:
+            return
+        try:
+            await self.flush()
+        finally:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+            await self.store.close()
+
+
+_store_instances: Dict[Type[AbstractStore], AbstractStore] = {}
+
+
+def get_store_instance(store_class: Type[AbstractStore]) -> AbstractStore:
+    """
+    获取存储类对应的长期存活的实例，整个运行期间同一个存储类只创建一次，
+    开启 ENABLE_SEARCH_INDEX 时写入存储后同时更新全文索引，
+    开启 ENABLE_RECORD_FINGERPRINT 时跳过内容没有变化的记录，
+    开启 ENABLE_WRITE_BEHIND_STORE 时返回包装后的异步写入缓冲层
+    :param store_class: 存储实现类
+    :return:
+    """
+    if store_class not in _store_instances:
+        store = store_class()
+        if config.ENABLE_SEARCH_INDEX:
+            store = SearchIndexStore(store, config.PLATFORM)
+        fingerprint_index = get_fingerprint_index()
+        if fingerprint_index is not None:
+            store = FingerprintFilterStore(store, fingerprint_index)
+        if config.ENABLE_WRITE_BEHIND_STORE:
+            store = WriteBehindStore(store)
+        _store_instances[store_class] = store
+    return _store_instances[store_class]
+
+
+async def close_all_stores():
+    """
+    将所有存储队列中剩余的数据写入并关闭存储，程序退出前调用；所有存储关闭后，有存储关闭失败（数据没有写入）时抛出异常
+    :return:
+    """
+    errors = []
+    while _store_instances:
+        _, store = _store_instances.popitem()
+        try:
+            await store.close()
+        except Exception as ex:
+            utils.logger.error(f"[close_all_stores] close {store.__class__.__name__} failed, err: {ex}")
+            errors.append(ex)
+    if errors:
+        raise WriteBehindError(f"{len(errors)} stores failed to close, some data was not saved: {errors}")
@@ -13,9 +13,10 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2024/1/14 17:34
 # @Desc    :
-from typing import List
+from typing import Dict, List
 
 import config
+from store.write_behind import get_store_instance
 from var import source_keyword_var
 
 from . import xhs_store_impl
@@ -27,15 +28,18 @@ class XhsStoreFactory:
     STORES = {
         "csv": XhsCsvStoreImplement,
         "db": XhsDbStoreImplement,
-        "json": XhsJsonStoreImplement
+        "sqlite": XhsDbStoreImplement,
+        "json": XhsJsonStoreImplement,
+        "jsonl": XhsJsonlStoreImplement,
+        "parquet": XhsParquetStoreImplement
     }
 
     @staticmethod
     def create_store() -> AbstractStore:
         store_class = XhsStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[XhsStoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+            raise ValueError("[XhsStoreFactory.create_store] Invalid save option only supported csv or db or sqlite or json or jsonl or parquet ...")
+        return get_store_instance(store_class)
 
 
 def get_video_url_arr(note_item: Dict) -> List:
@@ -125,19 +129,13 @@ async def batch_update_xhs_note_comments(note_id: str, comments: List[Dict]):
     """
     if not comments:
         return
-    for comment_item in comments:
-        await update_xhs_note_comment(note_id, comment_item)
+    save_comment_items = [_build_xhs_note_comment(note_id, comment_item) for comment_item in comments]
+    await XhsStoreFactory.create_store().store_comments([item for item in save_comment_items if item])
 
 
-async def update_xhs_note_comment(note_id: str, comment_item: Dict):
+def _build_xhs_note_comment(note_id: str, comment_item: Dict) -> Dict:
     """
-    更新小红书笔记评论
-    Args:
-        note_id:
-        comment_item:
-
-    Returns:
-
+    将评论转换成入库的字段
     """
     user_info = comment_item.get("user_info", {})
     comment_id = comment_item.get("id")
@@ -159,7 +157,22 @@ async def update_xhs_note_comment(note_id: str, comment_item: Dict):
         "like_count": comment_item.get("like_count", 0),
     }
     utils.logger.info(f"[store.xhs.update_xhs_note_comment] xhs note comment:{local_db_item}")
-    await XhsStoreFactory.create_store().store_comment(local_db_item)
+    return local_db_item
+
+
+async def update_xhs_note_comment(note_id: str, comment_item: Dict):
+    """
+    更新小红书笔记评论
+    Args:
+        note_id:
+        comment_item:
+
+    Returns:
+
+    """
+    local_db_item = _build_xhs_note_comment(note_id, comment_item)
+    if local_db_item:
+        await XhsStoreFactory.create_store().store_comment(local_db_item)
 
 
 async def save_creator(user_id: str, creator: Dict):
@@ -10,14 +10,17 @@
 
 
 # -*- coding: utf-8 -*-
-from typing import List
+from typing import Dict, List
 
 import config
 from base.base_crawler import AbstractStore
 from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
+from store.write_behind import get_store_instance
 from store.zhihu.zhihu_store_impl import (ZhihuCsvStoreImplement,
                                           ZhihuDbStoreImplement,
-                                          ZhihuJsonStoreImplement)
+                                          ZhihuJsonlStoreImplement,
+                                          ZhihuJsonStoreImplement,
+                                          ZhihuParquetStoreImplement)
 from tools import utils
 from var import source_keyword_var
 
@@ -26,15 +29,18 @@ class ZhihuStoreFactory:
     STORES = {
         "csv": ZhihuCsvStoreImplement,
         "db": ZhihuDbStoreImplement,
-        "json": ZhihuJsonStoreImplement
+        "sqlite": ZhihuDbStoreImplement,
+        "json": ZhihuJsonStoreImplement,
+        "jsonl": ZhihuJsonlStoreImplement,
+        "parquet": ZhihuParquetStoreImplement
     }
 
     @staticmethod
     def create_store() -> AbstractStore:
         store_class = ZhihuStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[ZhihuStoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+            raise ValueError("[ZhihuStoreFactory.create_store] Invalid save option only supported csv or db or sqlite or json or jsonl or parquet ...")
+        return get_store_instance(store_class)
 
 async def batch_update_zhihu_contents(contents: List[ZhihuContent]):
     """
@@ -48,8 +54,20 @@ async def batch_update_zhihu_contents(contents: List[ZhihuContent]):
     if not contents:
         return
 
-    for content_item in contents:
-        await update_zhihu_content(content_item)
+    save_content_items = [_build_zhihu_content(content_item) for content_item in contents]
+    await ZhihuStoreFactory.create_store().store_contents([item for item in save_content_items if item])
+
+
+def _build_zhihu_content(content_item: ZhihuContent) -> Dict:
+    """
+    将内容转换成入库的字段
+    """
+    content_item.source_keyword = source_keyword_var.get()
+    local_db_item = content_item.model_dump()
+    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
+    utils.logger.info(f"[store.zhihu.update_zhihu_content] zhihu content: {local_db_item}")
+    return local_db_item
+
 
 async def update_zhihu_content(content_item: ZhihuContent):
     """
@@ -60,11 +78,9 @@ async def update_zhihu_content(content_item: ZhihuContent):
     Returns:
 
     """
-    content_item.source_keyword = source_keyword_var.get()
-    local_db_item = content_item.model_dump()
-    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.zhihu.update_zhihu_content] zhihu content: {local_db_item}")
-    await ZhihuStoreFactory.create_store().store_content(local_db_item)
+    local_db_item = _build_zhihu_content(content_item)
+    if local_db_item:
+        await ZhihuStoreFactory.create_store().store_content(local_db_item)
 
 
 
@@ -80,8 +96,18 @@ async def batch_update_zhihu_note_comments(comments: List[ZhihuComment]):
     if not comments:
         return
     
-    for comment_item in comments:
-        await update_zhihu_content_comment(comment_item)
+    save_comment_items = [_build_zhihu_content_comment(comment_item) for comment_item in comments]
+    await ZhihuStoreFactory.create_store().store_comments([item for item in save_comment_items if item])
+
+
+def _build_zhihu_content_comment(comment_item: ZhihuComment) -> Dict:
+    """
+    将评论转换成入库的字段
+    """
+    local_db_item = comment_item.model_dump()
+    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
+    utils.logger.info(f"[store.zhihu.update_zhihu_note_comment] zhihu content comment:{local_db_item}")
+    return local_db_item
 
 
 async def update_zhihu_content_comment(comment_item: ZhihuComment):
@@ -93,10 +119,9 @@ async def update_zhihu_content_comment(comment_item: ZhihuComment):
     Returns:
 
     """
-    local_db_item = comment_item.model_dump()
-    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.zhihu.update_zhihu_note_comment] zhihu content comment:{local_db_item}")
-    await ZhihuStoreFactory.create_store().store_comment(local_db_item)
+    local_db_item = _build_zhihu_content_comment(comment_item)
+    if local_db_item:
+        await ZhihuStoreFactory.create_store().store_comment(local_db_item)
 
 
 async def save_creator(creator: ZhihuCreator):
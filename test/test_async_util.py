@@ -0,0 +1,92 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+
+import asyncio
+import time
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+import config
+from tools.async_util import (AsyncRateLimiter, CrawlProgress, gather_with_concurrency, get_platform_max_rate,
+                              prefetch_iter, sub_comment_concurrency)
+
+
+class TestAsyncUtil(IsolatedAsyncioTestCase):
+
+    async def test_gather_with_concurrency(self):
+        running, max_running = 0, 0
+
+        async def job(i: int) -> int:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01 * (5 - i))
+            running -= 1
+            return i
+
+        results = await gather_with_concurrency(2, *[job(i) for i in range(5)])
+        self.assertEqual(results, [0, 1, 2, 3, 4])
+        self.assertEqual(max_running, 2)
+
+    async def test_rate_limiter(self):
+        limiter = AsyncRateLimiter(max_rate=20, burst=1)
+        start = time.monotonic()
+        for _ in range(5):
+            await limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+
+    async def test_platform_default_rate(self):
+        # 默认按平台限速，二级评论可以并发展开
+        self.assertGreater(get_platform_max_rate("xhs"), 0)
+        self.assertEqual(sub_comment_concurrency("xhs"), config.MAX_SUB_COMMENT_CONCURRENCY_NUM)
+        with patch.object(config, "PLATFORM_MAX_REQUESTS_PER_SEC", 0):
+            self.assertEqual(get_platform_max_rate("xhs"), 0)
+            self.assertEqual(sub_comment_concurrency("xhs"), 1)
+
+    async def test_prefetch_iter(self):
+        fetched = []
+
+        async def pages():
+            for page in range(4):
+                fetched.append(page)
+                yield [page]
+
+        consumed = []
+        async for page in prefetch_iter(pages(), buffer_size=1):
+            await asyncio.sleep(0.01)
+            # 消费当前页时，下一页已经在后台被请求
+            self.assertGreaterEqual(len(fetched), min(page[0] + 2, 4))
+            consumed.extend(page)
+        self.assertEqual(consumed, [0, 1, 2, 3])
+
+    async def test_prefetch_iter_propagates_error(self):
+        async def pages():
+            yield [1]
+            raise ValueError("banned")
+
+        with self.assertRaises(ValueError):
+            async for _ in prefetch_iter(pages()):
+                pass
+
+    async def test_crawl_progress(self):
+        async def creator_task(user_id: str) -> str:
+            if user_id == "banned":
+                raise ValueError("creator banned")
+            return user_id
+
+        progress = CrawlProgress("test", 3)
+        results = await gather_with_concurrency(
+            2, *[progress.track(user_id, creator_task(user_id)) for user_id in ["a", "banned", "b"]])
+        self.assertEqual(results, ["a", None, "b"])
+        self.assertEqual((progress.finished, progress.failed, progress.running), (3, 1, 0))
@@ -0,0 +1,51 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+
+import importlib.util
+import json
+import pickle
+import unittest
+
+from cache.codec import CacheCodec
+
+VALUE = {"ip": "127.0.0.1", "port": 8000, "user": "用户", "tags": ["a", "b"], "score": 0.5, "valid": True}
+
+
+class TestCacheCodec(unittest.TestCase):
+
+    def test_json_roundtrip_readable(self):
+        codec = CacheCodec("json", compress_threshold=0)
+        data = codec.encode(VALUE)
+        self.assertEqual(json.loads(data[1:]), VALUE)
+        self.assertEqual(codec.decode(data), VALUE)
+
+    @unittest.skipUnless(importlib.util.find_spec("msgpack"), "msgpack is not installed")
+    def test_msgpack_smaller_than_pickle(self):
+        data = CacheCodec("msgpack").encode(VALUE)
+        self.assertEqual(CacheCodec.decode(data), VALUE)
+        self.assertLess(len(data), len(pickle.dumps(VALUE)))
+
+    def test_compress_above_threshold(self):
+        codec = CacheCodec("json", compress_threshold=100)
+        small, large = {"a": 1}, {"content": "评论内容" * 500}
+        self.assertEqual(codec.encode(small)[1:], json.dumps(small, separators=(",", ":")).encode())
+        data = codec.encode(large)
+        self.assertLess(len(data), 200)
+        self.assertEqual(codec.decode(data), large)
+
+    def test_decode_other_serializer_and_legacy_pickle(self):
+        codec = CacheCodec("json")
+        self.assertEqual(codec.decode(CacheCodec("pickle").encode({1, 2})), {1, 2})
+        # 之前版本直接 pickle.dumps 保存的数据
+        self.assertEqual(codec.decode(pickle.dumps([1, 2, 3])), [1, 2, 3])
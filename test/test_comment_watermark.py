@@ -0,0 +1,67 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+
+import tempfile
+import unittest
+
+from tools.comment_watermark import CommentWatermarkStore, filter_new_comments
+
+
+class TestCommentWatermark(unittest.TestCase):
+
+    def test_filter_new_comments(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = CommentWatermarkStore("bili", save_dir=tmp_dir)
+            store.update("BV1", newest_comment_id="3", newest_create_time=300, last_cursor="2", new_comment_count=3)
+            store.save()
+            watermark = CommentWatermarkStore("bili", save_dir=tmp_dir).get("BV1")
+
+        self.assertEqual(watermark.comment_count, 3)
+        page = [{"rpid": 5, "ctime": 500}, {"rpid": 4, "ctime": 400}, {"rpid": 3, "ctime": 300},
+                {"rpid": 2, "ctime": 200}]
+        new_comments, reach_watermark = filter_new_comments(
+            page, watermark, lambda c: c["rpid"], lambda c: c["ctime"])
+        self.assertEqual([c["rpid"] for c in new_comments], [5, 4])
+        self.assertTrue(reach_watermark)
+
+        new_comments, reach_watermark = filter_new_comments(page, None, lambda c: c["rpid"], lambda c: c["ctime"])
+        self.assertEqual(len(new_comments), 4)
+        self.assertFalse(reach_watermark)
+
+    def test_stop_early_keeps_watermark(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = CommentWatermarkStore("bili", save_dir=tmp_dir)
+            store.finish("BV1", newest_comment_id="3", newest_create_time=300, cursor="", completed=True)
+            self.assertEqual(store.resume_cursor("BV1"), "")
+
+            # 因为数量限制停在第 2 页，评论 4 之前还有没有爬取的评论，水位线不能前进到 9
+            store.finish("BV1", newest_comment_id="9", newest_create_time=900, cursor="2", completed=False)
+            watermark = store.get("BV1")
+            self.assertEqual((watermark.newest_comment_id, watermark.newest_create_time), ("3", 300))
+            self.assertEqual(store.resume_cursor("BV1"), "2")
+
+            # 从第 2 页继续，仍然没有到达水位线时保留第一次看到的最新评论
+            store.finish("BV1", newest_comment_id="6", newest_create_time=600, cursor="4", completed=False)
+            self.assertEqual(store.get("BV1").pending_comment_id, "9")
+            self.assertEqual(store.resume_cursor("BV1"), "4")
+
+            # 到达水位线后前进到中断前看到的最新评论
+            store.finish("BV1", newest_comment_id="5", newest_create_time=500, cursor="5", completed=True)
+            watermark = store.get("BV1")
+            self.assertEqual((watermark.newest_comment_id, watermark.newest_create_time), ("9", 900))
+            self.assertEqual(store.resume_cursor("BV1"), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,8 +15,11 @@
 # @Time    : 2024/6/2 10:35
 # @Desc    :
 
+import heapq
 import time
 import unittest
+from fnmatch import fnmatchcase
+from unittest.mock import patch
 
 from cache.local_cache import ExpiringLocalCache
 
@@ -42,6 +45,97 @@ class TestExpiringLocalCache(unittest.TestCase):
         time.sleep(12)
         self.assertIsNone(self.cache.get('key'))
 
+    def test_lru_eviction_and_stats(self):
+        cache = ExpiringLocalCache(cron_interval=10, max_entries=3)
+        for key in ['a', 'b', 'c']:
+            cache.set(key, key, 10)
+        self.assertEqual(cache.get('a'), 'a')
+        cache.set('d', 'd', 10)
+        # b 是最久未访问的键，被淘汰
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(sorted(cache.keys('*')), ['a', 'c', 'd'])
+        self.assertEqual(cache.stats(), {"size": 3, "hits": 1, "misses": 1, "evictions": 1, "expirations": 0})
+
+    def test_reset_key_uses_latest_expire_time(self):
+        self.cache.set('key', 'old', 1)
+        self.cache.set('key', 'new', 100)
+        with patch("cache.local_cache.time.monotonic", return_value=time.monotonic() + 2):
+            self.cache._clear()
+            self.assertEqual(self.cache.get('key'), 'new')
+
+    def test_expire_one_million_keys(self):
+        cache = ExpiringLocalCache(cron_interval=10, max_entries=0)
+        now = time.monotonic()
+        for i in range(1_000_000):
+            cache.set(f'key_{i}', i, 10 if i % 2 else 1000)
+        self.assertEqual(len(cache), 1_000_000)
+
+        # 没有过期的键时清理只检查堆顶，不弹出任何元素
+        with patch("cache.local_cache.heapq.heappop", wraps=heapq.heappop) as heappop:
+            cache._clear()
+        self.assertEqual(heappop.call_count, 0)
+        self.assertEqual(len(cache), 1_000_000)
+
+        # 清理只弹出已过期的元素
+        with patch("cache.local_cache.time.monotonic", return_value=now + 100), \
+                patch("cache.local_cache.heapq.heappop", wraps=heapq.heappop) as heappop:
+            cache._clear()
+        self.assertEqual(heappop.call_count, 500_000)
+        self.assertEqual(len(cache), 500_000)
+        self.assertEqual(cache.stats()["expirations"], 500_000)
+        self.assertIsNone(cache.get('key_1'))
+        self.assertEqual(cache.get('key_2'), 2)
+
+    def test_lru_bound_one_million_keys(self):
+        cache = ExpiringLocalCache(cron_interval=10, max_entries=100_000)
+        for i in range(1_000_000):
+            cache.set(f'key_{i}', i, 1000)
+        self.assertEqual(len(cache), 100_000)
+        self.assertEqual(cache.stats()["evictions"], 900_000)
+        # 淘汰留下的失效堆元素会被定期重建，堆的大小与缓存大小保持同一量级
+        self.assertLess(len(cache._expire_heap), 3 * 100_000 + 1024)
+        self.assertIsNone(cache.get('key_0'))
+        self.assertEqual(cache.get('key_999999'), 999_999)
+
+    def test_keys_glob_pattern(self):
+        for key in ['kuaidaili_1', 'kuaidaili_2', 'kuaidaili_10', 'wandouhttp_1', 'xkuaidaili_1']:
+            self.cache.set(key, key, 10)
+        self.assertEqual(self.cache.keys('kuaidaili_*'), ['kuaidaili_1', 'kuaidaili_10', 'kuaidaili_2'])
+        self.assertEqual(self.cache.keys('kuaidaili_?'), ['kuaidaili_1', 'kuaidaili_2'])
+        self.assertEqual(self.cache.keys('*_1'), ['kuaidaili_1', 'wandouhttp_1', 'xkuaidaili_1'])
+        self.assertEqual(self.cache.keys('[kw]*_1'), ['kuaidaili_1', 'wandouhttp_1'])
+        self.assertEqual(self.cache.keys('wandouhttp_1'), ['wandouhttp_1'])
+        self.assertEqual(self.cache.keys('kuaidaili'), [])
+
+    def test_keys_skip_evicted_and_expired(self):
+        cache = ExpiringLocalCache(cron_interval=10, max_entries=2)
+        cache.set('ip_1', 1, 1)
+        cache.set('ip_2', 2, 100)
+        cache.set('ip_3', 3, 100)
+        self.assertEqual(cache.keys('ip_*'), ['ip_2', 'ip_3'])
+        with patch("cache.local_cache.time.monotonic", return_value=time.monotonic() + 10):
+            cache.set('ip_4', 4, 1)
+            self.assertEqual(cache.keys('ip_*'), ['ip_3', 'ip_4'])
+        with patch("cache.local_cache.time.monotonic", return_value=time.monotonic() + 200):
+            self.assertEqual(cache.keys('ip_*'), [])
+
+    def test_prefix_keys_in_one_million_keys(self):
+        cache = ExpiringLocalCache(cron_interval=10, max_entries=0)
+        for i in range(1_000_000):
+            cache.set(f'key_{i}', i, 1000)
+        for i in range(10):
+            cache.set(f'proxy_{i}', i, 1000)
+
+        # 前缀查询只读取匹配的键，与缓存大小无关
+        self.assertEqual(cache.keys('proxy_*'), [f'proxy_{i}' for i in range(10)])
+        with patch("cache.local_cache.fnmatchcase", wraps=fnmatchcase) as match:
+            self.assertEqual(cache.keys('proxy_?'), [f'proxy_{i}' for i in range(10)])
+        self.assertEqual(match.call_count, 10)
+        with patch("cache.local_cache.fnmatchcase", wraps=fnmatchcase) as match:
+            self.assertEqual(len(cache.keys('key_99999?')), 10)
+        # 前缀 key_99999 范围内只有 key_99999 和 key_999990 ~ key_999999
+        self.assertEqual(match.call_count, 11)
+
     def tearDown(self):
         del self.cache
 
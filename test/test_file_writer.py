@@ -0,0 +1,99 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+
+import csv
+import importlib.util
+import json
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase, skipUnless
+from unittest.mock import patch
+
+import config
+from store.file_writer import close_all_file_writers, get_csv_writer, get_jsonl_writer, get_parquet_writer
+
+
+class TestFileWriter(IsolatedAsyncioTestCase):
+
+    async def test_jsonl_writer_finalize_to_json(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, patch.object(config, "JSONL_FINALIZE_TO_JSON", True):
+            jsonl_path = os.path.join(tmp_dir, "jsonl", "search_comments.jsonl")
+            json_path = os.path.join(tmp_dir, "json", "search_comments.json")
+            for i in range(5):
+                await get_jsonl_writer(jsonl_path, json_file_path=json_path).write({"comment_id": i, "content": "评论"})
+            self.assertIs(get_jsonl_writer(jsonl_path), get_jsonl_writer(jsonl_path))
+            await close_all_file_writers()
+
+            with open(jsonl_path, encoding="utf-8") as f:
+                self.assertEqual([json.loads(line)["comment_id"] for line in f], [0, 1, 2, 3, 4])
+            with open(json_path, encoding="utf-8") as f:
+                self.assertEqual(len(json.load(f)), 5)
+
+    async def test_csv_writer_header_once(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "1_search_comments.csv")
+            for _ in range(2):
+                for i in range(3):
+                    await get_csv_writer(csv_path).write_row({"comment_id": i, "content": "评论,含逗号"})
+                # 第二轮重新打开已有内容的文件，不应重复写表头
+                await close_all_file_writers()
+
+            with open(csv_path, encoding="utf-8-sig", newline="") as f:
+                rows = list(csv.reader(f))
+            self.assertEqual(rows[0], ["comment_id", "content"])
+            self.assertEqual(len(rows), 7)
+            self.assertEqual(rows[1], ["0", "评论,含逗号"])
+            self.assertNotIn("\ufeff", "".join(rows[4]))
+
+    @skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    async def test_parquet_writer_row_groups(self):
+        import pyarrow.parquet as pq
+        with tempfile.TemporaryDirectory() as tmp_dir, patch.object(config, "PARQUET_ROW_GROUP_SIZE", 4):
+            partition_dir = os.path.join(tmp_dir, "platform=xhs", "store_type=comments")
+            for i in range(10):
+                await get_parquet_writer(partition_dir).write({
+                    "comment_id": str(i), "like_count": i, "score": i / 2, "ip_location": None,
+                    "create_time": "123" if i == 9 else i,
+                })
+            await close_all_file_writers()
+
+            parquet_file = pq.ParquetFile(os.path.join(partition_dir, os.listdir(partition_dir)[0]))
+            self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+            self.assertEqual(str(parquet_file.schema_arrow.field("like_count").type), "int64")
+            self.assertEqual(str(parquet_file.schema_arrow.field("ip_location").type), "string")
+            table = parquet_file.read(columns=["comment_id", "create_time"])
+            self.assertEqual(table.column_names, ["comment_id", "create_time"])
+            self.assertEqual(table.column("create_time").to_pylist()[-1], 123)
+
+    @skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    async def test_parquet_writer_widen_schema(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        with tempfile.TemporaryDirectory() as tmp_dir, patch.object(config, "PARQUET_ROW_GROUP_SIZE", 2):
+            partition_dir = os.path.join(tmp_dir, "platform=xhs", "store_type=contents")
+            for item in [{"note_id": "1", "liked_count": 1}, {"note_id": "2", "liked_count": 2},
+                         {"note_id": "3", "liked_count": 3}, {"note_id": "4", "liked_count": 4}]:
+                await get_parquet_writer(partition_dir).write(item)
+            await get_parquet_writer(partition_dir).flush()
+            # 整数列出现小数、出现新字段时写入新的 part 文件，不截断、不丢弃数据
+            for item in [{"note_id": "5", "liked_count": 5.5}, {"note_id": "6", "liked_count": 6, "ip_location": "上海"}]:
+                await get_parquet_writer(partition_dir).write(item)
+            await close_all_file_writers()
+
+            self.assertEqual(len(os.listdir(partition_dir)), 2)
+            tables = [pq.read_table(os.path.join(partition_dir, name)) for name in os.listdir(partition_dir)]
+            table = pa.concat_tables(tables, promote_options="permissive")
+            rows = sorted(table.to_pylist(), key=lambda row: row["note_id"])
+            self.assertEqual([row["liked_count"] for row in rows], [1, 2, 3, 4, 5.5, 6])
+            self.assertEqual(rows[-1]["ip_location"], "上海")
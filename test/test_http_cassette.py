@@ -0,0 +1,91 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+
+import json
+import os
+import tempfile
+import uuid
+from unittest import IsolatedAsyncioTestCase
+
+import httpx
+
+from tools.http_cassette import (Cassette, CassetteMissError, CassetteTransport, request_match_key)
+
+
+class TestHttpCassette(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "bili.jsonl.gz")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_match_key_ignores_signature_params(self):
+        key = request_match_key("GET", "https://api.bilibili.com/x/v2/reply?oid=1&type=1&wts=100&w_rid=abc")
+        self.assertEqual(key, request_match_key("get", "https://api.bilibili.com/x/v2/reply?type=1&w_rid=def&oid=1&wts=2"))
+        self.assertNotEqual(key, request_match_key("GET", "https://api.bilibili.com/x/v2/reply?oid=2&type=1"))
+        body_key = request_match_key("POST", "https://edith.xiaohongshu.com/api/sns/web/v1/feed",
+                                     b'{"source_note_id":"n1","xsec_token":"t1"}', "application/json")
+        self.assertEqual(body_key, request_match_key("POST", "https://edith.xiaohongshu.com/api/sns/web/v1/feed",
+                                                     b'{"xsec_token":"t2","source_note_id":"n1"}', "application/json"))
+
+    async def test_record_and_replay(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url)
+            return httpx.Response(200, json={"code": 0, "data": {"oid": request.url.params["oid"]}})
+
+        cassette = Cassette(self.path)
+        transport = CassetteTransport(cassette, "record", inner=httpx.MockTransport(handler))
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.get("https://api.bilibili.com/x/v2/reply", params={"oid": 1, "wts": 100})
+        self.assertEqual(response.json()["data"]["oid"], "1")
+        cassette.save()
+
+        replay = CassetteTransport(Cassette(self.path), "replay")
+        async with httpx.AsyncClient(transport=replay) as client:
+            response = await client.get("https://api.bilibili.com/x/v2/reply", params={"oid": 1, "wts": 200})
+            self.assertEqual(json.loads(response.text), {"code": 0, "data": {"oid": "1"}})
+            with self.assertRaises(CassetteMissError):
+                await client.get("https://api.bilibili.com/x/v2/reply", params={"oid": 2})
+        self.assertEqual(len(calls), 1)
+
+    async def test_record_and_replay_xhs_search(self):
+        def search_body(keyword: str, page: int) -> bytes:
+            # 与 XiaoHongShuClient.get_note_by_keyword 相同，search_id 每次搜索随机生成（help.get_search_id）
+            return json.dumps({"keyword": keyword, "page": page, "page_size": 20, "search_id": uuid.uuid4().hex,
+                               "sort": "general", "note_type": 0}, separators=(",", ":")).encode("utf-8")
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            data = json.loads(request.content)
+            return httpx.Response(200, json={"code": 0, "data": {"items": [f"{data['keyword']}-{data['page']}"]}})
+
+        url = "https://edith.xiaohongshu.com/api/sns/web/v1/search/notes"
+        headers = {"Content-Type": "application/json;charset=UTF-8"}
+        cassette = Cassette(self.path)
+        transport = CassetteTransport(cassette, "record", inner=httpx.MockTransport(handler))
+        async with httpx.AsyncClient(transport=transport) as client:
+            for page in (1, 2):
+                await client.post(url, content=search_body("python", page), headers=headers)
+        cassette.save()
+
+        replay = CassetteTransport(Cassette(self.path), "replay")
+        async with httpx.AsyncClient(transport=replay) as client:
+            for page in (1, 2):
+                response = await client.post(url, content=search_body("python", page), headers=headers)
+                self.assertEqual(response.json()["data"]["items"], [f"python-{page}"])
+            with self.assertRaises(CassetteMissError):
+                await client.post(url, content=search_body("golang", 1), headers=headers)
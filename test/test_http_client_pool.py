@@ -0,0 +1,51 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+
+from unittest import IsolatedAsyncioTestCase
+
+from tools.http_client_pool import HttpClientPool
+
+
+def proxy(port: int):
+    return {"https://": f"http://u:p@127.0.0.1:{port}"}
+
+
+class TestHttpClientPool(IsolatedAsyncioTestCase):
+    async def test_reuse_client_per_proxy(self):
+        pool = HttpClientPool(max_size=2)
+        async with pool.client(proxy(1)) as client1:
+            pass
+        async with pool.client(proxy(1)) as client:
+            self.assertIs(client, client1)
+        async with pool.client(None) as direct:
+            self.assertIsNot(direct, client1)
+        self.assertEqual(pool.stats(), {"size": 2, "created": 2, "hits": 1})
+        await pool.close()
+        self.assertTrue(client1.is_closed)
+        self.assertTrue(direct.is_closed)
+
+    async def test_evict_least_recently_used(self):
+        pool = HttpClientPool(max_size=2)
+        async with pool.client(proxy(1)) as client1:
+            async with pool.client(proxy(2)):
+                pass
+            async with pool.client(proxy(3)):
+                pass
+            # 被淘汰的客户端仍在使用时不关闭
+            self.assertFalse(client1.is_closed)
+        self.assertTrue(client1.is_closed)
+        self.assertEqual(len(pool), 2)
+        async with pool.client(proxy(1)) as client:
+            self.assertIsNot(client, client1)
+        await pool.close()
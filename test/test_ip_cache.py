@@ -0,0 +1,37 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+from unittest import IsolatedAsyncioTestCase
+
+from cache.cache_factory import CacheFactory
+from proxy import IpCache
+from proxy.types import IpInfoModel
+
+
+class TestIpCache(IsolatedAsyncioTestCase):
+
+    async def test_async_local_cache_mget_mset(self):
+        cache = CacheFactory.create_async_cache('memory')
+        await cache.mset({"a": 1, "b": [2]}, 10)
+        self.assertEqual(await cache.mget(["a", "b", "c"]), [1, [2], None])
+        self.assertEqual(await cache.keys("*"), ["a", "b"])
+
+    async def test_load_all_ip(self):
+        ip_cache = IpCache()
+        for port in (8000, 8001):
+            ip_info = IpInfoModel(ip="127.0.0.1", port=port, user="u", password="p", expired_time_ts=0)
+            await ip_cache.set_ip(f"kuaidaili_127.0.0.1_{port}", ip_info, ex=10)
+        await ip_cache.set_ip("jishuhttp_127.0.0.1_9000", ip_info, ex=10)
+
+        ip_list = await ip_cache.load_all_ip(proxy_brand_name="kuaidaili")
+        self.assertEqual(sorted(ip_info.port for ip_info in ip_list), [8000, 8001])
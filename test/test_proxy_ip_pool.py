@@ -13,9 +13,18 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2023/12/2 14:42
 # @Desc    :
+import asyncio
+import time
+from collections import Counter
+from typing import List
 from unittest import IsolatedAsyncioTestCase
 
-from proxy.proxy_ip_pool import create_ip_pool
+import httpx
+
+from proxy.base_proxy import ProxyProvider
+from proxy.proxy_health import ProxyHealthTracker, ProxyHealthTransport
+from proxy.proxy_ip_pool import ProxyIpPool, create_ip_pool
+from proxy.proxy_rotator import ROTATION_EVERY_N, ROTATION_ON_BLOCK, ROTATION_REQUEST, ROTATION_SESSION, ProxyRotator
 from proxy.types import IpInfoModel
 
 
@@ -28,3 +37,218 @@ class TestIpPool(IsolatedAsyncioTestCase):
             print(ip_proxy_info)
             self.assertIsNotNone(ip_proxy_info.ip, msg="验证 ip 是否获取成功")
 
+
+
+class FakeProxyProvider(ProxyProvider):
+    """按顺序分配端口的代理商，端口为奇数的代理验证不通过"""
+
+    def __init__(self, expire_sec: int = 600):
+        self.next_port = 0
+        self.expire_sec = expire_sec
+
+    async def get_proxies(self, num: int) -> List[IpInfoModel]:
+        proxies = [IpInfoModel(ip="127.0.0.1", port=self.next_port + i, user="u", password="p",
+                               expired_time_ts=int(time.time()) + self.expire_sec) for i in range(num)]
+        self.next_port += num
+        return proxies
+
+
+class CacheFirstProxyProvider(FakeProxyProvider):
+    """与快代理等代理商一样优先返回缓存中还未过期的代理，缓存不够时才提取新的代理"""
+
+    def __init__(self):
+        super().__init__()
+        self.cache: List[IpInfoModel] = []
+
+    async def get_proxies(self, num: int) -> List[IpInfoModel]:
+        if len(self.cache) < num:
+            self.cache.extend(await super().get_proxies(num - len(self.cache)))
+        return self.cache[:num]
+
+
+class FailingProxyProvider(ProxyProvider):
+    def __init__(self):
+        self.calls: List[float] = []
+
+    async def get_proxies(self, num: int) -> List[IpInfoModel]:
+        self.calls.append(time.monotonic())
+        raise Exception("get ip error from proxy provider")
+
+
+class FakeValidateIpPool(ProxyIpPool):
+    async def _is_valid_proxy(self, proxy: IpInfoModel) -> bool:
+        await asyncio.sleep(0.1)
+        return proxy.port % 2 == 0
+
+
+class TestProxyIpPoolRefill(IsolatedAsyncioTestCase):
+    @staticmethod
+    async def wait_pool_size(pool: ProxyIpPool, size: int, timeout: float = 5):
+        deadline = time.monotonic() + timeout
+        while len(pool.proxy_list) < size and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+    async def test_concurrent_validate_and_refill(self):
+        pool = FakeValidateIpPool(ip_pool_count=4, enable_validate_ip=True, ip_provider=FakeProxyProvider())
+        start = time.monotonic()
+        valid = await pool.validate_proxies(await pool.ip_provider.get_proxies(20))
+        # 20 个代理并发验证，耗时接近一次验证
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual([proxy.port for proxy in valid], list(range(0, 20, 2)))
+
+        await pool.load_proxies()
+        pool.start_refill()
+        try:
+            await self.wait_pool_size(pool, 4)
+            self.assertEqual(len(pool.proxy_list), 4)
+            start = time.monotonic()
+            proxy = await pool.get_proxy()
+            self.assertLess(time.monotonic() - start, 0.01)
+            self.assertEqual(proxy.port % 2, 0)
+            # 取走的代理由后台任务补充
+            await self.wait_pool_size(pool, 4)
+            self.assertEqual(len(pool.proxy_list), 4)
+        finally:
+            await pool.close()
+
+    async def test_refill_with_cache_first_provider(self):
+        pool = ProxyIpPool(ip_pool_count=2, enable_validate_ip=False, ip_provider=CacheFirstProxyProvider())
+        await pool.load_proxies()
+        pool.start_refill()
+        try:
+            taken = [await pool.get_proxy() for _ in range(3)]
+            await self.wait_pool_size(pool, 2)
+            ports = [proxy.port for proxy in pool.proxy_list]
+            self.assertEqual(len(ports), 2)
+            self.assertEqual(len(set(ports)), 2)
+            # 被取走的代理虽然还在代理商的缓存中，也不会重新加入代理池
+            self.assertFalse(set(ports) & {proxy.port for proxy in taken})
+        finally:
+            await pool.close()
+
+    async def test_refill_backoff(self):
+        provider = FailingProxyProvider()
+        pool = ProxyIpPool(ip_pool_count=1, enable_validate_ip=False, ip_provider=provider)
+        pool.refill_min_backoff = 0.05
+        pool.refill_max_backoff = 0.2
+        pool.start_refill()
+        await asyncio.sleep(0.8)
+        await pool.close()
+        gaps = [b - a for a, b in zip(provider.calls, provider.calls[1:])]
+        # 间隔依次为 0.05、0.1、0.2、0.2 ...，没有退避时 0.8 秒内会请求十几次
+        self.assertLessEqual(len(provider.calls), 7)
+        self.assertGreater(gaps[2], gaps[0] * 2)
+
+    async def test_drop_expiring_proxies(self):
+        pool = FakeValidateIpPool(ip_pool_count=2, enable_validate_ip=False, ip_provider=FakeProxyProvider(expire_sec=10))
+        # 所有代理都在过期余量之内，不会进入代理池
+        await pool.load_proxies()
+        self.assertEqual(pool.proxy_list, [])
+
+
+class TestProxyHealth(IsolatedAsyncioTestCase):
+    async def test_weighted_selection_and_quarantine(self):
+        tracker = ProxyHealthTracker(ewma_alpha=0.5, max_consecutive_failures=2, quarantine_sec=60)
+        pool = ProxyIpPool(ip_pool_count=3, enable_validate_ip=False, ip_provider=FakeProxyProvider(),
+                           health_tracker=tracker)
+        await pool.load_proxies()
+        fast, slow, blocked = pool.proxy_list
+        for _ in range(5):
+            pool.report_success(fast, 0.1)
+            pool.report_success(slow, 3)
+        self.assertGreater(tracker.score("127.0.0.1:0"), tracker.score("127.0.0.1:1"))
+
+        pool.report_failure(blocked, captcha=True)
+        # 被隔离的代理移出代理池，不会被重新加入
+        self.assertNotIn(blocked, pool.proxy_list)
+        self.assertTrue(tracker.is_quarantined("127.0.0.1:2"))
+
+        counter = Counter()
+        for _ in range(2000):
+            proxy = await pool.get_proxy()
+            counter[proxy.port] += 1
+            pool.proxy_list.append(proxy)
+        await pool.close()
+        self.assertNotIn(2, counter)
+        self.assertGreater(counter[0], counter[1] * 2)
+
+        stats = pool.stats()
+        self.assertEqual(stats["quarantined"], 1)
+        self.assertEqual(stats["proxies"][0]["proxy"], "127.0.0.1:0")
+        self.assertEqual(stats["proxies"][-1]["captchas"], 1)
+
+    async def test_consecutive_failures(self):
+        tracker = ProxyHealthTracker(max_consecutive_failures=3, quarantine_sec=60)
+        tracker.record_failure("a:1")
+        tracker.record_failure("a:1")
+        tracker.record_success("a:1", 0.2)
+        tracker.record_failure("a:1")
+        self.assertFalse(tracker.is_quarantined("a:1"))
+        tracker.record_failure("a:1")
+        tracker.record_failure("a:1")
+        self.assertTrue(tracker.is_quarantined("a:1"))
+
+    async def test_transport_reports_results(self):
+        tracker = ProxyHealthTracker(max_consecutive_failures=3, quarantine_sec=60)
+        statuses = iter([200, 500, 403, 429])
+        transport = ProxyHealthTransport(httpx.MockTransport(lambda request: httpx.Response(next(statuses))),
+                                         "127.0.0.1:8080", tracker=tracker)
+        async with httpx.AsyncClient(transport=transport) as client:
+            for _ in range(2):
+                await client.get("https://example.com/")
+            # 一次 403 不能认定代理被封禁
+            await client.get("https://example.com/")
+            self.assertFalse(tracker.is_quarantined("127.0.0.1:8080"))
+            await client.get("https://example.com/")
+        health = tracker.get("127.0.0.1:8080")
+        # 403、429 按普通失败计数，连续失败 3 次后隔离
+        self.assertEqual((health.successes, health.failures, health.blocks), (1, 3, 0))
+        self.assertIsNotNone(health.latency_ewma)
+        self.assertTrue(health.is_quarantined())
+
+
+class TestProxyRotator(IsolatedAsyncioTestCase):
+    async def create_pool(self, tracker: ProxyHealthTracker) -> ProxyIpPool:
+        pool = ProxyIpPool(ip_pool_count=3, enable_validate_ip=False, ip_provider=FakeProxyProvider(),
+                           health_tracker=tracker)
+        await pool.load_proxies()
+        self.addAsyncCleanup(pool.close)
+        return pool
+
+    @staticmethod
+    async def used_ports(rotator: ProxyRotator, count: int) -> List[int]:
+        return [int(next(iter((await rotator.next_proxies()).values())).rsplit(":", 1)[1]) for _ in range(count)]
+
+    async def test_rotation_policies(self):
+        tracker = ProxyHealthTracker(quarantine_sec=60)
+        pool = await self.create_pool(tracker)
+        start_proxy = await pool.get_proxy()
+
+        session = ProxyRotator(pool, start_proxy, policy=ROTATION_SESSION)
+        self.assertEqual(set(await self.used_ports(session, 10)), {start_proxy.port})
+
+        pool_size = len(pool.proxy_list)
+        per_request = ProxyRotator(pool, start_proxy, policy=ROTATION_REQUEST)
+        await self.used_ports(per_request, 10)
+        self.assertEqual(per_request.rotations, 9)
+        # 按请求轮换时代理留在池中共用
+        self.assertGreaterEqual(len(pool.proxy_list), pool_size)
+
+        every_n = ProxyRotator(pool, start_proxy, policy=ROTATION_EVERY_N, rotate_every=4)
+        ports = await self.used_ports(every_n, 10)
+        self.assertEqual(every_n.rotations, 2)
+        self.assertEqual(len(set(ports[:4])), 1)
+
+    async def test_rotate_on_block(self):
+        tracker = ProxyHealthTracker(quarantine_sec=60)
+        pool = await self.create_pool(tracker)
+        start_proxy = await pool.get_proxy()
+        rotator = ProxyRotator(pool, start_proxy, policy=ROTATION_ON_BLOCK)
+        self.assertEqual(set(await self.used_ports(rotator, 5)), {start_proxy.port})
+
+        tracker.record_failure(f"{start_proxy.ip}:{start_proxy.port}", blocked=True)
+        ports = await self.used_ports(rotator, 5)
+        self.assertEqual(len(set(ports)), 1)
+        self.assertNotEqual(ports[0], start_proxy.port)
+        # on_block 更换代理时取走代理独占使用
+        self.assertNotIn(ports[0], [proxy.port for proxy in pool.proxy_list])
@@ -0,0 +1,90 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+
+import os
+import tempfile
+from typing import Dict, List
+from unittest import IsolatedAsyncioTestCase
+
+from base.base_crawler import AbstractStore
+from store.fingerprint_filter import FingerprintFilterStore
+from tools.record_fingerprint import RecordFingerprintIndex, record_fingerprint
+
+
+class MemoryStore(AbstractStore):
+    def __init__(self):
+        self.comments: List[Dict] = []
+
+    async def store_content(self, content_item: Dict):
+        pass
+
+    async def store_comment(self, comment_item: Dict):
+        self.comments.append(comment_item)
+
+    async def store_creator(self, creator: Dict):
+        pass
+
+
+class TestRecordFingerprint(IsolatedAsyncioTestCase):
+
+    def test_fingerprint_ignores_timestamps(self):
+        self.assertEqual(
+            record_fingerprint({"comment_id": "1", "content": "a", "last_modify_ts": 1, "add_ts": 1}),
+            record_fingerprint({"content": "a", "comment_id": "1", "last_modify_ts": 2}),
+        )
+        self.assertNotEqual(record_fingerprint({"comment_id": "1", "like_count": 1}),
+                            record_fingerprint({"comment_id": "1", "like_count": 2}))
+
+    async def test_skip_unchanged_across_runs(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            comments = [{"comment_id": str(i), "like_count": i, "last_modify_ts": 1} for i in range(5)]
+            store = MemoryStore()
+            index = RecordFingerprintIndex("xhs", save_dir=tmp_dir, sink="json")
+            await FingerprintFilterStore(store, index).store_comments(comments + comments[:1])
+            self.assertEqual(len(store.comments), 5)
+            index.save()
+
+            # 第二次运行：一条评论点赞数变化，其余不变
+            comments = [dict(comment, last_modify_ts=2) for comment in comments]
+            comments[3]["like_count"] = 100
+            store = MemoryStore()
+            index = RecordFingerprintIndex("xhs", save_dir=tmp_dir, sink="json")
+            await FingerprintFilterStore(store, index).store_comments(comments)
+            self.assertEqual([comment["comment_id"] for comment in store.comments], ["3"])
+            self.assertEqual((index.written["comments"], index.skipped["comments"]), (1, 4))
+
+    async def test_revert_to_previous_content(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index = RecordFingerprintIndex("xhs", save_dir=tmp_dir, sink="json")
+            store = MemoryStore()
+            filter_store = FingerprintFilterStore(store, index)
+            # A -> B -> A，第三次写入与上次写入（B）不同，需要写入
+            for like_count in (1, 2, 1, 1):
+                await filter_store.store_comment({"comment_id": "1", "like_count": like_count})
+            self.assertEqual([comment["like_count"] for comment in store.comments], [1, 2, 1])
+            index.save()
+            # 每条记录只保存最新的指纹
+            self.assertEqual(len(RecordFingerprintIndex("xhs", save_dir=tmp_dir)._table("comments")), 1)
+
+    async def test_index_per_sink(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            comments = [{"comment_id": str(i), "like_count": i} for i in range(3)]
+            for sink in ("json", "db"):
+                index = RecordFingerprintIndex("xhs", save_dir=os.path.join(tmp_dir, sink), sink=sink)
+                store = MemoryStore()
+                await FingerprintFilterStore(store, index).store_comments(comments)
+                # 其他存储方式写入过的记录不影响当前存储方式
+                self.assertEqual(len(store.comments), 3)
+                index.save()
+            self.assertTrue(RecordFingerprintIndex("xhs", sink="db").save_dir.endswith(os.path.join("fingerprint", "db")))
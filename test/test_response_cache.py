@@ -0,0 +1,54 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+import config
+from tools.response_cache import cached_response, response_cache_key
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    @cached_response("test.get_detail")
+    async def get_detail(self, note_id: str, xsec_token: str = "") -> dict:
+        self.calls += 1
+        return {"note_id": note_id, "calls": self.calls} if note_id else {}
+
+
+class TestResponseCache(IsolatedAsyncioTestCase):
+
+    def test_key_ignores_volatile_params(self):
+        key = response_cache_key("bili.get_video_info", {"bvid": "BV1", "aid": 0, "wts": 1, "w_rid": "a"})
+        self.assertEqual(key, response_cache_key("bili.get_video_info", {"aid": 0, "bvid": "BV1", "wts": 2}))
+        self.assertNotEqual(key, response_cache_key("bili.get_video_info", {"aid": 0, "bvid": "BV2"}))
+        self.assertNotEqual(key, response_cache_key("bili.get_video_play_url", {"aid": 0, "bvid": "BV1"}))
+
+    async def test_cached_response(self):
+        client = FakeClient()
+        with patch.object(config, "ENABLE_RESPONSE_CACHE", True):
+            first = await client.get_detail("n1", xsec_token="t1")
+            first["calls"] = 100  # 调用方修改返回值不影响缓存
+            self.assertEqual(await client.get_detail("n1", xsec_token="t2"), {"note_id": "n1", "calls": 1})
+            self.assertEqual(await client.get_detail(note_id="n2"), {"note_id": "n2", "calls": 2})
+            # 空结果不缓存
+            await client.get_detail("")
+            await client.get_detail("")
+            self.assertEqual(client.calls, 4)
+
+        with patch.object(config, "ENABLE_RESPONSE_CACHE", False):
+            await client.get_detail("n1")
+            self.assertEqual(client.calls, 5)
@@ -0,0 +1,63 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+
+import re
+from unittest import TestCase
+
+from db import (TABLES_SQL_VERSION, build_add_partitions_sql, load_migrations, split_sql_statements,
+                year_partition_bound)
+
+
+class TestSchemaMigrations(TestCase):
+
+    def test_load_migrations(self):
+        migrations = load_migrations()
+        self.assertEqual([version for version, _, _ in migrations], list(range(1, len(migrations) + 1)))
+        self.assertEqual(migrations[0][1], "baseline")
+        # 基线迁移不能删除已有的表
+        self.assertNotRegex(migrations[0][2], re.compile(r"^\s*DROP\s+TABLE", re.I | re.M))
+        # 旧版本 tables.sql 建的表只会标记基线版本，唯一索引需要由后续的迁移添加
+        self.assertNotRegex(migrations[0][2], r"UNIQUE KEY\s+`idx_xhs_note_note_id_209457`")
+        self.assertIn("ADD UNIQUE KEY `idx_xhs_note_note_id_209457`", migrations[1][2])
+        self.assertEqual(migrations[-1][0], TABLES_SQL_VERSION)
+
+    def test_add_partitions_sql(self):
+        # 与 0004_partition_comment_tables.sql 中的边界一致
+        self.assertEqual(year_partition_bound(2026), 1798732800)
+        self.assertEqual(year_partition_bound(2026, 1000), 1798732800000)
+        self.assertIsNone(build_add_partitions_sql("xhs_note_comment", 1000, 2027, 2027))
+        sql = build_add_partitions_sql("weibo_note_comment", 1, 2026, 2028)
+        self.assertEqual(sql, "ALTER TABLE `weibo_note_comment` REORGANIZE PARTITION pmax INTO ("
+                              f"PARTITION p2027 VALUES LESS THAN ({year_partition_bound(2027)}), "
+                              f"PARTITION p2028 VALUES LESS THAN ({year_partition_bound(2028)}), "
+                              "PARTITION pmax VALUES LESS THAN MAXVALUE)")
+
+    def test_split_sql_statements(self):
+        statements = split_sql_statements("-- comment; ignored\nALTER TABLE a ADD KEY k (b);\n\nALTER TABLE c\n"
+                                          "PARTITION BY RANGE (t) (PARTITION p0 VALUES LESS THAN (1));\n")
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[1].startswith("ALTER TABLE c"))
+
+    def test_partitioned_tables_unique_keys_include_partition_column(self):
+        with open("schema/tables.sql", "r", encoding="utf-8") as f:
+            statements = split_sql_statements(f.read())
+        partitioned = {re.match(r"ALTER TABLE `(\w+)`", statement).group(1) for statement in statements
+                       if "PARTITION BY RANGE (`create_time`)" in statement}
+        self.assertIn("xhs_note_comment", partitioned)
+        for statement in statements:
+            create = re.match(r"CREATE TABLE `(\w+)`", statement)
+            if not create or create.group(1) not in partitioned:
+                continue
+            for key in re.findall(r"(?:PRIMARY|UNIQUE) KEY[^(]*\(([^)]*)\)", statement):
+                self.assertIn("`create_time`", key, create.group(1))
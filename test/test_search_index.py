@@ -0,0 +1,51 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+
+import os
+import tempfile
+from unittest import TestCase
+
+from tools.search_index import ContentSearchIndex, comment_document, content_document
+
+
+class TestContentSearchIndex(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index = ContentSearchIndex(os.path.join(self.tmp_dir.name, "search_index.db"))
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    def test_search_contents_and_comments(self):
+        self.index.add_documents([
+            content_document("xhs", {"note_id": "n1", "title": "程序员副业指南", "desc": "如何利用业余时间接外包项目"}),
+            content_document("dy", {"aweme_id": "a1", "title": "周末露营", "desc": "周末露营"}),
+            comment_document("xhs", {"comment_id": "c1", "note_id": "n1", "content": "外包项目一般在哪里找？"}),
+        ])
+
+        results = self.index.search("外包项目")
+        self.assertEqual({(r["kind"], r["record_id"]) for r in results}, {("content", "n1"), ("comment", "c1")})
+        comment = next(r for r in results if r["kind"] == "comment")
+        self.assertEqual(comment["content_id"], "n1")
+        self.assertEqual(comment["snippet"], "[外包项目]一般在哪里找？")
+        self.assertEqual([r["record_id"] for r in self.index.search("外包", kind="content")], ["n1"])
+        self.assertEqual(self.index.search("外包", platform="dy"), [])
+
+    def test_reindex_replaces_document(self):
+        self.index.add_documents([comment_document("xhs", {"comment_id": "c1", "content": "旧的评论内容"})])
+        self.index.add_documents([comment_document("xhs", {"comment_id": "c1", "content": "修改后的评论"})])
+        self.assertEqual(self.index.search("旧的"), [])
+        self.assertEqual(len(self.index.search("修改")), 1)
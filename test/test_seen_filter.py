@@ -0,0 +1,77 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+
+import json
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+from tools.seen_filter import ScalableBloomFilter, SeenFilter
+
+
+class TestScalableBloomFilter(unittest.TestCase):
+
+    def test_add_and_contains(self):
+        sbf = ScalableBloomFilter(initial_capacity=100, error_rate=0.001)
+        for i in range(1000):
+            sbf.add(f"note_{i}")
+        self.assertGreater(len(sbf.filters), 1)
+        for i in range(1000):
+            self.assertIn(f"note_{i}", sbf)
+        false_positives = sum(1 for i in range(1000, 11000) if f"note_{i}" in sbf)
+        self.assertLess(false_positives, 100)
+
+
+class TestSeenFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_persist_and_reload(self):
+        seen_filter = SeenFilter("xhs", freshness_days=1, exact_limit=5, save_dir=self.tmp_dir.name)
+        for i in range(20):
+            seen_filter.add(f"note_{i}")
+        seen_filter.record_source_keyword("note_1", "编程副业")
+        seen_filter.save()
+
+        reloaded = SeenFilter("xhs", freshness_days=1, exact_limit=5, save_dir=self.tmp_dir.name)
+        self.assertTrue(all(reloaded.is_fresh(f"note_{i}") for i in range(20)))
+        self.assertIsNotNone(reloaded.buckets[date.today().isoformat()].bloom)
+        with open(os.path.join(self.tmp_dir.name, "source_keyword.jsonl"), encoding="utf-8") as f:
+            self.assertEqual(json.loads(f.readline())["source_keyword"], "编程副业")
+
+    def test_should_skip_records_source_keyword(self):
+        seen_filter = SeenFilter("xhs", freshness_days=1, save_dir=self.tmp_dir.name)
+        self.assertFalse(seen_filter.should_skip("note_1", "编程副业"))
+        self.assertEqual(seen_filter._pending_keywords, [])
+        seen_filter.add("note_1")
+        self.assertTrue(seen_filter.should_skip("note_1", "编程副业"))
+        self.assertEqual(seen_filter._pending_keywords[0]["content_id"], "note_1")
+
+    def test_freshness_window(self):
+        seen_filter = SeenFilter("dy", freshness_days=1, save_dir=self.tmp_dir.name)
+        seen_filter.add("aweme_today")
+        expired_day = (date.today() - timedelta(days=3)).isoformat()
+        seen_filter.buckets[expired_day] = seen_filter.buckets.pop(date.today().isoformat())
+        self.assertFalse(seen_filter.is_fresh("aweme_today"))
+        seen_filter.save()
+        self.assertNotIn(expired_day, seen_filter.buckets)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+
+from async_db import AsyncSqliteDB
+from db import mysql_schema_to_sqlite
+
+
+class TestAsyncSqliteDB(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        with open("schema/tables.sql", "r", encoding="utf-8") as f:
+            ddl_list, unique_keys = mysql_schema_to_sqlite(f.read())
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = AsyncSqliteDB(os.path.join(self.tmp_dir.name, "test.db"), unique_keys=unique_keys)
+        await self.db.executescript(";\n".join(ddl_list) + ";")
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        self.tmp_dir.cleanup()
+
+    async def test_wal_mode(self):
+        row = await self.db.get_first("PRAGMA journal_mode")
+        self.assertEqual(row["journal_mode"], "wal")
+
+    async def test_batch_upsert(self):
+        def make_comment(comment_id: str, content: str, add_ts: int):
+            return {
+                "comment_id": comment_id, "note_id": "n1", "user_id": "u1", "content": content,
+                "create_time": 1, "sub_comment_count": 0, "add_ts": add_ts, "last_modify_ts": add_ts,
+            }
+
+        await self.db.batch_upsert("xhs_note_comment", [make_comment("c1", "old", 100), make_comment("c2", "old", 100)])
+        await self.db.batch_upsert("xhs_note_comment", [make_comment("c1", "new", 200)])
+
+        rows = await self.db.query("SELECT comment_id, content, add_ts, last_modify_ts FROM xhs_note_comment "
+                                   "ORDER BY comment_id")
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0], {"comment_id": "c1", "content": "new", "add_ts": 100, "last_modify_ts": 200})
+        self.assertEqual(rows[1]["content"], "old")
+
+    async def test_items_to_table_and_iter_query(self):
+        items = [{"user_id": f"u{i}", "nickname": f"用户{i}", "add_ts": i, "last_modify_ts": i} for i in range(25)]
+        self.assertEqual(await self.db.items_to_table("xhs_creator", items), 25)
+
+        rows = [row async for row in self.db.iter_query(
+            "SELECT user_id FROM xhs_creator WHERE add_ts >= %s ORDER BY add_ts", 5, batch_size=4)]
+        self.assertEqual([row["user_id"] for row in rows], [f"u{i}" for i in range(5, 25)])
@@ -0,0 +1,93 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : TestTieredCache 需要本地运行 redis（db_config 中的配置），连接不上时跳过
+
+import json
+import time
+import unittest
+
+from redis.exceptions import RedisError
+
+from cache.redis_cache import RedisCache
+from cache.tiered_cache import TieredCache, _TieredL1
+
+
+class TestTieredCache(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            RedisCache().redis_client.ping()
+        except RedisError:
+            self.skipTest("redis is not available")
+        # 模拟两个进程各自的二级缓存
+        self.worker_a = TieredCache(channel="test:cache:invalidate")
+        self.worker_b = TieredCache(channel="test:cache:invalidate")
+
+    def test_read_through_and_invalidate(self):
+        self.worker_a.set("tiered_key", {"v": 1}, 10)
+        self.assertEqual(self.worker_b.get("tiered_key"), {"v": 1})
+        self.assertEqual(self.worker_b._l1.get("tiered_key"), {"v": 1})
+
+        self.worker_a.set("tiered_key", {"v": 2}, 10)
+        time.sleep(1.5)  # 等待订阅线程处理失效消息
+        self.assertIsNone(self.worker_b._l1.get("tiered_key"))
+        self.assertEqual(self.worker_b.get("tiered_key"), {"v": 2})
+
+        self.worker_a.delete(["tiered_key"])
+        time.sleep(1.5)
+        self.assertIsNone(self.worker_b.get("tiered_key"))
+
+    def tearDown(self):
+        self.worker_a.close()
+        self.worker_b.close()
+
+
+class TestTieredL1(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        # 本地缓存的定时清理任务运行在测试的事件循环中
+        self.l1 = _TieredL1(l1_max_entries=100, l1_ttl=10, channel="test:cache:invalidate")
+
+    async def test_fill_skips_keys_invalidated_during_read(self):
+        versions = self.l1._begin_fill(["a", "b"])
+        # 从 L2 读取期间其他进程写入了 a 的新值
+        self.l1._on_invalidate(json.dumps({"origin": "other", "keys": ["a"]}))
+        found = self.l1._fill_from_l2(["a", "b"], [("old", 10), ("b", 10)], versions)
+        self.l1._end_fill(["a", "b"])
+        self.assertEqual(found, {"a": "old", "b": "b"})
+        self.assertIsNone(self.l1._l1.get("a"))
+        self.assertEqual(self.l1._l1.get("b"), "b")
+        # 读取结束后不再保留版本
+        self.assertEqual((self.l1._inflight, self.l1._versions), ({}, {}))
+
+    async def test_keys_cache(self):
+        keys, generation = self.l1._l1_keys("ip_*")
+        self.assertIsNone(keys)
+        self.l1._l1_store_keys("ip_*", ["ip_1"], generation)
+        self.assertEqual(self.l1._l1_keys("ip_*")[0], ["ip_1"])
+
+        # 匹配的键被写入后丢弃缓存的结果，不匹配的键不影响
+        self.l1._l1_set_many([("other_1", 1, 10)])
+        self.assertEqual(self.l1._l1_keys("ip_*")[0], ["ip_1"])
+        self.l1._on_invalidate(json.dumps({"origin": "other", "keys": ["ip_2"]}))
+        self.assertIsNone(self.l1._l1_keys("ip_*")[0])
+
+        # 查询期间有键被修改时不缓存查询结果
+        _, generation = self.l1._l1_keys("ip_*")
+        self.l1._l1_delete_many(["ip_1"])
+        self.l1._l1_store_keys("ip_*", ["ip_1", "ip_2"], generation)
+        self.assertIsNone(self.l1._l1_keys("ip_*")[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+
+from typing import Dict, List
+from unittest import IsolatedAsyncioTestCase
+
+from base.base_crawler import AbstractStore
+from store.write_behind import WriteBehindError, WriteBehindStore
+
+
+class MemoryStore(AbstractStore):
+    def __init__(self):
+        self.batches: List[List[Dict]] = []
+        self.creators: List[Dict] = []
+        self.opened = False
+        self.closed = False
+
+    async def open(self):
+        self.opened = True
+
+    async def store_content(self, content_item: Dict):
+        self.batches.append([content_item])
+
+    async def store_comment(self, comment_item: Dict):
+        self.batches.append([comment_item])
+
+    async def store_comments(self, comment_items: List[Dict]):
+        self.batches.append(comment_items)
+
+    async def store_creator(self, creator: Dict):
+        self.creators.append(creator)
+
+    async def close(self):
+        self.closed = True
+
+
+class TestWriteBehindStore(IsolatedAsyncioTestCase):
+
+    async def test_batch_and_close(self):
+        memory_store = MemoryStore()
+        store = WriteBehindStore(memory_store, queue_size=4, batch_size=3, flush_interval=60)
+        await store.store_comments([{"comment_id": i} for i in range(7)])
+        await store.store_creator({"user_id": "1"})
+        await store.close()
+
+        self.assertEqual([len(batch) for batch in memory_store.batches], [3, 3, 1])
+        self.assertEqual(memory_store.creators, [{"user_id": "1"}])
+        self.assertTrue(memory_store.closed)
+
+    async def test_keep_failed_batches(self):
+        class FlakyStore(MemoryStore):
+            def __init__(self):
+                super().__init__()
+                self.fail = True
+
+            async def store_comments(self, comment_items: List[Dict]):
+                if self.fail:
+                    raise IOError("disk full")
+                await super().store_comments(comment_items)
+
+        flaky_store = FlakyStore()
+        store = WriteBehindStore(flaky_store, queue_size=10, batch_size=2, flush_interval=60, max_retry_delay=0.05)
+        await store.store_comments([{"comment_id": i} for i in range(3)])
+        with self.assertRaises(WriteBehindError):
+            await store.close()
+        self.assertEqual(flaky_store.batches, [])
+        self.assertTrue(flaky_store.closed)
+
+        # 存储恢复后，失败的数据在下次写入时重试
+        flaky_store = FlakyStore()
+        store = WriteBehindStore(flaky_store, queue_size=10, batch_size=2, flush_interval=60, max_retry_delay=0.05)
+        await store.store_comments([{"comment_id": i} for i in range(2)])
+        # 写入失败时 flush 报错，不会在数据没有写入时返回
+        with self.assertRaises(WriteBehindError):
+            await store.flush()
+        flaky_store.fail = False
+        await store.store_comment({"comment_id": 2})
+        await store.close()
+        self.assertEqual([item["comment_id"] for batch in flaky_store.batches for item in batch], [0, 1, 2])
+
+    async def test_open_before_first_write(self):
+        memory_store = MemoryStore()
+        store = WriteBehindStore(memory_store, queue_size=4, batch_size=3, flush_interval=60)
+        await store.open()
+        self.assertTrue(memory_store.opened)
+        await store.flush()
+        await store.close()
+        self.assertTrue(memory_store.closed)
@@ -0,0 +1,205 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 异步并发相关的工具：平台级请求限速、限制并发数的 gather、预取下一页的异步迭代器、并发任务进度汇报
+
+import asyncio
+import time
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Dict, List, Optional, TypeVar
+
+import config
+from tools import utils
+
+T = TypeVar("T")
+
+
+class AsyncRateLimiter:
+    """
+    令牌桶限速器，同一个平台的所有请求共享，max_rate <= 0 表示不限速
+    """
+
+    def __init__(self, max_rate: float, burst: int = 1):
+        self.max_rate = max_rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last_refill = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        if self._last_refill:
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.max_rate)
+        self._last_refill = now
+
+    async def acquire(self):
+        """
+        获取一个令牌，令牌不足时等待
+        :return:
+        """
+        if self.max_rate <= 0:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            self._refill(loop.time())
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.max_rate)
+                self._refill(loop.time())
+            self._tokens -= 1
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_platform_rate_limiters: Dict[str, AsyncRateLimiter] = {}
+
+
+def get_platform_max_rate(platform: str = "") -> float:
+    """
+    平台的每秒请求数，config.PLATFORM_MAX_REQUESTS_PER_SEC 为 None 时取该平台的默认限速
+    :param platform: 平台名称，默认取 config.PLATFORM
+    :return: 0 表示不限速
+    """
+    if config.PLATFORM_MAX_REQUESTS_PER_SEC is not None:
+        return config.PLATFORM_MAX_REQUESTS_PER_SEC
+    return config.PLATFORM_DEFAULT_MAX_REQUESTS_PER_SEC.get(platform or config.PLATFORM, 1)
+
+
+def sub_comment_concurrency(platform: str = "") -> int:
+    """
+    二级评论展开的并发数，平台不限速时不并发展开，避免并发请求没有任何节制
+    :param platform: 平台名称，默认取 config.PLATFORM
+    :return:
+    """
+    if get_platform_max_rate(platform) <= 0:
+        return 1
+    return config.MAX_SUB_COMMENT_CONCURRENCY_NUM
+
+
+def get_platform_rate_limiter(platform: str = "") -> AsyncRateLimiter:
+    """
+    获取平台共享的限速器，限速值见 get_platform_max_rate
+    :param platform: 平台名称，默认取 config.PLATFORM
+    :return:
+    """
+    platform = platform or config.PLATFORM
+    if platform not in _platform_rate_limiters:
+        _platform_rate_limiters[platform] = AsyncRateLimiter(
+            max_rate=get_platform_max_rate(platform),
+            burst=config.PLATFORM_REQUESTS_BURST,
+        )
+    return _platform_rate_limiters[platform]
+
+
+async def gather_with_concurrency(concurrency: int, *aws: Awaitable) -> List[Any]:
+    """
+    限制同时运行数量的 asyncio.gather，返回结果的顺序与传入顺序一致
+    :param concurrency: 最大并发数
+    :param aws: 协程列表
+    :return:
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _run(aw: Awaitable) -> Any:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(_run(aw) for aw in aws))
+
+
+async def prefetch_iter(source: AsyncIterator[T], buffer_size: int = 1) -> AsyncGenerator[T, None]:
+    """
+    在后台任务中提前拉取 source 的后续元素，消费者处理当前元素的同时生产者已经在请求下一页，
+    缓冲区有上限，消费者处理不过来时生产者会阻塞等待，内存占用保持恒定
+    :param source: 异步迭代器，例如按页返回数据的分页生成器
+    :param buffer_size: 最多提前拉取的元素个数
+    :return:
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, buffer_size))
+    finished = object()
+
+    async def _produce():
+        try:
+            async for item in source:
+                await queue.put((item, None))
+            await queue.put((finished, None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            await queue.put((finished, ex))
+
+    producer = asyncio.create_task(_produce())
+    try:
+        while True:
+            item, error = await queue.get()
+            if error is not None:
+                raise error
+            if item is finished:
+                break
+            yield item
+    finally:
+        if not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+
+
+class CrawlProgress:
+    """
+    并发任务（例如多个创作者）的进度汇报，每个任务开始和结束时输出完成数、失败数、耗时和预估剩余时间
+    """
+
+    def __init__(self, name: str, total: int):
+        self.name = name
+        self.total = total
+        self.finished = 0
+        self.failed = 0
+        self.running = 0
+        self._start_time = time.monotonic()
+
+    def _eta(self) -> str:
+        if not self.finished:
+            return "unknown"
+        elapsed = time.monotonic() - self._start_time
+        remaining = elapsed / self.finished * (self.total - self.finished)
+        return f"{remaining:.0f}s"
+
+    async def track(self, key: str, aw: Awaitable[T]) -> Optional[T]:
+        """
+        执行单个任务并汇报进度，任务异常只记录日志不向上抛出，避免一个任务失败影响其他任务
+        :param key: 任务标识，例如创作者ID
+        :param aw: 任务协程
+        :return: 任务结果，异常时返回 None
+        """
+        self.running += 1
+        task_start_time = time.monotonic()
+        utils.logger.info(f"[{self.name}] Begin {key} ({self.finished}/{self.total} done, {self.running} running)")
+        result, success = None, True
+        try:
+            result = await aw
+        except Exception as ex:
+            success = False
+            utils.logger.error(f"[{self.name}] {key} failed, err: {ex}")
+        finally:
+            self.running -= 1
+            self.finished += 1
+            if not success:
+                self.failed += 1
+        utils.logger.info(
+            f"[{self.name}] {'Finished' if success else 'Failed'} {key} in {time.monotonic() - task_start_time:.1f}s "
+            f"({self.finished}/{self.total} done, {self.failed} failed, {self.running} running, eta: {self._eta()})"
+        )
+        return result
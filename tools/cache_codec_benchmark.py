@@ -0,0 +1,76 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 缓存编解码性能测试，分别用代理IP信息（小）和评论列表（大）测试各序列化方式的编码、解码速度和每条数据占用的字节数
+#            用法：python -m tools.cache_codec_benchmark --count 20000
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache.codec import CacheCodec
+
+SERIALIZERS = ["pickle", "json", "msgpack"]
+
+
+def make_values() -> Dict[str, Any]:
+    ip_info = {"ip": "127.0.0.1", "port": 8000, "user": "bench_user", "password": "bench_pwd",
+               "protocol": "https://", "expired_time_ts": 1735660800}
+    comments = [{
+        "comment_id": f"bench_comment_{i}",
+        "content": f"模拟评论内容 {i}，用于测试不同序列化方式的编码速度和数据大小",
+        "user_id": f"bench_user_{i}",
+        "nickname": f"用户{i}",
+        "like_count": i,
+    } for i in range(50)]
+    return {"ip_info": ip_info, "comments": comments}
+
+
+def bench_codec(codec: CacheCodec, value: Any, count: int) -> List[float]:
+    """
+    :return: [每秒编码次数, 每秒解码次数, 编码后字节数]
+    """
+    start = time.perf_counter()
+    for _ in range(count):
+        data = codec.encode(value)
+    encode_per_sec = count / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in range(count):
+        codec.decode(data)
+    decode_per_sec = count / (time.perf_counter() - start)
+    return [encode_per_sec, decode_per_sec, len(data)]
+
+
+def main(count: int, compress_threshold: int, serializers: List[str]):
+    for name, value in make_values().items():
+        print(f"{name}:")
+        for serializer in serializers:
+            if serializer == "msgpack" and importlib.util.find_spec("msgpack") is None:
+                print(f"{serializer:>8}: skipped, msgpack is not installed")
+                continue
+            codec = CacheCodec(serializer, compress_threshold=compress_threshold)
+            encode_per_sec, decode_per_sec, size = bench_codec(codec, value, count)
+            print(f"{serializer:>8}: encode {encode_per_sec:,.0f}/s, decode {decode_per_sec:,.0f}/s, {size} bytes")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="MediaCrawler cache codec benchmark")
+    parser.add_argument("--count", type=int, default=20000, help="encode/decode times per value")
+    parser.add_argument("--compress_threshold", type=int, default=1024, help="compress values larger than this, 0 to disable")
+    parser.add_argument("--serializers", type=str, default=",".join(SERIALIZERS), help="serializers to test, comma separated")
+    args = parser.parse_args()
+    main(args.count, args.compress_threshold, args.serializers.split(","))
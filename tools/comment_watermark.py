@@ -0,0 +1,191 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 评论增量爬取水位线，记录每个内容已爬取到的最新评论ID/时间以及最后的翻页游标
+
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+import config
+from tools import utils
+
+
+class CommentWatermark(BaseModel):
+    content_id: str = Field(title="内容ID（帖子/视频/回答）")
+    newest_comment_id: str = Field(default="", title="已爬取到的最新一条评论ID")
+    newest_create_time: int = Field(default=0, title="已爬取到的最新一条评论发布时间")
+    last_cursor: str = Field(default="", title="最后一次爬取的翻页游标")
+    pending_comment_id: str = Field(default="", title="提前停止的爬取看到的最新一条评论ID，补齐缺失的评论后成为新的水位线")
+    pending_create_time: int = Field(default=0, title="提前停止的爬取看到的最新一条评论发布时间")
+    comment_count: int = Field(default=0, title="累计爬取到的评论数量")
+    last_modify_ts: int = Field(default=0, title="水位线更新时间")
+
+
+class CommentWatermarkStore:
+    """
+    按平台保存评论水位线，文件与爬取数据放在一起：data/{platform}/comment_watermark.json
+    """
+
+    def __init__(self, platform: str, save_dir: str = ""):
+        self.platform = platform
+        self.save_dir = save_dir or os.path.join("data", platform)
+        self.file_path = os.path.join(self.save_dir, "comment_watermark.json")
+        self._watermarks: Dict[str, CommentWatermark] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                for content_id, item in json.load(f).items():
+                    self._watermarks[content_id] = CommentWatermark(**item)
+        except Exception as ex:
+            utils.logger.error(f"[CommentWatermarkStore._load] load comment watermark failed, err: {ex}")
+
+    def get(self, content_id: str) -> Optional[CommentWatermark]:
+        return self._watermarks.get(str(content_id))
+
+    def update(self, content_id: str, newest_comment_id: Optional[str] = None,
+               newest_create_time: Optional[int] = None, last_cursor: Optional[str] = None,
+               new_comment_count: int = 0):
+        """
+        更新内容的评论水位线，未传入的字段保持不变
+        Args:
+            content_id: 内容ID
+            newest_comment_id: 最新一条评论ID
+            newest_create_time: 最新一条评论发布时间
+            last_cursor: 最后一次爬取的翻页游标
+            new_comment_count: 本次新爬取到的评论数量
+
+        Returns:
+
+        """
+        content_id = str(content_id)
+        watermark = self._watermarks.get(content_id) or CommentWatermark(content_id=content_id)
+        if newest_comment_id is not None:
+            watermark.newest_comment_id = str(newest_comment_id)
+        if newest_create_time is not None:
+            watermark.newest_create_time = int(newest_create_time or 0)
+        if last_cursor is not None:
+            watermark.last_cursor = str(last_cursor)
+        watermark.comment_count += new_comment_count
+        watermark.last_modify_ts = utils.get_current_timestamp()
+        self._watermarks[content_id] = watermark
+
+    def resume_cursor(self, content_id: str) -> str:
+        """
+        上次爬取提前停止时返回停止处的翻页游标，本次从游标处继续爬取到水位线之间缺失的评论
+        Args:
+            content_id: 内容ID
+
+        Returns:
+            不需要继续上次的爬取时返回空字符串
+        """
+        watermark = self.get(content_id)
+        if watermark is None or not watermark.pending_comment_id:
+            return ""
+        return watermark.last_cursor
+
+    def finish(self, content_id: str, newest_comment_id: Optional[str], newest_create_time: Optional[int],
+               cursor: Optional[str], completed: bool, new_comment_count: int = 0):
+        """
+        一次评论爬取结束后更新水位线：到达上次的水位线或已经翻到最后一页时，水位线前进到看到的最新评论；
+        因为数量限制等原因提前停止时保留原来的水位线，记下最新评论和停止处的游标，下次从游标处继续爬取，
+        避免水位线跳过中间还没有爬取的评论
+        Args:
+            content_id: 内容ID
+            newest_comment_id: 本次爬取看到的最新一条评论ID，没有评论时为 None
+            newest_create_time: 本次爬取看到的最新一条评论发布时间
+            cursor: 下次继续爬取的翻页游标
+            completed: 是否到达水位线或已经翻到最后一页
+            new_comment_count: 本次新爬取到的评论数量
+
+        Returns:
+
+        """
+        content_id = str(content_id)
+        watermark = self._watermarks.get(content_id)
+        if watermark is not None and watermark.pending_comment_id:
+            # 继续上次提前停止的爬取，本次看到的评论都比上次的最新评论早
+            newest_comment_id, newest_create_time = watermark.pending_comment_id, watermark.pending_create_time
+        if completed:
+            self.update(content_id, newest_comment_id=newest_comment_id, newest_create_time=newest_create_time,
+                        last_cursor="", new_comment_count=new_comment_count)
+            self._watermarks[content_id].pending_comment_id = ""
+            self._watermarks[content_id].pending_create_time = 0
+            return
+        self.update(content_id, last_cursor=cursor, new_comment_count=new_comment_count)
+        if newest_comment_id is not None:
+            self._watermarks[content_id].pending_comment_id = str(newest_comment_id)
+            self._watermarks[content_id].pending_create_time = int(newest_create_time or 0)
+
+    def save(self):
+        os.makedirs(self.save_dir, exist_ok=True)
+        tmp_path = self.file_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({k: v.model_dump() for k, v in self._watermarks.items()}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.file_path)
+
+
+def filter_new_comments(comments: List[Any], watermark: Optional[CommentWatermark],
+                        get_comment_id: Callable[[Any], str],
+                        get_create_time: Callable[[Any], int]) -> Tuple[List[Any], bool]:
+    """
+    过滤按最新排序的一页评论，遇到已经爬取过的评论即停止
+    Args:
+        comments: 按发布时间倒序排列的评论列表
+        watermark: 内容的评论水位线，为空表示首次爬取
+        get_comment_id: 获取评论ID的函数
+        get_create_time: 获取评论发布时间的函数
+
+    Returns:
+        (新评论列表, 是否已到达水位线)
+    """
+    if not watermark or not watermark.newest_comment_id:
+        return comments, False
+    new_comments = []
+    for comment in comments:
+        if str(get_comment_id(comment)) == watermark.newest_comment_id or \
+                int(get_create_time(comment) or 0) < watermark.newest_create_time:
+            return new_comments, True
+        new_comments.append(comment)
+    return new_comments, False
+
+
+_watermark_stores: Dict[str, CommentWatermarkStore] = {}
+
+
+def get_comment_watermark_store(platform: str = "") -> Optional[CommentWatermarkStore]:
+    """
+    获取平台对应的评论水位线存储，未开启 ENABLE_INCREMENTAL_COMMENTS 时返回 None
+    :param platform: 平台名称，默认取 config.PLATFORM
+    :return:
+    """
+    if not config.ENABLE_INCREMENTAL_COMMENTS:
+        return None
+    platform = platform or config.PLATFORM
+    if platform not in _watermark_stores:
+        _watermark_stores[platform] = CommentWatermarkStore(platform)
+    return _watermark_stores[platform]
+
+
+def save_all_comment_watermarks():
+    for watermark_store in _watermark_stores.values():
+        try:
+            watermark_store.save()
+        except Exception as ex:
+            utils.logger.error(
+                f"[save_all_comment_watermarks] save {watermark_store.platform} comment watermark failed, err: {ex}")
@@ -0,0 +1,233 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : HTTP 请求录制/回放（cassette），录制模式下保存各平台客户端的请求和响应，回放模式下不访问网络直接返回录制的响应，
+#            用于离线的吞吐量测试和回归测试；请求按方法、规范化后的 URL 和请求体匹配，忽略签名参数
+#            查看录制文件：python -m tools.http_cassette data/cassettes/xhs.jsonl.gz
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+import config
+from tools import utils
+from tools.response_cache import VOLATILE_PARAMS, canonicalize_params
+
+CASSETTE_MODE_RECORD = "record"
+CASSETTE_MODE_REPLAY = "replay"
+
+# 录制/回放匹配请求时忽略的参数（按小写比较）：签名、风控参数之外，还有每次请求随机生成的 ID 和时间戳，
+# 例如小红书搜索的 search_id、抖音的 webid、贴吧的 _；这些参数不影响响应内容，但会让回放时匹配不到录制的请求
+CASSETTE_VOLATILE_PARAMS = frozenset(VOLATILE_PARAMS | {"search_id", "webid", "_"})
+
+# 响应体保存的是解压后的内容，这些响应头不再适用
+_SKIP_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CassetteMissError(Exception):
+    """回放模式下没有找到匹配的录制请求"""
+
+
+def _normalize_body(content: bytes, content_type: str) -> str:
+    if not content:
+        return ""
+    if "json" in content_type or content[:1] in (b"{", b"["):
+        try:
+            return json.dumps(canonicalize_params(json.loads(content), CASSETTE_VOLATILE_PARAMS), ensure_ascii=False, sort_keys=True)
+        except ValueError:
+            pass
+    if "x-www-form-urlencoded" in content_type:
+        return urlencode(sorted(canonicalize_params(dict(parse_qsl(content.decode("utf-8", "ignore"))),
+                                                 CASSETTE_VOLATILE_PARAMS).items()))
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def request_match_key(method: str, url: str, content: bytes = b"", content_type: str = "") -> str:
+    """
+    请求的匹配键：方法 + 查询参数排序并去掉签名参数、随机参数后的 URL + 规范化的请求体
+    :param method:
+    :param url:
+    :param content: 请求体
+    :param content_type: 请求体类型
+    :return:
+    """
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k.lower() not in CASSETTE_VOLATILE_PARAMS]
+    normalized_url = urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(query)), ""))
+    body = _normalize_body(content, content_type)
+    if len(body) > 64:
+        body = hashlib.blake2b(body.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{method.upper()} {normalized_url} {body}".rstrip()
+
+
+class Cassette:
+    """
+    一个平台的录制文件，gzip 压缩的 JSON Lines，每行一个请求的响应；
+    同一个请求录制了多次时按顺序回放，回放完后重复返回最后一次的响应
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, List[Dict]] = {}
+        self._replay_index: Dict[str, int] = {}
+        # 本次录制过的请求，重新录制时覆盖文件中之前的响应
+        self._recorded_keys = set()
+        self._dirty = False
+        if os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["key"], []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def record(self, key: str, request: httpx.Request, response: httpx.Response, elapsed: float):
+        content = response.content
+        try:
+            body = {"text": content.decode("utf-8")}
+        except UnicodeDecodeError:
+            body = {"base64": base64.b64encode(content).decode("ascii")}
+        entry = {
+            "key": key,
+            "method": request.method,
+            "url": str(request.url),
+            "status": response.status_code,
+            "headers": [[k, v] for k, v in response.headers.items() if k.lower() not in _SKIP_RESPONSE_HEADERS],
+            "elapsed_ms": round(elapsed * 1000, 1),
+            **body,
+        }
+        if key not in self._recorded_keys:
+            self._recorded_keys.add(key)
+            self._entries[key] = []
+        self._entries[key].append(entry)
+        self._dirty = True
+
+    def replay(self, key: str) -> Optional[Dict]:
+        entries = self._entries.get(key)
+        if not entries:
+            return None
+        index = self._replay_index.get(key, 0)
+        self._replay_index[key] = index + 1
+        return entries[min(index, len(entries) - 1)]
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            for entries in self._entries.values():
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        utils.logger.info(f"[Cassette.save] saved {len(self)} responses to {self.path}")
+
+
+def _response_from_entry(entry: Dict, request: httpx.Request) -> httpx.Response:
+    content = entry["text"].encode("utf-8") if "text" in entry else base64.b64decode(entry["base64"])
+    return httpx.Response(entry["status"], headers=entry["headers"], content=content, request=request)
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """
+    httpx 的传输层：录制模式下通过实际的传输层发送请求并保存响应，回放模式下直接返回录制的响应
+    """
+
+    def __init__(self, cassette: Cassette, mode: str, inner: Optional[httpx.AsyncBaseTransport] = None,
+                 replay_latency: float = 0):
+        """
+        :param cassette: 录制文件
+        :param mode: record 或 replay
+        :param inner: 录制模式下实际发送请求的传输层
+        :param replay_latency: 回放时模拟的每个请求的耗时（秒），-1 表示按录制时的耗时
+        """
+        self.cassette = cassette
+        self.mode = mode
+        self.inner = inner or httpx.AsyncHTTPTransport()
+        self.replay_latency = replay_latency
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        content = await request.aread()
+        key = request_match_key(request.method, str(request.url), content, request.headers.get("content-type", ""))
+        if self.mode == CASSETTE_MODE_REPLAY:
+            entry = self.cassette.replay(key)
+            if entry is None:
+                raise CassetteMissError(f"no recorded response for {key}")
+            latency = entry.get("elapsed_ms", 0) / 1000 if self.replay_latency < 0 else self.replay_latency
+            if latency > 0:
+                await asyncio.sleep(latency)
+            return _response_from_entry(entry, request)
+
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        try:
+            # 读取并解压响应体，录制和返回的都是解压后的内容
+            await response.aread()
+        finally:
+            await response.aclose()
+        elapsed = time.perf_counter() - start
+        decoded = httpx.Response(response.status_code, content=response.content, request=request,
+                                 headers=[(k, v) for k, v in response.headers.items()
+                                          if k.lower() not in _SKIP_RESPONSE_HEADERS])
+        self.cassette.record(key, request, decoded, elapsed)
+        return decoded
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+_cassettes: Dict[str, Cassette] = {}
+
+
+def get_cassette(platform: str = "") -> Cassette:
+    """
+    获取平台的录制文件，路径为 {HTTP_CASSETTE_DIR}/{platform}.jsonl.gz
+    :param platform: 平台名称，默认取 config.PLATFORM
+    :return:
+    """
+    platform = platform or config.PLATFORM
+    if platform not in _cassettes:
+        _cassettes[platform] = Cassette(os.path.join(config.HTTP_CASSETTE_DIR, f"{platform}.jsonl.gz"))
+    return _cassettes[platform]
+
+
+def save_all_cassettes():
+    """
+    保存录制模式下所有平台的录制文件
+    :return:
+    """
+    for cassette in _cassettes.values():
+        try:
+            cassette.save()
+        except Exception as ex:
+            utils.logger.error(f"[save_all_cassettes] save {cassette.path} failed, err: {ex}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m tools.http_cassette data/cassettes/xhs.jsonl.gz")
+    cassette = Cassette(sys.argv[1])
+    print(f"{sys.argv[1]}: {len(cassette)} responses, {len(cassette._entries)} distinct requests, "
+          f"{os.path.getsize(sys.argv[1])} bytes")
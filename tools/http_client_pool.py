@@ -0,0 +1,162 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 按代理复用的 httpx 客户端池，同一个代理的请求共用一个客户端（及其连接池），
+#            轮换代理时不需要重新创建客户端和建立连接；超出容量时关闭最久未使用的客户端。
+#            客户端由 create_async_client 创建，按配置组合代理健康度统计、录制/回放的传输层
+
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Union
+
+import httpx
+
+import config
+from proxy.proxy_health import ProxyHealthTransport, proxy_key_from_proxies
+from tools import utils
+from tools.http_cassette import CASSETTE_MODE_RECORD, CASSETTE_MODE_REPLAY, CassetteTransport, get_cassette
+
+
+def _proxy_url(proxies: Union[str, Dict, None]) -> Optional[str]:
+    if isinstance(proxies, dict):
+        return next(iter(proxies.values()), None)
+    return proxies
+
+
+def create_async_client(proxies: Union[str, Dict, None] = None, **kwargs) -> httpx.AsyncClient:
+    """
+    创建平台客户端使用的 httpx.AsyncClient：使用代理时请求结果记录到代理健康度统计中，
+    开启 HTTP_CASSETTE_MODE 时外层使用录制/回放的传输层（回放不发出请求，不记录健康度）
+    :param proxies: 代理，与 httpx.AsyncClient 的 proxies 参数相同
+    :param kwargs: httpx.AsyncClient 的其他参数
+    :return:
+    """
+    cassette_mode = config.HTTP_CASSETTE_MODE in (CASSETTE_MODE_RECORD, CASSETTE_MODE_REPLAY)
+    proxy_url = _proxy_url(proxies)
+    key = proxy_key_from_proxies(proxy_url)
+    if not cassette_mode and key is None:
+        return httpx.AsyncClient(proxies=proxies, **kwargs)
+    inner = httpx.AsyncHTTPTransport(proxy=httpx.Proxy(proxy_url) if proxy_url else None)
+    if key is not None:
+        inner = ProxyHealthTransport(inner, key)
+    if not cassette_mode:
+        return httpx.AsyncClient(transport=inner, **kwargs)
+    transport = CassetteTransport(get_cassette(), config.HTTP_CASSETTE_MODE, inner=inner,
+                                  replay_latency=config.HTTP_CASSETTE_REPLAY_LATENCY)
+    return httpx.AsyncClient(transport=transport, **kwargs)
+
+
+class _PooledClient:
+    __slots__ = ("client", "in_use", "evicted")
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        # 正在使用该客户端的请求数，被淘汰时等所有请求结束后再关闭
+        self.in_use = 0
+        self.evicted = False
+
+
+def _client_key(proxies: Union[str, Dict, None]) -> str:
+    if isinstance(proxies, dict):
+        proxies = next(iter(proxies.values()), None)
+    return proxies or ""
+
+
+class HttpClientPool:
+    """
+    以代理地址为键的 LRU 客户端池，不使用代理的请求共用一个客户端
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        """
+        :param max_size: 最多保留的客户端数量，默认取 config.HTTP_CLIENT_POOL_SIZE
+        """
+        self.max_size = max(1, config.HTTP_CLIENT_POOL_SIZE if max_size is None else max_size)
+        self._clients: "OrderedDict[str, _PooledClient]" = OrderedDict()
+        self._created = 0
+        self._hits = 0
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    @asynccontextmanager
+    async def client(self, proxies: Union[str, Dict, None] = None) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        获取代理对应的客户端，退出时不关闭客户端
+        :param proxies: 代理，与 httpx.AsyncClient 的 proxies 参数相同
+        :return:
+        """
+        key = _client_key(proxies)
+        entry = self._clients.get(key)
+        if entry is None:
+            entry = self._clients[key] = _PooledClient(create_async_client(proxies=proxies))
+            self._created += 1
+        else:
+            self._clients.move_to_end(key)
+            self._hits += 1
+        entry.in_use += 1
+        try:
+            await self._evict()
+            yield entry.client
+        finally:
+            entry.in_use -= 1
+            if entry.evicted and entry.in_use == 0:
+                await entry.client.aclose()
+
+    async def _evict(self):
+        while len(self._clients) > self.max_size:
+            _, entry = self._clients.popitem(last=False)
+            entry.evicted = True
+            if entry.in_use == 0:
+                await entry.client.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        客户端数量、创建次数和复用次数
+        :return:
+        """
+        return {"size": len(self._clients), "created": self._created, "hits": self._hits}
+
+    async def close(self):
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for entry in clients:
+            try:
+                await entry.client.aclose()
+            except Exception as ex:
+                utils.logger.error(f"[HttpClientPool.close] close client err: {ex}")
+
+
+_http_client_pool: Optional[HttpClientPool] = None
+
+
+def get_http_client_pool() -> HttpClientPool:
+    global _http_client_pool
+    if _http_client_pool is None:
+        _http_client_pool = HttpClientPool()
+    return _http_client_pool
+
+
+def pooled_client(proxies: Union[str, Dict, None] = None):
+    """
+    从全局客户端池中获取代理对应的客户端，用法：async with pooled_client(proxies) as client
+    :param proxies:
+    :return:
+    """
+    return get_http_client_pool().client(proxies)
+
+
+async def close_http_client_pool():
+    global _http_client_pool
+    if _http_client_pool is not None:
+        await _http_client_pool.close()
+        _http_client_pool = None
@@ -0,0 +1,183 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 记录内容指纹索引，按业务ID保存每条记录最后一次写入的内容哈希，内容没有变化的记录跳过写入
+
+import hashlib
+import json
+import os
+from array import array
+from typing import Dict, Optional
+
+import config
+from tools import utils
+
+# 每次存储都会变化的字段，不参与指纹计算
+FINGERPRINT_IGNORE_FIELDS = {"last_modify_ts", "add_ts"}
+
+# 各表记录的业务ID字段，按顺序取第一个有值的字段（内容ID：xhs、weibo、tieba 为 note_id，抖音为 aweme_id，
+# B站、快手为 video_id，知乎为 content_id）
+RECORD_ID_FIELDS = {
+    "contents": ("note_id", "aweme_id", "video_id", "content_id"),
+    "comments": ("comment_id",),
+    "creators": ("user_id",),
+}
+
+
+def _hash64(payload: str) -> int:
+    return int.from_bytes(hashlib.blake2b(payload.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def record_fingerprint(item: Dict) -> int:
+    """
+    计算一条记录的指纹，字段顺序不影响结果，忽略 last_modify_ts、add_ts 以及 config.FINGERPRINT_IGNORE_FIELDS
+    :param item: 存储前的记录
+    :return: 64 位指纹
+    """
+    ignore_fields = FINGERPRINT_IGNORE_FIELDS.union(config.FINGERPRINT_IGNORE_FIELDS)
+    payload = json.dumps({k: v for k, v in item.items() if k not in ignore_fields},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return _hash64(payload)
+
+
+def record_key(table: str, item: Dict) -> Optional[int]:
+    """
+    记录业务ID的 64 位哈希，作为指纹索引的键
+    :param table: 表名（contents、comments、creators）
+    :param item: 存储前的记录
+    :return: 没有业务ID时返回 None，这类记录不做指纹过滤
+    """
+    record_id = next((item[field] for field in RECORD_ID_FIELDS.get(table, ()) if item.get(field)), None)
+    if record_id is None:
+        return None
+    return _hash64(str(record_id))
+
+
+class RecordFingerprintIndex:
+    """
+    按平台和存储方式保存每条记录（业务ID）最后一次写入的指纹，每张表（contents、comments、creators）一个文件，
+    每条记录在磁盘上占 16 字节（业务ID哈希 + 指纹），记录内容变化后覆盖原来的指纹，文件大小与记录数成正比
+    """
+
+    def __init__(self, platform: str, save_dir: str = "", sink: str = ""):
+        """
+        :param platform: 平台名称
+        :param save_dir: 指纹文件目录，默认 data/{platform}/fingerprint/{sink}
+        :param sink: 存储方式，默认取 config.SAVE_DATA_OPTION，不同存储方式的指纹互不影响
+        """
+        self.platform = platform
+        self.sink = sink or config.SAVE_DATA_OPTION
+        self.save_dir = save_dir or os.path.join("data", platform, "fingerprint", self.sink)
+        self.fingerprints: Dict[str, Dict[int, int]] = {}
+        self.dirty: Dict[str, bool] = {}
+        self.written: Dict[str, int] = {}
+        self.skipped: Dict[str, int] = {}
+
+    def _file_path(self, table: str) -> str:
+        return os.path.join(self.save_dir, f"{table}.bin")
+
+    def _table(self, table: str) -> Dict[int, int]:
+        if table not in self.fingerprints:
+            pairs = array("Q")
+            file_path = self._file_path(table)
+            if os.path.exists(file_path):
+                try:
+                    with open(file_path, "rb") as f:
+                        pairs.frombytes(f.read())
+                except Exception as ex:
+                    utils.logger.error(f"[RecordFingerprintIndex._table] load {file_path} failed, err: {ex}")
+                    pairs = array("Q")
+            self.fingerprints[table] = dict(zip(pairs[0::2], pairs[1::2]))
+            self.dirty[table] = False
+            self.written[table] = 0
+            self.skipped[table] = 0
+        return self.fingerprints[table]
+
+    def is_unchanged(self, table: str, key: Optional[int], fingerprint: int) -> bool:
+        """
+        判断记录与该业务ID上次写入的内容是否相同，相同时计入跳过数
+        :param table: 表名（contents、comments、creators）
+        :param key: record_key 计算的业务ID哈希，为 None 时总是返回 False
+        :param fingerprint: 记录指纹
+        :return:
+        """
+        fingerprints = self._table(table)
+        if key is not None and fingerprints.get(key) == fingerprint:
+            self.skipped[table] += 1
+            return True
+        return False
+
+    def add(self, table: str, key: Optional[int], fingerprint: int):
+        """
+        记录写入成功后保存该业务ID最新的指纹
+        :param table: 表名（contents、comments、creators）
+        :param key: record_key 计算的业务ID哈希
+        :param fingerprint: 记录指纹
+        :return:
+        """
+        fingerprints = self._table(table)
+        self.written[table] += 1
+        if key is not None and fingerprints.get(key) != fingerprint:
+            fingerprints[key] = fingerprint
+            self.dirty[table] = True
+
+    def save(self):
+        """
+        重写有变化的表的指纹文件，并输出各表写入数和跳过数
+        :return:
+        """
+        os.makedirs(self.save_dir, exist_ok=True)
+        for table, fingerprints in self.fingerprints.items():
+            if self.dirty[table]:
+                pairs = array("Q")
+                for key, fingerprint in fingerprints.items():
+                    pairs.append(key)
+                    pairs.append(fingerprint)
+                file_path = self._file_path(table)
+                tmp_path = file_path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    pairs.tofile(f)
+                os.replace(tmp_path, file_path)
+                self.dirty[table] = False
+            utils.logger.info(
+                f"[RecordFingerprintIndex.save] {self.platform}/{self.sink} {table}: {self.written[table]} written, "
+                f"{self.skipped[table]} unchanged skipped, {len(fingerprints)} records")
+
+
+_fingerprint_indexes: Dict[str, RecordFingerprintIndex] = {}
+
+
+def get_fingerprint_index(platform: str = "") -> Optional[RecordFingerprintIndex]:
+    """
+    获取平台对应的指纹索引，未开启 ENABLE_RECORD_FINGERPRINT 时返回 None
+    :param platform: 平台名称，默认取 config.PLATFORM
+    :return:
+    """
+    if not config.ENABLE_RECORD_FINGERPRINT:
+        return None
+    platform = platform or config.PLATFORM
+    if platform not in _fingerprint_indexes:
+        _fingerprint_indexes[platform] = RecordFingerprintIndex(platform)
+    return _fingerprint_indexes[platform]
+
+
+def save_all_fingerprint_indexes():
+    """
+    持久化所有已创建的指纹索引
+    :return:
+    """
+    for fingerprint_index in _fingerprint_indexes.values():
+        try:
+            fingerprint_index.save()
+        except Exception as ex:
+            utils.logger.error(
+                f"[save_all_fingerprint_indexes] save {fingerprint_index.platform} fingerprint index failed, err: {ex}")
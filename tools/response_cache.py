@@ -0,0 +1,122 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 幂等详情接口的响应缓存，命中时跳过签名和网络请求
+
+import copy
+import functools
+import hashlib
+import inspect
+import json
+from typing import AbstractSet, Any, Callable, Dict, Optional
+
+import config
+from cache.abs_cache import AbstractAsyncCache
+from cache.cache_factory import CacheFactory
+from tools import utils
+
+RESPONSE_CACHE_KEY_PREFIX = "response_cache:"
+
+# 每次请求都会变化的签名、风控参数，不参与缓存键的计算（按小写比较）
+VOLATILE_PARAMS = {
+    "wts", "w_rid", "a_bogus", "x-bogus", "x-s", "x-t", "x-s-common", "mstoken", "verifyfp", "fp",
+    "xsec_token", "xsec_source",
+}
+
+
+def canonicalize_params(params: Any, volatile_params: AbstractSet[str] = VOLATILE_PARAMS) -> Any:
+    """
+    去掉签名参数，dict 按键排序，使参数顺序、签名不同的同一个请求得到相同的缓存键
+    :param params:
+    :param volatile_params: 需要去掉的参数名（小写），默认为签名、风控参数
+    :return:
+    """
+    if isinstance(params, dict):
+        return {str(k): canonicalize_params(v, volatile_params)
+                for k, v in sorted(params.items(), key=lambda item: str(item[0]))
+                if str(k).lower() not in volatile_params}
+    if isinstance(params, (list, tuple)):
+        return [canonicalize_params(v, volatile_params) for v in params]
+    return params
+
+
+def response_cache_key(endpoint: str, params: Dict) -> str:
+    """
+    :param endpoint: 接口名，如 xhs.get_note_by_id
+    :param params: 请求参数
+    :return:
+    """
+    payload = json.dumps(canonicalize_params(params), ensure_ascii=False, separators=(",", ":"), default=str)
+    return f"{RESPONSE_CACHE_KEY_PREFIX}{endpoint}:{hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()}"
+
+
+def response_cache_ttl(endpoint: str) -> int:
+    return config.RESPONSE_CACHE_TTLS.get(endpoint, config.RESPONSE_CACHE_DEFAULT_TTL)
+
+
+_response_cache: Optional[AbstractAsyncCache] = None
+
+
+def get_response_cache() -> AbstractAsyncCache:
+    """
+    获取响应缓存，缓存类型取自 config.RESPONSE_CACHE_TYPE
+    :return:
+    """
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = CacheFactory.create_async_cache(config.RESPONSE_CACHE_TYPE)
+    return _response_cache
+
+
+def cached_response(endpoint: str) -> Callable:
+    """
+    客户端详情接口的响应缓存装饰器，按接口名和方法参数缓存返回结果，未开启 ENABLE_RESPONSE_CACHE 时直接调用原方法；
+    空结果（风控、频率限制时返回的空数据）和异常不缓存，缓存读写失败时退回到直接请求
+    :param endpoint: 接口名，用于缓存键和 config.RESPONSE_CACHE_TTLS 中的过期时间
+    :return:
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            ttl = response_cache_ttl(endpoint)
+            if not config.ENABLE_RESPONSE_CACHE or ttl <= 0:
+                return await func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = {name: value for name, value in bound.arguments.items() if name != "self"}
+            key = response_cache_key(endpoint, params)
+            cache = get_response_cache()
+            try:
+                cached = await cache.get(key)
+            except Exception as ex:
+                utils.logger.error(f"[cached_response] get {endpoint} response cache failed, err: {ex}")
+                cached = None
+            if cached is not None:
+                utils.logger.info(f"[cached_response] {endpoint} hit response cache, params: {params}")
+                # 本地缓存返回的是同一个对象，复制后再返回，避免调用方修改缓存中的数据
+                return copy.deepcopy(cached)
+
+            result = await func(*args, **kwargs)
+            if result:
+                try:
+                    await cache.set(key, copy.deepcopy(result), ttl)
+                except Exception as ex:
+                    utils.logger.error(f"[cached_response] set {endpoint} response cache failed, err: {ex}")
+            return result
+
+        return wrapper
+
+    return decorator
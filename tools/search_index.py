@@ -0,0 +1,260 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 已爬取内容和评论的本地全文索引（SQLite FTS5 + jieba 分词），存储数据时增量更新
+#            用法：python -m tools.search_index 关键词 [--platform xhs] [--kind comment] [--limit 20]
+
+import argparse
+import asyncio
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+import jieba
+
+import config
+from tools import utils
+
+# 各平台内容ID字段（xhs、weibo、tieba 为 note_id，抖音为 aweme_id，B站、快手为 video_id，知乎为 content_id）
+CONTENT_ID_FIELDS = ("note_id", "aweme_id", "video_id", "content_id")
+# 内容正文字段，按顺序拼接，与标题相同的字段不重复索引
+CONTENT_BODY_FIELDS = ("desc", "content_text", "content")
+
+_CJK_CHAR_PATTERN = re.compile(r"([一-鿿])")
+_CJK_SPACE_PATTERN = re.compile(r"(?<=[一-鿿　-〿＀-￯\]]) (?=[一-鿿　-〿＀-￯\[])")
+
+
+def tokenize(text: str) -> str:
+    """
+    使用 jieba 搜索引擎模式分词，词之间用空格分隔后交给 FTS5 的 unicode61 分词器
+    :param text:
+    :return:
+    """
+    if not text:
+        return ""
+    return " ".join(token for token in jieba.cut_for_search(text) if token.strip())
+
+
+def split_chars(text: str) -> str:
+    """
+    中文按单字切分（英文、数字保持整词），用于兜底的子串匹配，避免同一个词在不同上下文中分词结果不一致时查不到
+    :param text:
+    :return:
+    """
+    if not text:
+        return ""
+    return " ".join(_CJK_CHAR_PATTERN.sub(r" \1 ", text).split())
+
+
+def detokenize(text: str) -> str:
+    """
+    去掉分词时在中文之间加入的空格，用于展示摘要
+    """
+    return _CJK_SPACE_PATTERN.sub("", text)
+
+
+def build_match_query(query: str) -> str:
+    """
+    将用户输入的查询转换为 FTS5 查询语句：标题/正文中命中所有分词，或者按单字切分的文本中包含整个查询（子串匹配）
+    :param query:
+    :return:
+    """
+    tokens = [token for token in jieba.cut(query) if token.strip()]
+    if not tokens:
+        return ""
+    token_query = " ".join('"%s"' % token.replace('"', '""') for token in tokens)
+    chars_query = '"%s"' % split_chars(query).replace('"', '""')
+    return "{title body} : (%s) OR chars : %s" % (token_query, chars_query)
+
+
+def content_document(platform: str, item: Dict) -> Optional[Dict]:
+    content_id = next((str(item[field]) for field in CONTENT_ID_FIELDS if item.get(field)), "")
+    if not content_id:
+        return None
+    title = item.get("title") or ""
+    bodies = []
+    for field in CONTENT_BODY_FIELDS:
+        value = item.get(field)
+        if value and value != title and value not in bodies:
+            bodies.append(value)
+    return {"platform": platform, "kind": "content", "record_id": content_id, "content_id": content_id,
+            "title": title, "body": "\n".join(bodies)}
+
+
+def comment_document(platform: str, item: Dict) -> Optional[Dict]:
+    comment_id = item.get("comment_id")
+    if not comment_id:
+        return None
+    content_id = next((str(item[field]) for field in CONTENT_ID_FIELDS if item.get(field)), "")
+    return {"platform": platform, "kind": "comment", "record_id": str(comment_id), "content_id": content_id,
+            "title": "", "body": item.get("content") or ""}
+
+
+class ContentSearchIndex:
+    """
+    全文索引，search_doc 表保存原文和记录ID，search_fts（FTS5）保存 jieba 分词后的标题、正文（用于相关度排序）
+    以及按单字切分的全文（用于子串匹配和摘要），两者 rowid 相同；同一条记录再次写入时替换原有的索引
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS search_doc (
+                id INTEGER PRIMARY KEY,
+                platform TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                content_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                body TEXT NOT NULL,
+                update_ts INTEGER NOT NULL,
+                UNIQUE (platform, kind, record_id)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(title, body, chars, tokenize='unicode61');
+        """)
+
+    def add_documents(self, documents: List[Dict]) -> int:
+        """
+        批量写入或替换索引，所有记录在同一个事务中写入
+        :param documents: content_document / comment_document 生成的记录
+        :return: 写入的记录数
+        """
+        if not documents:
+            return 0
+        update_ts = utils.get_current_timestamp()
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN")
+            try:
+                for doc in documents:
+                    row = conn.execute("SELECT id FROM search_doc WHERE platform = ? AND kind = ? AND record_id = ?",
+                                       (doc["platform"], doc["kind"], doc["record_id"])).fetchone()
+                    if row:
+                        doc_id = row["id"]
+                        conn.execute("UPDATE search_doc SET content_id = ?, title = ?, body = ?, update_ts = ? "
+                                     "WHERE id = ?", (doc["content_id"], doc["title"], doc["body"], update_ts, doc_id))
+                        conn.execute("DELETE FROM search_fts WHERE rowid = ?", (doc_id,))
+                    else:
+                        doc_id = conn.execute(
+                            "INSERT INTO search_doc (platform, kind, record_id, content_id, title, body, update_ts) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (doc["platform"], doc["kind"], doc["record_id"], doc["content_id"], doc["title"],
+                             doc["body"], update_ts)).lastrowid
+                    conn.execute("INSERT INTO search_fts (rowid, title, body, chars) VALUES (?, ?, ?, ?)",
+                                 (doc_id, tokenize(doc["title"]), tokenize(doc["body"]),
+                                  split_chars(doc["title"] + "\n" + doc["body"])))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return len(documents)
+
+    def search(self, query: str, platform: str = "", kind: str = "", limit: int = 20) -> List[Dict]:
+        """
+        全文检索，按相关度排序
+        :param query: 查询文本
+        :param platform: 只查询指定平台
+        :param kind: 只查询 content 或 comment
+        :param limit: 返回条数
+        :return: [{platform, kind, record_id, content_id, title, snippet, score}]
+        """
+        match_query = build_match_query(query)
+        if not match_query:
+            return []
+        sql = ("SELECT d.platform, d.kind, d.record_id, d.content_id, d.title, "
+               "snippet(search_fts, 2, '[', ']', '...', 24) AS snippet, bm25(search_fts) AS score "
+               "FROM search_fts JOIN search_doc d ON d.id = search_fts.rowid WHERE search_fts MATCH ?")
+        args: List = [match_query]
+        if platform:
+            sql += " AND d.platform = ?"
+            args.append(platform)
+        if kind:
+            sql += " AND d.kind = ?"
+            args.append(kind)
+        sql += " ORDER BY score LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [dict(row, snippet=detokenize(row["snippet"])) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_search_index: Optional[ContentSearchIndex] = None
+
+
+def get_search_index() -> Optional[ContentSearchIndex]:
+    """
+    获取全文索引，未开启 ENABLE_SEARCH_INDEX 时返回 None
+    :return:
+    """
+    global _search_index
+    if not config.ENABLE_SEARCH_INDEX:
+        return None
+    if _search_index is None:
+        _search_index = ContentSearchIndex(config.SEARCH_INDEX_DB_PATH)
+    return _search_index
+
+
+async def index_documents(documents: List[Dict]):
+    """
+    在线程池中写入索引，不阻塞事件循环，索引失败只记录日志
+    :param documents:
+    :return:
+    """
+    search_index = get_search_index()
+    if search_index is None or not documents:
+        return
+    try:
+        await asyncio.to_thread(search_index.add_documents, documents)
+    except Exception as ex:
+        utils.logger.error(f"[index_documents] index {len(documents)} documents failed, err: {ex}")
+
+
+def close_search_index():
+    global _search_index
+    if _search_index is not None:
+        _search_index.close()
+        _search_index = None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Search crawled contents and comments")
+    parser.add_argument("query", type=str, help="search text")
+    parser.add_argument("--platform", type=str, default="", help="xhs | dy | ks | bili | wb | tieba | zhihu")
+    parser.add_argument("--kind", type=str, default="", choices=["", "content", "comment"])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--db", type=str, default=config.SEARCH_INDEX_DB_PATH, help="index file path")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        sys.exit(f"search index {args.db} not found, enable ENABLE_SEARCH_INDEX and crawl first")
+    start = time.perf_counter()
+    results = ContentSearchIndex(args.db).search(args.query, platform=args.platform, kind=args.kind, limit=args.limit)
+    for result in results:
+        print(f"[{result['platform']}/{result['kind']}] {result['record_id']} (content {result['content_id']}) "
+              f"{result['snippet']}")
+    print(f"{len(results)} results in {(time.perf_counter() - start) * 1000:.1f}ms")
@@ -0,0 +1,310 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 跨关键词、跨运行的已爬取内容去重过滤器（可伸缩布隆过滤器 + 精确集合兜底，持久化到磁盘）
+
+import hashlib
+import json
+import math
+import os
+import pickle
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set
+
+import config
+from tools import utils
+
+
+class BloomFilter:
+    """固定容量的布隆过滤器，使用 blake2b 双重哈希生成 k 个下标"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.count = 0
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _indexes(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[idx >> 3] & (1 << (idx & 7)) for idx in self._indexes(key))
+
+    def add(self, key: str) -> bool:
+        """
+        添加元素
+        :param key:
+        :return: 元素此前是否（可能）已存在
+        """
+        exists = True
+        for idx in self._indexes(key):
+            mask = 1 << (idx & 7)
+            if not self.bits[idx >> 3] & mask:
+                exists = False
+                self.bits[idx >> 3] |= mask
+        if not exists:
+            self.count += 1
+        return exists
+
+    @property
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+    def to_dict(self) -> Dict:
+        return {"capacity": self.capacity, "error_rate": self.error_rate, "count": self.count,
+                "bits": bytes(self.bits)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "BloomFilter":
+        bloom = cls(data["capacity"], data["error_rate"])
+        bloom.count = data["count"]
+        bloom.bits = bytearray(data["bits"])
+        return bloom
+
+
+class ScalableBloomFilter:
+    """
+    可伸缩布隆过滤器：当前层写满后追加一层容量翻倍、误判率收紧的过滤器，
+    整体误判率收敛在 initial_error_rate / (1 - tightening_ratio) 以内
+    """
+
+    def __init__(self, initial_capacity: int = 10000, error_rate: float = 0.001,
+                 growth_factor: int = 2, tightening_ratio: float = 0.5):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth_factor = growth_factor
+        self.tightening_ratio = tightening_ratio
+        self.filters: List[BloomFilter] = []
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in bloom for bloom in reversed(self.filters))
+
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self.filters)
+
+    def add(self, key: str) -> bool:
+        if key in self:
+            return True
+        if not self.filters or self.filters[-1].is_full:
+            layer = len(self.filters)
+            self.filters.append(BloomFilter(
+                capacity=self.initial_capacity * (self.growth_factor ** layer),
+                error_rate=self.error_rate * (self.tightening_ratio ** layer),
+            ))
+        self.filters[-1].add(key)
+        return False
+
+    def to_dict(self) -> Dict:
+        return {
+            "initial_capacity": self.initial_capacity,
+            "error_rate": self.error_rate,
+            "growth_factor": self.growth_factor,
+            "tightening_ratio": self.tightening_ratio,
+            "filters": [bloom.to_dict() for bloom in self.filters],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ScalableBloomFilter":
+        sbf = cls(data["initial_capacity"], data["error_rate"], data["growth_factor"], data["tightening_ratio"])
+        sbf.filters = [BloomFilter.from_dict(item) for item in data["filters"]]
+        return sbf
+
+
+class SeenBucket:
+    """
+    单日的已见集合：数量较少时使用精确集合（无误判），
+    超过 exact_limit 后转存到可伸缩布隆过滤器以压缩内存
+    """
+
+    def __init__(self, exact_limit: int):
+        self.exact_limit = exact_limit
+        self.exact: Optional[Set[str]] = set()
+        self.bloom: Optional[ScalableBloomFilter] = None
+
+    def __contains__(self, key: str) -> bool:
+        if self.exact is not None:
+            return key in self.exact
+        return key in self.bloom
+
+    def add(self, key: str):
+        if self.exact is not None:
+            self.exact.add(key)
+            if len(self.exact) > self.exact_limit:
+                self.bloom = ScalableBloomFilter(initial_capacity=self.exact_limit * 2)
+                for item in self.exact:
+                    self.bloom.add(item)
+                self.exact = None
+        else:
+            self.bloom.add(key)
+
+    def to_dict(self) -> Dict:
+        if self.exact is not None:
+            return {"exact": list(self.exact)}
+        return {"bloom": self.bloom.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict, exact_limit: int) -> "SeenBucket":
+        bucket = cls(exact_limit)
+        if "bloom" in data:
+            bucket.exact = None
+            bucket.bloom = ScalableBloomFilter.from_dict(data["bloom"])
+        else:
+            bucket.exact = set(data["exact"])
+        return bucket
+
+
+class SeenFilter:
+    """
+    按平台维度记录已爬取过的内容ID，按天分桶，只有在新鲜度窗口内出现过的内容才会被判定为已见，
+    过期的分桶在保存时会被清理掉
+    """
+
+    def __init__(self, platform: str, freshness_days: int = 1, exact_limit: int = 10000,
+                 save_dir: str = ""):
+        self.platform = platform
+        self.freshness_days = freshness_days
+        self.exact_limit = exact_limit
+        self.save_dir = save_dir or os.path.join("data", platform, "seen")
+        self.file_path = os.path.join(self.save_dir, "seen_filter.pkl")
+        self.buckets: Dict[str, SeenBucket] = {}
+        self._pending_keywords: List[Dict] = []
+        self._load()
+
+    def _window_dates(self) -> Set[str]:
+        today = date.today()
+        return {(today - timedelta(days=i)).isoformat() for i in range(self.freshness_days + 1)}
+
+    def is_fresh(self, content_id: str) -> bool:
+        """
+        判断内容是否在新鲜度窗口内已经爬取过
+        :param content_id: 内容ID
+        :return:
+        """
+        if not content_id:
+            return False
+        content_id = str(content_id)
+        window = self._window_dates()
+        return any(content_id in bucket for day, bucket in self.buckets.items() if day in window)
+
+    def should_skip(self, content_id: str, source_keyword: str) -> bool:
+        """
+        内容在新鲜度窗口内已经爬取过时记录与来源关键词的关联关系，返回 True 表示跳过该内容
+        :param content_id: 内容ID
+        :param source_keyword: 来源关键词
+        :return:
+        """
+        if not self.is_fresh(content_id):
+            return False
+        self.record_source_keyword(content_id, source_keyword)
+        return True
+
+    def add(self, content_id: str):
+        """
+        标记内容已经爬取过，内容保存到存储后调用
+        :param content_id: 内容ID
+        :return:
+        """
+        if not content_id:
+            return
+        today = date.today().isoformat()
+        if today not in self.buckets:
+            self.buckets[today] = SeenBucket(self.exact_limit)
+        self.buckets[today].add(str(content_id))
+
+    def record_source_keyword(self, content_id: str, source_keyword: str):
+        """
+        记录被跳过内容与新关键词的关联关系，保存时追加写入 source_keyword.jsonl
+        :param content_id: 内容ID
+        :param source_keyword: 来源关键词
+        :return:
+        """
+        if not source_keyword:
+            return
+        self._pending_keywords.append({
+            "platform": self.platform,
+            "content_id": str(content_id),
+            "source_keyword": source_keyword,
+            "add_ts": utils.get_current_timestamp(),
+        })
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, "rb") as f:
+                data: Dict = pickle.load(f)
+            self.buckets = {
+                day: SeenBucket.from_dict(bucket, self.exact_limit) for day, bucket in data.get("buckets", {}).items()
+            }
+        except Exception as ex:
+            utils.logger.error(f"[SeenFilter._load] load seen filter failed, file: {self.file_path}, err: {ex}")
+            self.buckets = {}
+
+    def save(self):
+        """
+        清理过期分桶后持久化到磁盘（先写临时文件再替换，避免中断时写坏文件）
+        :return:
+        """
+        os.makedirs(self.save_dir, exist_ok=True)
+        window = self._window_dates()
+        self.buckets = {day: bucket for day, bucket in self.buckets.items() if day in window}
+        tmp_path = self.file_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"buckets": {day: bucket.to_dict() for day, bucket in self.buckets.items()}}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.file_path)
+
+        if self._pending_keywords:
+            with open(os.path.join(self.save_dir, "source_keyword.jsonl"), "a", encoding="utf-8") as f:
+                for item in self._pending_keywords:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            self._pending_keywords = []
+        utils.logger.info(f"[SeenFilter.save] {self.platform} seen filter saved, buckets: {list(self.buckets.keys())}")
+
+
+_seen_filters: Dict[str, SeenFilter] = {}
+
+
+def get_seen_filter(platform: str = "") -> Optional[SeenFilter]:
+    """
+    获取平台对应的已见过滤器，未开启 ENABLE_SEEN_FILTER 时返回 None
+    :param platform: 平台名称，默认取 config.PLATFORM
+    :return:
+    """
+    if not config.ENABLE_SEEN_FILTER:
+        return None
+    platform = platform or config.PLATFORM
+    if platform not in _seen_filters:
+        _seen_filters[platform] = SeenFilter(
+            platform=platform,
+            freshness_days=config.SEEN_FILTER_FRESHNESS_DAYS,
+            exact_limit=config.SEEN_FILTER_EXACT_LIMIT,
+        )
+    return _seen_filters[platform]
+
+
+def save_all_seen_filters():
+    """
+    持久化所有已创建的过滤器
+    :return:
+    """
+    for seen_filter in _seen_filters.values():
+        try:
+            seen_filter.save()
+        except Exception as ex:
+            utils.logger.error(f"[save_all_seen_filters] save {seen_filter.platform} seen filter failed, err: {ex}")
@@ -0,0 +1,102 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 存储写入吞吐量测试，在临时目录中用模拟的小红书评论数据分别测试 json、csv、jsonl、sqlite、parquet 存储
+#            用法：python -m tools.store_benchmark --count 2000
+
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import db
+from store.file_writer import close_all_file_writers
+from store.xhs import XhsStoreFactory
+from var import crawler_type_var
+
+STORE_OPTIONS = ["json", "csv", "jsonl", "sqlite", "parquet"]
+
+
+def make_comment_items(count: int) -> List[Dict]:
+    now = int(time.time() * 1000)
+    return [{
+        "comment_id": f"bench_comment_{i}",
+        "create_time": now - i,
+        "ip_location": "上海",
+        "note_id": f"bench_note_{i // 20}",
+        "content": f"模拟评论内容 {i}，用于测试不同存储方式的写入速度",
+        "user_id": f"bench_user_{i % 500}",
+        "nickname": f"用户{i % 500}",
+        "avatar": "https://example.com/avatar.jpg",
+        "sub_comment_count": 0,
+        "pictures": "",
+        "parent_comment_id": 0,
+        "last_modify_ts": now,
+        "like_count": i % 100,
+    } for i in range(count)]
+
+
+async def bench_store(store_option: str, items: List[Dict], batch_size: int) -> float:
+    """
+    按 batch_size 条一批写入评论，返回每秒写入条数
+    :param store_option: 存储类型
+    :param items: 评论数据
+    :param batch_size: 每批条数，模拟爬虫每页评论批量入库
+    :return:
+    """
+    config.SAVE_DATA_OPTION = store_option
+    store = XhsStoreFactory.STORES[store_option]()
+    if store_option == "sqlite":
+        await db.init_db()
+    start = time.perf_counter()
+    for i in range(0, len(items), batch_size):
+        await store.store_comments([dict(item) for item in items[i:i + batch_size]])
+    await store.flush()
+    await close_all_file_writers()
+    if store_option == "sqlite":
+        await db.close()
+    return len(items) / (time.perf_counter() - start)
+
+
+async def main(count: int, batch_size: int, store_options: List[str]):
+    items = make_comment_items(count)
+    crawler_type_var.set("benchmark")
+    config.ENABLE_GET_WORDCLOUD = False
+    for store_option in store_options:
+        rows_per_sec = await bench_store(store_option, items, batch_size)
+        print(f"{store_option:>8}: {count} rows, {rows_per_sec:,.0f} rows/s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="MediaCrawler store throughput benchmark")
+    parser.add_argument("--count", type=int, default=2000, help="number of comments to write")
+    parser.add_argument("--batch_size", type=int, default=20, help="comments per store_comments call")
+    parser.add_argument("--stores", type=str, default=",".join(STORE_OPTIONS), help="stores to test, comma separated")
+    args = parser.parse_args()
+
+    project_root = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="mediacrawler_bench_")
+    shutil.copytree(os.path.join(project_root, "schema"), os.path.join(work_dir, "schema"))
+    os.chdir(work_dir)
+    config.SQLITE_DB_PATH = os.path.join(work_dir, "data", "media_crawler.db")
+    try:
+        asyncio.run(main(args.count, args.batch_size, args.stores.split(",")))
+    finally:
+        os.chdir(project_root)
+        shutil.rmtree(work_dir, ignore_errors=True)